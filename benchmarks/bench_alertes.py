@@ -0,0 +1,88 @@
+"""Coût des alertes de stock selon la taille du catalogue.
+
+Usage : python benchmarks/bench_alertes.py [--produits 500 5000 50000] [--mouvements 2000]
+
+Pour chaque taille de catalogue (base synthétique dans un dossier temporaire) :
+- durée d'un mouvement enregistré (stockage.enregistrer_mouvement), évaluation
+  de l'alerte du produit touché comprise, et durée de cette évaluation seule
+  (alertes.etats puis alertes.enregistrer, dans une transaction annulée) ;
+- produits en alerte pour le tableau de bord : ancien filtrage du catalogue
+  entier (Quantité <= Seuil Alerte) face à l'ensemble tenu par le moteur
+  (DonneesPartagees.produits_en_alerte).
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from donnees_synthetiques import ecrire_base, generer  # noqa: E402
+from wksdf import alertes, stockage  # noqa: E402
+from wksdf.donnees import DonneesPartagees  # noqa: E402
+
+
+def mediane(durees):
+    return statistics.median(durees) * 1e6
+
+
+def mesurer(dossier, nb_produits, nb_mouvements):
+    chemin = os.path.join(dossier, f"stock_{nb_produits}.db")
+    produits, mouvements = generer(10_000, nb_produits)
+    ecrire_base(chemin, produits, mouvements)
+    noms = produits["Nom Produit"].tolist()
+    ids = produits["ID"].tolist()
+
+    with stockage.ouvrir(chemin) as conn:
+        durees = []
+        for i in range(nb_mouvements):
+            debut = time.perf_counter()
+            # Entrée au premier passage sur le catalogue, sortie au suivant : le stock ne devient jamais négatif
+            type_mvt = "Entrée" if (i // len(noms)) % 2 == 0 else "Sortie"
+            stockage.enregistrer_mouvement(conn, noms[i % len(noms)], type_mvt, 1)
+            durees.append(time.perf_counter() - debut)
+        mouvement = mediane(durees)
+
+        durees = []
+        for i in range(nb_mouvements):
+            conn.execute("BEGIN IMMEDIATE")
+            debut = time.perf_counter()
+            avant = alertes.etats(conn, [ids[i % len(ids)]])
+            alertes.enregistrer(conn, avant)
+            durees.append(time.perf_counter() - debut)
+            conn.rollback()
+        evaluation = mediane(durees)
+
+    donnees = DonneesPartagees(chemin, os.path.join(dossier, "absent.xlsx"))
+    produits_df, _ = donnees.obtenir()
+    ancien = mediane([chronometrer(lambda: produits_df[produits_df["Quantité"] <= produits_df["Seuil Alerte"]])
+                      for _ in range(200)])
+    moteur = mediane([chronometrer(donnees.produits_en_alerte) for _ in range(200)])
+    print(f"{nb_produits:>8} {mouvement:12.1f} {evaluation:12.1f} {ancien:14.1f} {moteur:12.1f} "
+          f"{len(donnees.alertes.actives):>10}")
+
+
+def chronometrer(fonction):
+    debut = time.perf_counter()
+    fonction()
+    return time.perf_counter() - debut
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--produits", type=int, nargs="+", default=[500, 5_000, 50_000])
+    parser.add_argument("--mouvements", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print("Médianes en µs")
+    print(f"{'produits':>8} {'mouvement':>12} {'évaluation':>12} {'filtre ancien':>14} {'moteur':>12} "
+          f"{'en alerte':>10}")
+    with tempfile.TemporaryDirectory() as dossier:
+        for nb_produits in args.produits:
+            mesurer(dossier, nb_produits, args.mouvements)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Test de charge de l'API HTTP (wksdf/api.py) sur une base locale.
+
+Usage : python benchmarks/bench_api.py [--mouvements 100000] [--produits 500] [--clients 1 8 32] [--duree 5]
+        [--lot 100]
+
+Lance le serveur (uvicorn, un processus) sur une base synthétique dans un
+dossier temporaire, réapprovisionne tous les produits par un lot, puis, pour
+chaque nombre de clients simultanés (threads, une session HTTP chacun)
+pendant --duree secondes :
+- lecture du stock courant (GET /stock) ;
+- ventes unitaires (POST /mouvements, regroupées côté serveur) ;
+- ventes par lots de --lot mouvements (POST /mouvements/lot).
+Affiche requêtes et mouvements par seconde, latences médiane et p95, puis
+vérifie que le stock final est égal au stock initial moins les ventes
+acceptées et que chaque vente a reçu un identifiant distinct. Les clients
+n'utilisent que la bibliothèque standard (http.client, une connexion
+persistante par client).
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RACINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RACINE)
+
+from donnees_synthetiques import ecrire_base, generer  # noqa: E402
+from wksdf import api  # noqa: E402
+from wksdf.utilisateurs import COMPTES_INITIAUX  # noqa: E402
+
+
+def port_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Client:
+    """Connexion HTTP persistante au serveur ; les réponses sont décodées depuis le JSON."""
+
+    def __init__(self, port, jeton=None):
+        self.connexion = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        self.jeton = jeton
+
+    # Corps JSON de la réponse ; RuntimeError si le statut n'est pas 2xx
+    def appeler(self, methode, chemin, corps=None):
+        entetes = {"Content-Type": "application/json"}
+        if self.jeton:
+            entetes["Authorization"] = f"Bearer {self.jeton}"
+        donnees = None if corps is None else json.dumps(corps)
+        try:
+            self.connexion.request(methode, chemin, donnees, entetes)
+            reponse = self.connexion.getresponse()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            # Connexion inactive fermée par le serveur (keep-alive expiré) : une nouvelle tentative
+            self.connexion.close()
+            self.connexion.request(methode, chemin, donnees, entetes)
+            reponse = self.connexion.getresponse()
+        contenu = reponse.read()
+        if not 200 <= reponse.status < 300:
+            raise RuntimeError(f"{methode} {chemin} : {reponse.status} {contenu[:200]!r}")
+        return json.loads(contenu) if contenu else None
+
+
+def demarrer(dossier, port):
+    serveur = subprocess.Popen(
+        [sys.executable, "-m", "wksdf.api", "--port", str(port), "--base", os.path.join(dossier, "stock.db"),
+         "--utilisateurs", os.path.join(dossier, "users.csv")],
+        cwd=dossier, env={**os.environ, "PYTHONPATH": os.path.abspath(RACINE)})
+    for _ in range(600):
+        try:
+            Client(port).appeler("GET", "/sante")
+            return serveur
+        except ConnectionError:
+            time.sleep(0.1)
+    serveur.kill()
+    raise RuntimeError("Le serveur n'a pas démarré")
+
+
+def session(port):
+    nom, mot_de_passe, _ = COMPTES_INITIAUX[0]
+    reponse = Client(port).appeler("POST", "/sessions", {"nom": nom, "mot_de_passe": mot_de_passe})
+    return Client(port, reponse["jeton"])
+
+
+# `clients` threads envoient des requêtes pendant `duree` secondes ; requete(client, rng) renvoie les
+# identifiants de mouvements obtenus
+def charger(port, jeton, clients, duree, requete):
+    latences, ids, verrou = [], [], threading.Lock()
+    fin = time.perf_counter() + duree
+
+    def travailleur(numero):
+        client = Client(port, jeton)
+        rng = random.Random(numero)
+        locales, obtenus = [], []
+        while time.perf_counter() < fin:
+            debut = time.perf_counter()
+            obtenus.extend(requete(client, rng))
+            locales.append(time.perf_counter() - debut)
+        with verrou:
+            latences.extend(locales)
+            ids.extend(obtenus)
+
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(travailleur, range(clients)))
+    return latences, ids, time.perf_counter() - debut
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mouvements", type=int, default=100_000)
+    parser.add_argument("--produits", type=int, default=500)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duree", type=float, default=5)
+    parser.add_argument("--lot", type=int, default=100)
+    args = parser.parse_args()
+
+    produits, mouvements = generer(args.mouvements, args.produits)
+    noms = produits["Nom Produit"].tolist()
+
+    def lecture(client, rng):
+        client.appeler("GET", "/stock")
+        return []
+
+    def vente(client, rng):
+        reponse = client.appeler("POST", "/mouvements", {"produit": rng.choice(noms), "type": "Sortie",
+                                                         "quantite": 1})
+        return [reponse["id"]]
+
+    def lot(client, rng):
+        reponse = client.appeler("POST", "/mouvements/lot", {"mouvements": [
+            {"produit": rng.choice(noms), "type": "Sortie", "quantite": 1} for _ in range(args.lot)]})
+        return [mouvement_id for mouvement_id in reponse["ids"] if mouvement_id is not None]
+
+    with tempfile.TemporaryDirectory() as dossier:
+        ecrire_base(os.path.join(dossier, "stock.db"), produits, mouvements)
+        port = port_libre()
+        serveur = demarrer(dossier, port)
+        try:
+            client = session(port)
+            # Réapprovisionnement : aucune vente ne sera refusée pour stock insuffisant
+            for debut in range(0, len(noms), api.LOT_MAX):
+                client.appeler("POST", "/mouvements/lot", {"mouvements": [
+                    {"produit": nom, "type": "Entrée", "quantite": 1_000_000}
+                    for nom in noms[debut:debut + api.LOT_MAX]]})
+            stock_initial = sum(ligne["quantite"] for ligne in client.appeler("GET", "/stock"))
+
+            print(f"{args.mouvements} mouvements en base, {args.produits} produits, {args.duree:.0f} s par mesure")
+            print(f"{'scénario':<22} {'clients':>7} {'requêtes/s':>11} {'mouvements/s':>13} {'p50 (ms)':>9} "
+                  f"{'p95 (ms)':>9}")
+            vendus = []
+            for nom, requete in (("lecture du stock", lecture), ("vente unitaire", vente),
+                                 (f"lot de {args.lot} ventes", lot)):
+                for clients in args.clients:
+                    latences, ids, duree = charger(port, client.jeton, clients, args.duree, requete)
+                    vendus.extend(ids)
+                    quantiles = statistics.quantiles(latences, n=20) if len(latences) > 1 else latences * 19
+                    print(f"{nom:<22} {clients:>7} {len(latences) / duree:11.0f} {len(ids) / duree:13.0f} "
+                          f"{statistics.median(latences) * 1000:9.1f} {quantiles[18] * 1000:9.1f}")
+
+            stock_final = sum(ligne["quantite"] for ligne in client.appeler("GET", "/stock"))
+            assert len(set(vendus)) == len(vendus), "identifiant de mouvement attribué deux fois"
+            assert stock_final == stock_initial - len(vendus), "stock final incohérent avec les ventes acceptées"
+            print(f"OK : {len(vendus)} ventes, stock {stock_initial} -> {stock_final}")
+        finally:
+            serveur.terminate()
+            serveur.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Archivage des mois anciens : taille du journal courant et coût des lectures historiques.
+
+Usage : python benchmarks/bench_archives.py [--mouvements 1000000] [--produits 500] [--retention 12]
+
+Construit une base synthétique (dossier temporaire) puis mesure, avant et
+après stockage.archiver (jour de référence : lendemain du dernier mouvement) :
+- taille de la base et des partitions Parquet, durée de l'archivage ;
+- chargement du journal en mémoire (DonneesPartagees.obtenir) ;
+- comptage et première page de l'historique sur 30 jours récents (journal
+  courant) et sur 30 jours d'un mois archivé ;
+- stock de tous les produits à une date récente et à une date archivée ;
+- recettes par mois (agrégats, identiques avant et après).
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from donnees_synthetiques import ecrire_base, generer  # noqa: E402
+from wksdf import historique, instantanes, stockage  # noqa: E402
+from wksdf.donnees import DonneesPartagees  # noqa: E402
+
+
+def mesurer(fonction, repetitions=3):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        durees.append(time.perf_counter() - debut)
+    return min(durees) * 1000, resultat
+
+
+def taille_base(chemin):
+    return sum(os.path.getsize(fichier) for fichier in glob.glob(chemin + "*")) / 1e6
+
+
+# Durées (ms) et résultats des lectures, pour comparer avant et après l'archivage
+def lectures(chemin, excel, recent, ancien):
+    resultats = {}
+    resultats["chargement"] = mesurer(lambda: DonneesPartagees(chemin, excel).obtenir()[1], repetitions=1)
+    with stockage.ouvrir(chemin) as conn:
+        for nom, fin in (("récent", recent), ("archivé", ancien)):
+            criteres = dict(debut=fin - timedelta(days=30), fin=fin)
+            resultats[f"historique {nom}"] = mesurer(lambda: (
+                historique.compter_mouvements(conn, **criteres), historique.page_mouvements(conn, **criteres)[0]))
+            resultats[f"stock au {fin}"] = mesurer(lambda: instantanes.stock_a_date(conn, fin))
+    donnees = DonneesPartagees(chemin, excel)
+    donnees.obtenir()
+    # Premier calcul seulement : les suivants sont mémorisés
+    resultats["recettes par mois"] = mesurer(lambda: donnees.recettes_par_periode("mois"), repetitions=1)
+    return resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mouvements", type=int, default=1_000_000)
+    parser.add_argument("--produits", type=int, default=500)
+    parser.add_argument("--retention", type=int, default=12)
+    args = parser.parse_args()
+
+    produits, mouvements = generer(args.mouvements, args.produits)
+    jour = pd.Timestamp(mouvements["Date"].max()).date() + timedelta(days=1)
+    recent = jour - timedelta(days=1)
+    ancien = recent - timedelta(days=3 * 365)
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "stock.db")
+        excel = os.path.join(dossier, "absent.xlsx")
+        ecrire_base(chemin, produits, mouvements)
+        with stockage.ouvrir(chemin) as conn:
+            conn.execute("VACUUM")
+        taille_avant = taille_base(chemin)
+        avant = lectures(chemin, excel, recent, ancien)
+
+        with stockage.ouvrir(chemin) as conn:
+            debut = time.perf_counter()
+            archives = stockage.archiver(conn, args.retention, jour)
+            duree = time.perf_counter() - debut
+            conn.execute("VACUUM")
+        parquet = sum(os.path.getsize(f) for f in glob.glob(os.path.join(dossier, "archives", "*.parquet"))) / 1e6
+        print(f"{args.mouvements} mouvements, {args.produits} produits, rétention {args.retention} mois : "
+              f"{archives} mouvements archivés en {duree:.1f} s")
+        print(f"base {taille_avant:.1f} Mo -> {taille_base(chemin):.1f} Mo, "
+              f"partitions Parquet {parquet:.1f} Mo ({len(os.listdir(os.path.join(dossier, 'archives')))} fichiers)")
+        apres = lectures(chemin, excel, recent, ancien)
+
+    print(f"{'':<28} {'avant (ms)':>12} {'après (ms)':>12}")
+    for nom, (duree_avant, resultat_avant) in avant.items():
+        duree_apres, resultat_apres = apres[nom]
+        print(f"{nom:<28} {duree_avant:12.1f} {duree_apres:12.1f}")
+        # Mêmes résultats, sauf le chargement qui ne garde que le journal courant
+        if nom == "chargement":
+            print(f"{'  mouvements en mémoire':<28} {len(resultat_avant):>12} {len(resultat_apres):>12}")
+        elif nom.startswith("historique"):
+            assert resultat_avant[0] == resultat_apres[0]
+            pd.testing.assert_frame_equal(resultat_avant[1], resultat_apres[1], check_dtype=False)
+        else:
+            pd.testing.assert_frame_equal(resultat_avant, resultat_apres, check_dtype=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Coût de l'authentification : paramètres de scrypt et connexions simultanées.
+
+Usage : python benchmarks/bench_authentification.py [--connexions 8] [--tentatives 4]
+
+Mesure :
+- la durée d'un hachage scrypt selon le coût n (r = 8, p = 1) et la mémoire
+  réservée, pour choisir SCRYPT_N dans wksdf/utilisateurs.py ;
+- la latence des connexions quand plusieurs sessions se connectent en même
+  temps (1 à --connexions threads), au coût courant ;
+- l'ancien chemin (lecture de users.csv avec pandas + SHA-256 sans sel) face
+  aux contrôles en mémoire (comptes en cache, compte bloqué).
+"""
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from wksdf import utilisateurs  # noqa: E402
+from wksdf.utilisateurs import CompteBloque, Utilisateurs  # noqa: E402
+
+
+def duree(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return statistics.median(durees)
+
+
+def couts():
+    print("Coût de scrypt (r = 8, p = 1) :")
+    for exposant in range(13, 18):
+        n = 2 ** exposant
+        secondes = duree(lambda: utilisateurs.hacher("mot de passe", n=n), 3)
+        print(f"  n = 2^{exposant:<3} {128 * n * 8 / 2 ** 20:5.0f} Mio  {secondes * 1000:8.1f} ms")
+
+
+def simultanees(comptes, connexions, tentatives):
+    print(f"Connexions simultanées (n = 2^{utilisateurs.SCRYPT_N.bit_length() - 1}, "
+          f"{utilisateurs.HACHAGES_SIMULTANES} hachages à la fois) :")
+    nombre = 1
+    while nombre <= connexions:
+        latences = []
+
+        def session():
+            for _ in range(tentatives):
+                debut = time.perf_counter()
+                comptes.authentifier("admin", "Samayaye67")
+                latences.append(time.perf_counter() - debut)
+
+        threads = [threading.Thread(target=session) for _ in range(nombre)]
+        debut = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        total = time.perf_counter() - debut
+        latences.sort()
+        print(f"  {nombre:>2} session(s) : médiane {statistics.median(latences) * 1000:7.1f} ms, "
+              f"p95 {latences[int(0.95 * (len(latences) - 1))] * 1000:7.1f} ms, "
+              f"{len(latences) / total:5.1f} connexions/s")
+        nombre *= 2
+
+
+def controles(comptes, chemin_ancien):
+    print("Contrôles sans hachage :")
+    ancien = duree(lambda: pd.read_csv(chemin_ancien)["password"].iloc[0]
+                   == hashlib.sha256(b"Samayaye67").hexdigest(), 200)
+    print(f"  ancien chemin (read_csv + SHA-256)  {ancien * 1e6:8.1f} µs")
+    print(f"  comptes en cache                    {duree(comptes.comptes, 10_000) * 1e6:8.1f} µs")
+    for _ in range(utilisateurs.ECHECS_MAX):
+        comptes.authentifier("user", "faux")
+
+    def bloque():
+        try:
+            comptes.authentifier("user", "faux")
+        except CompteBloque:
+            pass
+
+    print(f"  tentative sur compte bloqué         {duree(bloque, 10_000) * 1e6:8.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connexions", type=int, default=8, help="nombre maximal de sessions simultanées")
+    parser.add_argument("--tentatives", type=int, default=4, help="connexions par session")
+    args = parser.parse_args()
+
+    couts()
+    with tempfile.TemporaryDirectory() as dossier:
+        comptes = Utilisateurs(os.path.join(dossier, "users.csv"))
+        comptes.comptes()
+        simultanees(comptes, args.connexions, args.tentatives)
+
+        chemin_ancien = os.path.join(dossier, "users_sha256.csv")
+        pd.DataFrame([{"username": "admin", "password": hashlib.sha256(b"Samayaye67").hexdigest(),
+                       "role": "admin"}]).to_csv(chemin_ancien, index=False)
+        controles(comptes, chemin_ancien)
+
+
+if __name__ == "__main__":
+    main()
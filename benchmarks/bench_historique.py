@@ -0,0 +1,88 @@
+"""Latence des requêtes paginées sur l'historique des mouvements.
+
+Usage : python benchmarks/bench_historique.py [--mouvements 1000000] [--produits 500]
+
+Construit une base SQLite temporaire, puis compare la requête indexée
+(comptage + première page et pages suivantes par curseur) au filtrage de
+l'ancien écran : copie du DataFrame, pd.to_datetime et masques booléens.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from donnees_synthetiques import generer  # noqa: E402
+from wksdf import historique, stockage  # noqa: E402
+
+
+def ancien_filtre(mouvements_df, filtre_type, filtre_produit, date_debut, date_fin):
+    filtered_mouvements = mouvements_df.copy()
+    filtered_mouvements["Date"] = pd.to_datetime(filtered_mouvements["Date"])
+    if filtre_type != "Tous":
+        filtered_mouvements = filtered_mouvements[filtered_mouvements["Type"] == filtre_type]
+    if filtre_produit != "Tous":
+        filtered_mouvements = filtered_mouvements[filtered_mouvements["Produit"] == filtre_produit]
+    return filtered_mouvements[
+        (filtered_mouvements["Date"].dt.date >= date_debut) &
+        (filtered_mouvements["Date"].dt.date <= date_fin)
+        ]
+
+
+def mesurer(fonction, repetitions=5):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        durees.append(time.perf_counter() - debut)
+    return min(durees), resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mouvements", type=int, default=1_000_000)
+    parser.add_argument("--produits", type=int, default=500)
+    parser.add_argument("--taille-page", type=int, default=historique.TAILLE_PAGE)
+    args = parser.parse_args()
+
+    produits, mouvements = generer(args.mouvements, args.produits)
+    with tempfile.TemporaryDirectory() as dossier, stockage.ouvrir(os.path.join(dossier, "stock.db")) as conn:
+        stockage.remplir(conn, produits, mouvements)
+
+        fin = date.fromisoformat(mouvements["Date"].max())
+        debut = fin - timedelta(days=30)
+        produit = produits["Nom Produit"].iloc[6]
+        produit_id = int(produits["ID"].iloc[6])
+        scenarios = {
+            "30 jours, un produit": dict(produit_id=produit_id, debut=debut, fin=fin),
+            "30 jours, sorties": dict(type_mvt="Sortie", debut=debut, fin=fin),
+            "30 jours, tous": dict(debut=debut, fin=fin),
+            "historique complet, un produit": dict(produit_id=produit_id),
+        }
+        print(f"{args.mouvements} mouvements, pages de {args.taille_page}")
+        for nom, criteres in scenarios.items():
+            duree_compte, total = mesurer(lambda: historique.compter_mouvements(conn, **criteres))
+            duree_page, (page, suivant) = mesurer(
+                lambda: historique.page_mouvements(conn, limite=args.taille_page, **criteres))
+            duree_suivante = float("nan")
+            if suivant is not None:
+                duree_suivante, _ = mesurer(
+                    lambda: historique.page_mouvements(conn, limite=args.taille_page, apres=suivant, **criteres))
+            ancien_debut = criteres.get("debut", date(1970, 1, 1))
+            ancien_fin = criteres.get("fin", date(2100, 1, 1))
+            duree_ancien, filtre = mesurer(lambda: ancien_filtre(
+                mouvements, criteres.get("type_mvt", "Tous"), produit if "produit_id" in criteres else "Tous",
+                ancien_debut, ancien_fin), repetitions=1)
+            assert total == len(filtre), (nom, total, len(filtre))
+            print(f"- {nom} ({total} lignes) : comptage {duree_compte * 1000:.1f} ms, "
+                  f"1re page {duree_page * 1000:.1f} ms, page suivante {duree_suivante * 1000:.1f} ms "
+                  f"| ancien filtre {duree_ancien * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Surcoût de l'instrumentation (wksdf.mesures), désactivée puis activée.
+
+Usage : python benchmarks/bench_mesures.py [--appels 1000000]
+
+Compare un appel direct à la même fonction décorée par mesures.instrumenter
+et à un bloc « with mesures.mesurer(...) », mesures désactivées puis activées.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from wksdf import mesures  # noqa: E402
+
+
+def operation(x):
+    return x
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--appels", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    decoree = mesures.instrumenter("bench.operation")(operation)
+
+    def bloc():
+        with mesures.mesurer("bench.bloc"):
+            operation(1)
+
+    scenarios = {
+        "appel direct": lambda: operation(1),
+        "fonction décorée": lambda: decoree(1),
+        "bloc with": bloc,
+    }
+    for actif, appels in ((False, args.appels), (True, max(1, args.appels // 20))):
+        mesures.activer(actif)
+        print(f"Mesures {'activées' if actif else 'désactivées'} ({appels} appels) :")
+        for nom, fonction in scenarios.items():
+            duree = min(timeit.repeat(fonction, number=appels, repeat=3)) / appels
+            print(f"- {nom} : {duree * 1e9:.0f} ns par appel")
+    mesures.activer(False)
+
+
+if __name__ == "__main__":
+    main()
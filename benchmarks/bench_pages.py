@@ -0,0 +1,147 @@
+"""Temps de rendu des pages de l'application : démarrage à froid et réexécutions.
+
+Usage : python benchmarks/bench_pages.py [--mouvements 100000] [--produits 500] [--repetitions 5]
+        [--revision REV]
+
+L'application est exécutée sans navigateur (streamlit.testing.AppTest) sur une
+base synthétique, dans un dossier temporaire. Mesures :
+- démarrage à froid : première exécution du script (page de connexion), dans
+  un processus neuf où seul Streamlit est importé, imports de l'application
+  compris ;
+- premier rendu du tableau de bord après connexion (données chargées) ;
+- réexécution de chaque page sans interaction (meilleur temps et médiane) ;
+- changement de période du graphique des recettes.
+
+Avec --revision, ce script est copié dans un arbre de travail temporaire de
+cette révision git et y mesure son application (données générées par le
+donnees_synthetiques.py de la révision), pour comparer avant et après un
+changement, par exemple :
+    python benchmarks/bench_pages.py --revision 5caa5cb^   # application d'un seul script
+    python benchmarks/bench_pages.py                       # pages chargées à la demande
+Une mesure absente de l'ancienne application est signalée comme non mesurée.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RACINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RACINE)
+
+from donnees_synthetiques import ecrire_base, generer  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+PAGES = ["📊 Tableau de bord", "📦 Produits", "➕ Entrée / ➖ Sortie", "📁 Exportation", "⚙️ Réinitialiser Stock",
+         "⏱️ Performance"]
+
+
+def chronometrer(fonction):
+    debut = time.perf_counter()
+    fonction()
+    return time.perf_counter() - debut
+
+
+def afficher(nom, durees):
+    durees = [durees] if isinstance(durees, float) else durees
+    print(f"{nom:<45} {min(durees) * 1000:9.1f} ms  (médiane {statistics.median(durees) * 1000:9.1f} ms)")
+
+
+def verifier(at):
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+# Première exécution de app.py dans un processus neuf (Streamlit seul importé), en secondes
+DEMARRAGE = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+debut = time.perf_counter()
+at.run()
+if at.exception:
+    raise SystemExit(at.exception[0].message)
+print(time.perf_counter() - debut)
+"""
+
+
+def demarrage_a_froid(dossier):
+    sortie = subprocess.run([sys.executable, "-c", DEMARRAGE, os.path.join(RACINE, "app.py")], cwd=dossier,
+                            env={**os.environ, "PYTHONPATH": os.path.abspath(RACINE)}, capture_output=True,
+                            text=True, check=True)
+    return float(sortie.stdout.split()[-1])
+
+
+# Mêmes mesures sur l'application de `revision` : ce script est exécuté depuis un arbre de travail temporaire
+def mesurer_revision(revision):
+    with tempfile.TemporaryDirectory() as dossier:
+        arbre = os.path.join(dossier, "arbre")
+        subprocess.run(["git", "-C", RACINE, "worktree", "add", "--detach", "--quiet", arbre, revision], check=True)
+        try:
+            script = os.path.join(arbre, "benchmarks", os.path.basename(__file__))
+            shutil.copyfile(os.path.abspath(__file__), script)
+            print(f"Révision {revision}")
+            arguments = [argument for argument in sys.argv[1:] if argument not in ("--revision", revision)]
+            subprocess.run([sys.executable, script, *arguments], check=True)
+        finally:
+            subprocess.run(["git", "-C", RACINE, "worktree", "remove", "--force", arbre], check=True)
+
+
+# Sélecteur de période des recettes, repéré par sa clé ou, dans une application qui n'en donne pas, par son
+# libellé ; None s'il est absent
+def selecteur_recettes(at):
+    for selecteur in at.selectbox:
+        if selecteur.key == "periode_recettes" or selecteur.label == "Sélectionnez la période d'analyse":
+            return selecteur
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mouvements", type=int, default=100_000)
+    parser.add_argument("--produits", type=int, default=500)
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--revision", help="révision git de l'application à mesurer (par défaut : ce dépôt)")
+    args = parser.parse_args()
+    if args.revision:
+        mesurer_revision(args.revision)
+        return
+
+    with tempfile.TemporaryDirectory() as dossier:
+        ecrire_base(os.path.join(dossier, "data", "stock.db"), *generer(args.mouvements, args.produits))
+        os.chdir(dossier)
+        afficher("démarrage à froid (connexion)", [demarrage_a_froid(dossier) for _ in range(args.repetitions)])
+
+        at = AppTest.from_file(os.path.join(RACINE, "app.py"), default_timeout=600)
+        at.run()
+        verifier(at)
+        at.text_input[0].set_value("admin")
+        at.text_input[1].set_value("Samayaye67")
+        at.button[0].click()
+        afficher("premier tableau de bord", chronometrer(at.run))
+        verifier(at)
+
+        for page in PAGES:
+            at.sidebar.radio[0].set_value(page)
+            at.run()
+            verifier(at)
+            afficher(f"réexécution : {page}", [chronometrer(at.run) for _ in range(args.repetitions)])
+
+        at.sidebar.radio[0].set_value(PAGES[0])
+        at.run()
+        if selecteur_recettes(at) is None:
+            print(f"{'tableau de bord : période des recettes':<45} non mesuré (sélecteur absent)")
+            return
+        durees = []
+        for periode in ["mois", "année", "jour"] * args.repetitions:
+            selecteur_recettes(at).set_value(periode)
+            durees.append(chronometrer(at.run))
+            verifier(at)
+        afficher("tableau de bord : période des recettes", durees)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Prévisions de consommation : calcul vectorisé face à une boucle par produit.
+
+Usage : python benchmarks/bench_previsions.py [--produits 1000 5000 20000] [--mouvements 1000000]
+
+Pour chaque taille de catalogue, mesure previsions.consommations puis
+previsions.projeter sur tous les produits (jour de référence : lendemain du
+dernier mouvement). La version par produit (filtre des sorties du produit,
+série journalière, moyennes et lissage pandas) est mesurée sur
+--echantillon-boucle produits et extrapolée ; ses résultats servent de
+contrôle pour ces produits.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from donnees_synthetiques import generer  # noqa: E402
+from wksdf import previsions, schema  # noqa: E402
+
+
+# Consommation d'un seul produit, comme on l'écrirait produit par produit
+def par_produit(produit, mouvements_df, jour):
+    fin = pd.Timestamp(jour)
+    debut = fin - pd.Timedelta(days=previsions.FENETRE)
+    sorties = mouvements_df[(mouvements_df["Produit ID"] == produit["ID"]) & (mouvements_df["Type"] == "Sortie")
+                            & (mouvements_df["Date"] >= debut) & (mouvements_df["Date"] < fin)]
+    jours = sorties.groupby("Date")["Quantité"].sum().reindex(
+        pd.date_range(debut, fin - pd.Timedelta(days=1)), fill_value=0)
+    return [jours.tail(n).mean() for n in previsions.MOYENNES] + [
+        jours.ewm(alpha=2 / (previsions.LISSAGE + 1)).mean().iloc[-1]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--produits", type=int, nargs="+", default=[1_000, 5_000, 20_000])
+    parser.add_argument("--mouvements", type=int, default=1_000_000)
+    parser.add_argument("--echantillon-boucle", type=int, default=50)
+    args = parser.parse_args()
+
+    colonnes = [f"Moyenne {n} j" for n in previsions.MOYENNES] + ["Consommation / jour"]
+    for nb_produits in args.produits:
+        produits, mouvements = generer(args.mouvements, nb_produits)
+        produits = schema.typer_produits(produits)
+        mouvements = schema.typer_mouvements(mouvements, produits)
+        jour = (mouvements["Date"].max() + pd.Timedelta(days=1)).date()
+
+        debut = time.perf_counter()
+        consommations = previsions.consommations(produits, mouvements, jour)
+        milieu = time.perf_counter()
+        resultat = previsions.projeter(consommations, jour)
+        fin = time.perf_counter()
+        vectorise = fin - debut
+        print(f"{nb_produits} produits, {args.mouvements} mouvements : "
+              f"consommations {(milieu - debut) * 1000:.1f} ms, "
+              f"projections {(fin - milieu) * 1000:.1f} ms, {int((resultat['À commander'] > 0).sum())} à commander")
+
+        echantillon = produits.iloc[:args.echantillon_boucle]
+        debut = time.perf_counter()
+        reference = np.array([par_produit(produit, mouvements, jour) for _, produit in echantillon.iterrows()])
+        boucle = (time.perf_counter() - debut) * nb_produits / len(echantillon)
+        print(f"  boucle par produit : {boucle:.1f} s (mesuré sur {len(echantillon)} produits, extrapolé), "
+              f"accélération x{boucle / vectorise:.0f}")
+        assert np.allclose(consommations[colonnes].to_numpy()[:len(echantillon)], reference)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Comparaison des recettes lues dans les agrégats avec l'ancienne implémentation.
+
+Usage : python benchmarks/bench_recettes.py [--mouvements 1000000] [--produits 500]
+
+Les recettes sont calculées comme par l'application et l'API : ventes agrégées
+par période et par identifiant de produit (agregats.lire_ventes), valorisées au
+prix courant (agregats.recettes), sur une base temporaire. L'ancienne
+implémentation (apply ligne par ligne et boucle iterrows sur le journal) est
+très lente sur 1M de mouvements ; --echantillon-ancien permet de la mesurer sur
+un sous-ensemble et d'extrapoler linéairement.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from donnees_synthetiques import ecrire_base, generer  # noqa: E402
+from wksdf import agregats, stockage  # noqa: E402
+
+
+# Ancienne implémentation, reprise telle quelle pour la comparaison
+def ancien_calculer_recettes(mouvements_df, produits_df, periode='jour'):
+    mouvements_df = mouvements_df.copy()
+    mouvements_df["Date"] = pd.to_datetime(mouvements_df["Date"])
+    sorties_df = mouvements_df[mouvements_df["Type"] == "Sortie"].copy()
+    sorties_df["Prix Unitaire"] = sorties_df.apply(
+        lambda row: produits_df.loc[produits_df["Nom Produit"] == row["Produit"], "Prix Unitaire"].values[0]
+        if not produits_df.loc[produits_df["Nom Produit"] == row["Produit"], "Prix Unitaire"].empty else 0,
+        axis=1
+    )
+    sorties_df["Montant"] = sorties_df["Quantité"] * sorties_df["Prix Unitaire"]
+    if periode == 'jour':
+        sorties_df["Période"] = sorties_df["Date"].dt.date
+    elif periode == 'mois':
+        sorties_df["Période"] = sorties_df["Date"].dt.to_period("M").dt.to_timestamp()
+    elif periode == 'année':
+        sorties_df["Période"] = sorties_df["Date"].dt.year
+    recettes_df = sorties_df.groupby("Période")["Montant"].sum().reset_index()
+    recettes_df.rename(columns={"Montant": "Recettes"}, inplace=True)
+    return recettes_df
+
+
+def ancien_total(mouvements_df, produits_df):
+    recettes = 0
+    for _, row in mouvements_df[mouvements_df["Type"] == "Sortie"].iterrows():
+        prix = produits_df.loc[produits_df["Nom Produit"] == row["Produit"], "Prix Unitaire"]
+        if not prix.empty:
+            recettes += prix.values[0] * row["Quantité"]
+    return recettes
+
+
+def ancien(mouvements_df, produits_df):
+    resultats = {"total": ancien_total(mouvements_df, produits_df)}
+    for periode in ("jour", "mois", "année"):
+        resultats[periode] = ancien_calculer_recettes(mouvements_df, produits_df, periode)
+    return resultats
+
+
+# Recettes par jour, mois et année lues dans les agrégats d'une base, et total (somme des années)
+def agregees(chemin, produits):
+    with stockage.ouvrir(chemin) as conn:
+        resultats = {periode: agregats.recettes(agregats.lire_ventes(conn, periode), produits, periode)
+                     for periode in agregats.GRANULARITES}
+    resultats["total"] = resultats["année"]["Recettes"].sum()
+    return resultats
+
+
+def chronometrer(fonction, *args):
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return time.perf_counter() - debut, resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mouvements", type=int, default=1_000_000)
+    parser.add_argument("--produits", type=int, default=500)
+    parser.add_argument("--echantillon-ancien", type=int, default=None,
+                        help="nombre de mouvements pour mesurer l'ancienne implémentation (extrapolée)")
+    args = parser.parse_args()
+
+    produits, mouvements = generer(args.mouvements, args.produits)
+    taille = min(args.echantillon_ancien or args.mouvements, args.mouvements)
+    echantillon = mouvements.iloc[:taille]
+    with tempfile.TemporaryDirectory() as dossier:
+        ecrire_base(os.path.join(dossier, "stock.db"), produits, mouvements)
+        duree_nouveau, _ = chronometrer(agregees, os.path.join(dossier, "stock.db"), produits)
+        print(f"Agrégats : {args.mouvements} mouvements, jour/mois/année + total en {duree_nouveau:.3f} s")
+
+        duree_ancien, reference = chronometrer(ancien, echantillon, produits)
+        extrapole = duree_ancien * args.mouvements / taille
+        suffixe = f" (mesuré sur {taille}, extrapolé)" if taille < args.mouvements else ""
+        print(f"Ancien   : {args.mouvements} mouvements en {extrapole:.3f} s{suffixe}")
+        print(f"Accélération : x{extrapole / duree_nouveau:.0f}")
+
+        # Vérification sur l'échantillon : agrégats d'une base qui ne contient que ces mouvements
+        ecrire_base(os.path.join(dossier, "echantillon.db"), produits, echantillon)
+        controle = agregees(os.path.join(dossier, "echantillon.db"), produits)
+    assert np.isclose(controle["total"], reference["total"])
+    for periode in ("jour", "mois", "année"):
+        assert np.allclose(controle[periode]["Recettes"], reference[periode]["Recettes"]), periode
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Mémoire et vitesse des DataFrames bruts (read_excel / SQL) face aux DataFrames typés.
+
+Usage : python benchmarks/bench_schema.py [--mouvements 1000000] [--produits 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from donnees_synthetiques import generer  # noqa: E402
+from wksdf import schema  # noqa: E402
+
+
+def memoire_mo(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def mesurer(fonction, repetitions=3):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return min(durees) * 1000
+
+
+# Opérations courantes de l'application ; les frames brutes doivent reconvertir la date à chaque fois
+def operations(mouvements, produit):
+    def dates():
+        return pd.to_datetime(mouvements["Date"])
+
+    return {
+        "filtre produit + 30 jours": lambda: mouvements[
+            (mouvements["Produit"] == produit) & (dates() >= dates().max() - pd.Timedelta(days=30))],
+        "filtre type": lambda: mouvements[mouvements["Type"] == "Sortie"],
+        "groupby jour x type": lambda: mouvements.groupby(
+            [dates().dt.normalize(), "Type"], observed=True)["Quantité"].sum(),
+        "groupby produit": lambda: mouvements.groupby("Produit", observed=True)["Quantité"].sum(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mouvements", type=int, default=1_000_000)
+    parser.add_argument("--produits", type=int, default=500)
+    args = parser.parse_args()
+
+    produits, mouvements = generer(args.mouvements, args.produits)
+    # Colonnes objet, comme à la sortie de read_excel
+    produits_bruts = produits.assign(**{"Date Ajout": "2024-01-01 10:00:00"}).astype(object)
+    mouvements_bruts = mouvements.astype(object)
+
+    debut = time.perf_counter()
+    produits_types = schema.typer_produits(produits_bruts)
+    mouvements_types = schema.typer_mouvements(mouvements_bruts, produits_types)
+    duree_typage = time.perf_counter() - debut
+
+    print(f"{args.mouvements} mouvements, {args.produits} produits (typage unique : {duree_typage:.2f} s)")
+    print(f"Mémoire mouvements : {memoire_mo(mouvements_bruts):.0f} Mo -> {memoire_mo(mouvements_types):.0f} Mo")
+    print(f"Mémoire produits   : {memoire_mo(produits_bruts):.2f} Mo -> {memoire_mo(produits_types):.2f} Mo")
+    avant = operations(mouvements_bruts, "Produit 7")
+    apres = operations(mouvements_types, "Produit 7")
+    for nom in avant:
+        print(f"- {nom} : {mesurer(avant[nom]):.0f} ms -> {mesurer(apres[nom]):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
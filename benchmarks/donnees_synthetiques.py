@@ -0,0 +1,130 @@
+"""Générateur de données de stock synthétiques, reproductibles à graine égale.
+
+Usage : python benchmarks/donnees_synthetiques.py [--produits 500] [--categories 8] [--mouvements 100000]
+        [--annees 5] [--graine 0] [--sortie data/stock_data.xlsx]
+
+Produit un classeur au format de l'application (feuilles Produits et
+Mouvements), importé automatiquement au premier lancement si la base n'existe
+pas encore. Les données suivent quelques traits d'un vrai magasin :
+- popularité des produits très inégale (loi de Zipf) ;
+- activité croissante au fil des années et plus forte en fin de semaine ;
+- sorties fréquentes et petites, réapprovisionnements rares et importants ;
+- journal trié par date, stock jamais négatif, quantité en stock égale au
+  stock initial plus le solde des mouvements.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from wksdf import stockage  # noqa: E402
+
+CATEGORIES = ["Céréales", "Épicerie", "Boissons", "Hygiène", "Conserves", "Produits laitiers", "Entretien",
+              "Condiments", "Boulangerie", "Fruits et légumes"]
+DEBUT = "2020-01-01"
+
+
+def _categories(nombre):
+    return CATEGORIES[:nombre] + [f"Catégorie {i}" for i in range(len(CATEGORIES), nombre)]
+
+
+# (produits, mouvements) aux colonnes du classeur ; les dates des mouvements sont des chaînes AAAA-MM-JJ
+def generer(nb_mouvements, nb_produits, nb_categories=4, annees=5, graine=0):
+    rng = np.random.default_rng(graine)
+    noms = np.array([f"Produit {i}" for i in range(nb_produits)])
+    prix = np.round(rng.lognormal(np.log(1000), 0.8, nb_produits) / 25) * 25
+
+    # Popularité de Zipf, attribuée aux produits dans un ordre aléatoire
+    popularite = 1 / np.arange(1, nb_produits + 1)
+    popularite = rng.permutation(popularite / popularite.sum())
+
+    # Jours pondérés : croissance linéaire de l'activité et week-ends plus chargés
+    debut = np.datetime64(DEBUT)
+    jours = np.arange(int(annees * 365))
+    poids_jours = (1 + jours / max(len(jours), 1)) * np.where((jours + 2) % 7 >= 5, 1.5, 1.0)
+    tirages = np.sort(rng.choice(jours, nb_mouvements, p=poids_jours / poids_jours.sum()))
+    dates = debut + tirages
+
+    sorties = rng.random(nb_mouvements) < 0.85
+    quantites = np.where(sorties, rng.integers(1, 10, nb_mouvements), rng.integers(20, 200, nb_mouvements))
+    produits_mvt = rng.choice(nb_produits, nb_mouvements, p=popularite)
+
+    # Stock initial juste suffisant pour que le solde ne passe jamais sous zéro, plus une réserve
+    variation = np.where(sorties, -quantites, quantites)
+    solde = pd.Series(variation).groupby(produits_mvt).cumsum().to_numpy()
+    minimum = pd.Series(solde).groupby(produits_mvt).min().reindex(range(nb_produits), fill_value=0).to_numpy()
+    initial = np.maximum(-minimum, 0) + rng.integers(0, 50, nb_produits)
+    final = initial + np.bincount(produits_mvt, weights=variation, minlength=nb_produits).astype("int64")
+
+    produits = pd.DataFrame({
+        "ID": np.arange(1, nb_produits + 1),
+        "Nom Produit": noms,
+        "Catégorie": rng.choice(_categories(nb_categories), nb_produits),
+        "Prix Unitaire": prix.astype("int64"),
+        "Quantité": final,
+        "Seuil Alerte": rng.integers(0, 20, nb_produits),
+        "Date Ajout": f"{DEBUT} 08:00:00",
+    })
+    mouvements = pd.DataFrame({
+        "ID": np.arange(1, nb_mouvements + 1),
+        "Date": pd.DatetimeIndex(dates).strftime("%Y-%m-%d"),
+        "Produit": noms[produits_mvt],
+        "Type": np.where(sorties, "Sortie", "Entrée"),
+        "Quantité": quantites,
+        "Commentaire": "",
+    })
+    return produits, mouvements
+
+
+# Classeur au format de l'application, écrit en mode write_only (mémoire bornée même à 1M de lignes)
+def ecrire_excel(chemin, produits, mouvements):
+    dossier = os.path.dirname(chemin)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    classeur = Workbook(write_only=True)
+    for titre, df in (("Produits", produits), ("Mouvements", mouvements)):
+        feuille = classeur.create_sheet(titre)
+        feuille.append(list(df.columns))
+        for ligne in df.astype(object).itertuples(index=False, name=None):
+            feuille.append(list(ligne))
+    classeur.save(chemin)
+
+
+# Base SQLite prête à l'emploi (plus rapide que de passer par le classeur)
+def ecrire_base(chemin, produits, mouvements):
+    with stockage.ouvrir(chemin) as conn:
+        stockage.remplir(conn, produits, mouvements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--produits", type=int, default=500)
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--mouvements", type=int, default=100_000)
+    parser.add_argument("--annees", type=float, default=5)
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--sortie", default=stockage.EXCEL_PATH,
+                        help="classeur .xlsx, ou base .db pour écrire directement la base SQLite")
+    args = parser.parse_args()
+
+    debut = time.perf_counter()
+    produits, mouvements = generer(args.mouvements, args.produits, args.categories, args.annees, args.graine)
+    if os.path.exists(args.sortie):
+        parser.error(f"{args.sortie} existe déjà")
+    if args.sortie.endswith(".db"):
+        ecrire_base(args.sortie, produits, mouvements)
+    else:
+        ecrire_excel(args.sortie, produits, mouvements)
+    print(f"{args.sortie} : {len(produits)} produits, {len(mouvements)} mouvements du "
+          f"{mouvements['Date'].iloc[0] if len(mouvements) else '-'} au "
+          f"{mouvements['Date'].iloc[-1] if len(mouvements) else '-'} ({time.perf_counter() - debut:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Test de charge multi-processus du chemin d'écriture.
+
+Usage : python benchmarks/stress_concurrence.py [--processus 8] [--mouvements 500] [--produits 5]
+
+Plusieurs processus enregistrent des mouvements en même temps sur une même
+base, la moitié via stockage directement, l'autre via DonneesPartagees (le
+cache de l'application). On vérifie ensuite qu'aucune mise à jour n'a été
+perdue : journal complet, identifiants uniques et croissants, stock final égal
+au stock initial plus les mouvements acceptés, jamais négatif, agrégats
+cohérents. Un second scénario lance des modifications concurrentes de la même
+fiche produit avec la même version lue : une seule doit aboutir.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from wksdf import agregats, stockage  # noqa: E402
+from wksdf.donnees import DonneesPartagees  # noqa: E402
+
+STOCK_INITIAL = 200
+
+
+def ecrivain(db_path, numero, nombre, noms, depart):
+    rng = random.Random(numero)
+    donnees = DonneesPartagees(db_path) if numero % 2 == 0 else None
+    acceptes, refuses = [], 0
+    depart.wait()
+    for _ in range(nombre):
+        produit = rng.choice(noms)
+        type_mvt = "Sortie" if rng.random() < 0.6 else "Entrée"
+        quantite = rng.randint(1, 5)
+        try:
+            if donnees is not None:
+                mouvement_id, _ = donnees.enregistrer_mouvement(produit, type_mvt, quantite)
+            else:
+                with stockage.ouvrir(db_path) as conn:
+                    mouvement_id, _ = stockage.enregistrer_mouvement(conn, produit, type_mvt, quantite)
+        except stockage.StockInsuffisant:
+            refuses += 1
+            continue
+        acceptes.append((mouvement_id, produit, type_mvt, quantite))
+    return acceptes, refuses
+
+
+def editeur(db_path, numero, version_lue, depart):
+    depart.wait()
+    with stockage.ouvrir(db_path) as conn:
+        try:
+            stockage.modifier_produit(conn, 1, "Produit 0", "Test", 100 + numero, STOCK_INITIAL, 0, version_lue)
+            return True
+        except stockage.ConflitVersion:
+            return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processus", type=int, default=8)
+    parser.add_argument("--mouvements", type=int, default=500, help="mouvements par processus")
+    parser.add_argument("--produits", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        db_path = os.path.join(dossier, "stock.db")
+        noms = [f"Produit {i}" for i in range(args.produits)]
+        with stockage.ouvrir(db_path) as conn:
+            for nom in noms:
+                stockage.ajouter_produit(conn, nom, "Test", 100, STOCK_INITIAL, 0)
+
+        with multiprocessing.Manager() as manager:
+            depart = manager.Barrier(args.processus)
+            with multiprocessing.Pool(args.processus) as pool:
+                debut = time.perf_counter()
+                resultats = pool.starmap(ecrivain, [
+                    (db_path, numero, args.mouvements, noms, depart) for numero in range(args.processus)])
+                duree = time.perf_counter() - debut
+
+        acceptes = [mouvement for lot, _ in resultats for mouvement in lot]
+        refuses = sum(refus for _, refus in resultats)
+        print(f"{args.processus} processus x {args.mouvements} mouvements en {duree:.1f} s "
+              f"({len(acceptes) + refuses} / {duree:.1f} = {(len(acceptes) + refuses) / duree:.0f} écritures/s) : "
+              f"{len(acceptes)} acceptés, {refuses} refusés pour stock insuffisant")
+
+        with stockage.ouvrir(db_path) as conn:
+            produits, mouvements = stockage.charger(conn)
+            ids = [mouvement[0] for mouvement in acceptes]
+            assert len(set(ids)) == len(ids), "identifiants de mouvement en double"
+            assert sorted(ids) == mouvements["ID"].tolist(), "mouvements perdus ou fantômes dans le journal"
+            assert mouvements["ID"].is_monotonic_increasing
+            for nom in noms:
+                attendu = STOCK_INITIAL + sum(q if t == "Entrée" else -q for _, p, t, q in acceptes if p == nom)
+                final = produits.loc[produits["Nom Produit"] == nom, "Quantité"].iloc[0]
+                assert final == attendu, (nom, final, attendu)
+                assert final >= 0, (nom, final)
+            assert agregats.verifier(conn).empty, "agrégats incohérents avec le journal"
+            assert stockage.version(conn) == len(noms) + len(acceptes)
+
+        # Cache d'un autre processus : doit voir exactement l'état de la base
+        cache_produits, cache_mouvements = DonneesPartagees(db_path).obtenir()
+        assert len(cache_mouvements) == len(acceptes)
+        assert cache_produits["Quantité"].tolist() == produits["Quantité"].tolist()
+
+        # Modifications concurrentes de la même fiche avec la même version lue
+        with stockage.ouvrir(db_path) as conn:
+            version_lue = stockage.versions_produits(conn)[1]
+        with multiprocessing.Manager() as manager:
+            depart = manager.Barrier(args.processus)
+            with multiprocessing.Pool(args.processus) as pool:
+                succes = pool.starmap(editeur, [
+                    (db_path, numero, version_lue, depart) for numero in range(args.processus)])
+        assert sum(succes) == 1, succes
+        print(f"Modification concurrente d'une fiche : 1 succès, {len(succes) - 1} conflits détectés")
+        print("OK : aucune mise à jour perdue")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Suite de benchmarks reproductible des chemins critiques, résultats en JSON.
+
+Usage : python benchmarks/suite.py [--tailles 10000 100000 1000000] [--produits 500] [--graine 0]
+        [--sortie resultats.json] [--reference ancien.json --seuil 1.25] [--excel]
+
+Pour chaque taille, une base temporaire est remplie avec les données de
+donnees_synthetiques.py, puis chaque opération est chronométrée sans
+interface (pas de Streamlit) :
+- chargement : load_data à froid, rattrapage après une écriture externe ;
+- écritures : mouvement unitaire, modification de fiche, import de 1000 lignes ;
+- recettes par jour, mois et année (agrégats) et reconstruction des agrégats depuis le journal ;
+- agrégations du tableau de bord et réduction des séries des graphiques ;
+- filtre de l'historique (comptage, première page, page suivante) ;
+- stock à une date passée (tous les produits) et série journalière d'un produit ;
+- exports CSV et Excel (générés à froid) ;
+- avec --excel, migration depuis un classeur stock_data.xlsx.
+
+Le JSON contient le contexte (versions, machine, commit) et, pour chaque
+opération, la meilleure durée et la médiane. Avec --reference, chaque durée
+est comparée à un fichier précédent ; le code de sortie vaut 1 si une
+opération est plus lente que seuil x la référence.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from donnees_synthetiques import ecrire_base, ecrire_excel, generer  # noqa: E402
+from wksdf import agregats, exports, graphiques, historique, instantanes, stockage  # noqa: E402
+from wksdf.donnees import DonneesPartagees  # noqa: E402
+
+TAILLES = [10_000, 100_000, 1_000_000]
+
+
+def chronometrer(fonction, repetitions=5, preparer=None):
+    durees = []
+    for _ in range(repetitions):
+        if preparer is not None:
+            preparer()
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return {"secondes": min(durees), "mediane": statistics.median(durees), "repetitions": repetitions}
+
+
+def contexte(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.platform(),
+        "processeurs": os.cpu_count(),
+        "produits": args.produits,
+        "graine": args.graine,
+    }
+
+
+# Lot d'import réaliste : entrées sur les produits existants, dates récentes
+def lot_import(produits, taille, graine):
+    rng = np.random.default_rng(graine)
+    return pd.DataFrame({
+        "Date": "",
+        "Produit": rng.choice(produits["Nom Produit"].to_numpy(), taille),
+        "Type": "Entrée",
+        "Quantité": rng.integers(1, 50, taille),
+        "Commentaire": "benchmark",
+    })
+
+
+def operations(db_path, dossier, produits_generes, args):
+    resultats = {}
+    donnees = DonneesPartagees(db_path, os.path.join(dossier, "absent.xlsx"))
+
+    # Chargement
+    resultats["chargement.load_data"] = chronometrer(
+        lambda: DonneesPartagees(db_path, os.path.join(dossier, "absent.xlsx")).obtenir(), repetitions=3)
+    donnees.obtenir()
+    produit = produits_generes["Nom Produit"].iloc[0]
+
+    def ecriture_externe():
+        with stockage.ouvrir(db_path) as conn:
+            stockage.enregistrer_mouvement(conn, produit, "Entrée", 1)
+
+    resultats["chargement.rattrapage"] = chronometrer(donnees.obtenir, preparer=ecriture_externe)
+
+    # Écritures
+    resultats["ecriture.mouvement"] = chronometrer(
+        lambda: donnees.enregistrer_mouvement(produit, "Entrée", 1, "benchmark"), repetitions=50)
+    resultats["ecriture.application_en_memoire"] = chronometrer(
+        donnees.obtenir, preparer=lambda: donnees.enregistrer_mouvement(produit, "Entrée", 1))
+    produits, _ = donnees.obtenir()
+    fiche = produits.iloc[0]
+    resultats["ecriture.modifier_produit"] = chronometrer(lambda: donnees.modifier_produit(
+        int(fiche["ID"]), fiche["Nom Produit"], fiche["Catégorie"], int(fiche["Prix Unitaire"]),
+        int(fiche["Quantité"]) + 1000, int(fiche["Seuil Alerte"])))
+    lot = lot_import(produits, 1000, args.graine)
+    resultats["ecriture.import_1000"] = chronometrer(lambda: donnees.importer_mouvements(lot), repetitions=3)
+
+    produits, mouvements = donnees.obtenir()
+    with stockage.ouvrir(db_path) as conn:
+        # Recettes et tableau de bord : calculs exécutés à chaque changement de version
+        for periode in agregats.GRANULARITES:
+            resultats[f"recettes.{periode}"] = chronometrer(
+                lambda: agregats.recettes(agregats.lire_ventes(conn, periode), produits, periode))
+            resultats[f"tableau_de_bord.mouvements.{periode}"] = chronometrer(
+                lambda: agregats.lire_mouvements(conn, periode))
+            serie_recettes = agregats.recettes(agregats.lire_ventes(conn, periode), produits, periode)
+            serie_mouvements = agregats.lire_mouvements(conn, periode)
+            resultats[f"graphique.recettes.{periode}"] = chronometrer(
+                lambda: graphiques.reduire(serie_recettes, "Période", "Recettes"))
+            resultats[f"graphique.mouvements.{periode}"] = chronometrer(
+                lambda: graphiques.reduire(serie_mouvements, "Date", "Quantité", par="Type"))
+        resultats["agregats.reconstruction"] = chronometrer(
+            lambda: stockage.reconstruire_agregats(conn), repetitions=3)
+        resultats["tableau_de_bord.indicateurs"] = chronometrer(lambda: (
+            produits["Quantité"].sum(), produits[produits["Quantité"] <= produits["Seuil Alerte"]]))
+        resultats["tableau_de_bord.categories"] = chronometrer(
+            lambda: produits.groupby("Catégorie", observed=True)["Quantité"].sum().reset_index())
+
+        # Historique : 30 derniers jours, tous produits puis un produit
+        fin = date.fromisoformat(conn.execute("SELECT MAX(date) FROM mouvements").fetchone()[0])
+        for nom, criteres in (("tous", {}), ("produit", {"produit_id": int(produits_generes["ID"].iloc[0])})):
+            criteres = dict(criteres, debut=fin - timedelta(days=30), fin=fin)
+            resultats[f"historique.{nom}.comptage"] = chronometrer(
+                lambda: historique.compter_mouvements(conn, **criteres))
+            resultats[f"historique.{nom}.premiere_page"] = chronometrer(
+                lambda: historique.page_mouvements(conn, **criteres))
+            _, suivant = historique.page_mouvements(conn, **criteres)
+            if suivant is not None:
+                resultats[f"historique.{nom}.page_suivante"] = chronometrer(
+                    lambda: historique.page_mouvements(conn, apres=suivant, **criteres))
+
+        # Stock passé : milieu de l'historique (instantané suivant + journal) et série du produit modifié plus haut
+        milieu = conn.execute("SELECT date FROM mouvements ORDER BY id LIMIT 1 OFFSET ?",
+                              (len(mouvements) // 2,)).fetchone()[0]
+        resultats["stock.a_date"] = chronometrer(lambda: instantanes.stock_a_date(conn, milieu))
+        produit_id = int(fiche["ID"])
+        resultats["stock.serie_produit"] = chronometrer(lambda: instantanes.serie_stock(conn, produit_id))
+
+    # Exports générés à froid (dossier vidé avant chaque mesure)
+    dossier_exports = os.path.join(dossier, "exports")
+
+    def vider_exports():
+        for fichier in os.listdir(dossier_exports) if os.path.exists(dossier_exports) else []:
+            os.remove(os.path.join(dossier_exports, fichier))
+
+    repetitions_excel = 1 if len(mouvements) > 200_000 else 3
+    for nom, exporter, repetitions in (
+            ("export.produits_csv", exports.produits_csv, 3),
+            ("export.mouvements_csv", exports.mouvements_csv, 3),
+            ("export.excel", exports.donnees_excel, repetitions_excel),
+            ("export.rapport_excel_mois", lambda db, d: exports.rapport_excel(db, "mois", d), repetitions_excel)):
+        resultats[nom] = chronometrer(lambda: exporter(db_path, dossier_exports), repetitions, vider_exports)
+    return resultats
+
+
+def executer(taille, args):
+    produits, mouvements = generer(taille, args.produits, graine=args.graine)
+    with tempfile.TemporaryDirectory() as dossier:
+        db_path = os.path.join(dossier, "stock.db")
+        debut = time.perf_counter()
+        ecrire_base(db_path, produits, mouvements)
+        resultats = {"preparation.base": {"secondes": time.perf_counter() - debut, "repetitions": 1}}
+        if args.excel:
+            excel_path = os.path.join(dossier, "stock_data.xlsx")
+            ecrire_excel(excel_path, produits, mouvements)
+
+            def migration():
+                with stockage.ouvrir(os.path.join(dossier, "migration.db")) as conn:
+                    stockage.initialiser(conn, excel_path)
+
+            resultats["chargement.migration_excel"] = chronometrer(migration, repetitions=1)
+        resultats.update(operations(db_path, dossier, produits, args))
+    return [dict(mouvements=taille, operation=nom, **mesure) for nom, mesure in resultats.items()]
+
+
+def comparer(resultats, reference, seuil):
+    anciens = {(r["mouvements"], r["operation"]): r["secondes"] for r in reference["resultats"]}
+    regressions = []
+    for resultat in resultats:
+        cle = (resultat["mouvements"], resultat["operation"])
+        if cle not in anciens or anciens[cle] <= 0:
+            continue
+        rapport = resultat["secondes"] / anciens[cle]
+        marque = ""
+        if rapport > seuil:
+            regressions.append(cle)
+            marque = "  <-- régression"
+        print(f"{cle[0]:>9} {cle[1]:<40} {anciens[cle] * 1000:10.2f} ms -> {resultat['secondes'] * 1000:10.2f} ms "
+              f"(x{rapport:.2f}){marque}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES, help="nombres de mouvements")
+    parser.add_argument("--produits", type=int, default=500)
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--excel", action="store_true", help="mesurer aussi la migration depuis un classeur")
+    parser.add_argument("--sortie", help="fichier JSON de résultats (sinon sortie standard)")
+    parser.add_argument("--reference", help="fichier JSON d'une exécution précédente à comparer")
+    parser.add_argument("--seuil", type=float, default=1.25, help="rapport de durée signalé comme régression")
+    args = parser.parse_args()
+
+    resultats = []
+    for taille in args.tailles:
+        debut = time.perf_counter()
+        resultats.extend(executer(taille, args))
+        print(f"{taille} mouvements mesurés en {time.perf_counter() - debut:.0f} s", file=sys.stderr)
+    rapport = {"contexte": contexte(args), "resultats": resultats}
+
+    texte = json.dumps(rapport, indent=2, ensure_ascii=False)
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            f.write(texte + "\n")
+    else:
+        print(texte)
+
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as f:
+            regressions = comparer(resultats, json.load(f), args.seuil)
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de x{args.seuil}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Ressources partagées par les pages : données, tâches de fond et composants communs."""
+import os
+
+import streamlit as st
+
+from wksdf import alertes, exports, mesures, stockage, taches
+from wksdf.donnees import DonneesPartagees
+
+# Chemins vers la base de stock et l'ancien fichier Excel (migré au premier lancement)
+db_path = stockage.DB_PATH
+excel_path = stockage.EXCEL_PATH
+
+
+# Données partagées par toutes les sessions du processus (une seule copie en mémoire),
+# avec les notificateurs d'alerte configurés (fichier data/alertes.jsonl, webhook)
+@st.cache_resource
+def donnees_partagees():
+    donnees = DonneesPartagees(db_path, excel_path)
+    for notificateur in alertes.notificateurs_configures():
+        donnees.alertes.abonner(notificateur)
+    return donnees
+
+
+# Tâches de fond partagées par toutes les sessions (exports et rapports lourds)
+@st.cache_resource
+def taches_partagees():
+    return taches.GestionnaireTaches()
+
+
+# Chargement des données
+@mesures.instrumenter("app.load_data", lignes=lambda donnees: len(donnees[1]))
+def load_data():
+    return donnees_partagees().obtenir()
+
+
+# Plage affichée d'une série journalière (curseur de dates) ; (None, None) pour tout l'historique
+def plage_affichee(dates, cle):
+    if len(dates) < 2:
+        return None, None
+    premiere, derniere = min(dates), max(dates)
+    debut, fin = st.slider("Plage affichée", min_value=premiere, max_value=derniere, value=(premiere, derniere),
+                           format="DD/MM/YYYY", key=cle)
+    if (debut, fin) == (premiere, derniere):
+        return None, None
+    return debut, fin
+
+
+# Sélecteur de produit par identifiant ; un nom en double est suivi de son identifiant
+def choisir_produit(catalogue, libelle, **options):
+    return st.selectbox(
+        libelle, catalogue.produits["ID"].tolist(),
+        format_func=lambda i: catalogue.nom(i) if catalogue.nom(i) not in catalogue.doublons
+        else f"{catalogue.nom(i)} (#{i})", **options)
+
+
+# Export préparé en tâche de fond : bouton de lancement, avancement, puis téléchargement du fichier.
+# Une demande identique (même export, mêmes données) depuis une autre session reprend la même tâche.
+def export_en_tache(libelle, nom_fichier, mime, exporter, *args):
+    donnees = donnees_partagees()
+    donnees.obtenir()
+    cle = (exporter.__name__, *args, donnees.version)
+    gestionnaire = taches_partagees()
+    tache = gestionnaire.trouver(cle)
+    if tache is not None and tache.etat == taches.TERMINEE and not os.path.exists(tache.resultat):
+        # Fichier supprimé depuis (purge du dossier d'exports) : à refaire
+        gestionnaire.oublier(tache)
+        tache = None
+    if tache is None or tache.etat == taches.ECHEC:
+        if tache is not None:
+            st.error(f"❌ Échec de la préparation ({tache.erreur}).")
+        if not st.button(f"⚙️ Préparer : {libelle}", key=f"preparer_{nom_fichier}"):
+            return
+        nom = ".".join([exporter.__name__, *map(str, args)])
+        tache = gestionnaire.soumettre(cle, nom, exporter, db_path, *args)
+
+    # Rafraîchi chaque seconde tant que la tâche tourne, sans réexécuter le reste de la page
+    def suivre(active):
+        if tache.active:
+            st.progress(tache.avancement, text=f"{libelle} : {tache.etape or tache.etat}")
+        elif active:
+            st.rerun()
+        elif tache.etat == taches.TERMINEE:
+            st.download_button(label=f"📥 Télécharger {libelle}", data=lambda: exports.lire(tache.resultat),
+                               file_name=nom_fichier, mime=mime, key=f"telecharger_{nom_fichier}")
+        else:
+            st.error(f"❌ Échec de la préparation ({tache.erreur}).")
+
+    st.fragment(suivre, run_every=1 if tache.active else None)(tache.active)
+
+
+# Badge des produits en alerte (barre latérale), relu périodiquement pour suivre les autres sessions
+@st.fragment(run_every=30)
+def badge_alertes():
+    donnees = donnees_partagees()
+    en_alerte = donnees.produits_en_alerte()
+    if en_alerte.empty:
+        st.caption("🔔 Aucun produit en alerte")
+        return
+    depuis = donnees.alertes_depuis()
+    with st.expander(f"🔔 {len(en_alerte)} produit(s) en alerte"):
+        premiers = en_alerte.head(20)
+        for produit_id, nom, quantite, seuil in zip(premiers["ID"], premiers["Nom Produit"], premiers["Quantité"],
+                                                    premiers["Seuil Alerte"]):
+            st.caption(f"**{nom}** : {quantite} / {seuil} (depuis le {depuis[produit_id]})")
+        if len(en_alerte) > 20:
+            st.caption(f"… et {len(en_alerte) - 20} autre(s), voir le tableau de bord.")
@@ -0,0 +1,112 @@
+"""Page de connexion, sessions retrouvées après rechargement et déconnexion."""
+import os
+
+import streamlit as st
+
+from wksdf import mesures
+from wksdf.utilisateurs import CompteBloque, Utilisateurs
+
+# Cookie du navigateur portant le jeton de session (jamais l'adresse de la page)
+COOKIE_SESSION = "wksdf_session"
+
+
+# Comptes chargés une fois pour tout le processus (relus si le fichier change)
+@st.cache_resource
+def utilisateurs_partages():
+    return Utilisateurs()
+
+
+def _ouvrir(nom, role, jeton):
+    st.session_state.authenticated = True
+    st.session_state.role = role
+    st.session_state.utilisateur = nom
+    st.session_state.jeton = jeton
+
+
+# Cookie de session (sans date d'expiration : effacé à la fermeture du navigateur), écrit par un script de la
+# page ; un jeton vide l'efface
+def _ecrire_cookie(jeton):
+    effacement = "; max-age=0" if not jeton else ""
+    st.html(f"<script>document.cookie = '{COOKIE_SESSION}={jeton}; path=/; SameSite=Strict{effacement}'"
+            " + (location.protocol === 'https:' ? '; Secure' : '');</script>", unsafe_allow_javascript=True)
+
+
+# Session en cours prolongée à chaque exécution, ou reprise après un rechargement de la page depuis le cookie
+# envoyé par le navigateur ; le jeton n'expire qu'après DUREE_INACTIVITE sans utilisation
+def restaurer_session():
+    if st.session_state.get("authenticated"):
+        session = utilisateurs_partages().session(st.session_state.jeton)
+        if session is None:
+            deconnecter()
+            st.warning("⌛ Session expirée après une période d'inactivité. Veuillez vous reconnecter.")
+            return False
+        _ouvrir(*session, st.session_state.jeton)
+        if not st.session_state.get("cookie_ecrit"):
+            _ecrire_cookie(st.session_state.jeton)
+            st.session_state.cookie_ecrit = True
+        return True
+    # Cookies lus à l'ouverture de la page : après une déconnexion, celui-ci porte un jeton déjà fermé ; sans
+    # navigateur (AppTest), la valeur n'est pas une chaîne
+    jeton = st.context.cookies.get(COOKIE_SESSION)
+    if not isinstance(jeton, str) or not jeton:
+        return False
+    session = utilisateurs_partages().session(jeton)
+    if session is None:
+        _ecrire_cookie("")
+        return False
+    _ouvrir(*session, jeton)
+    st.session_state.cookie_ecrit = True
+    return True
+
+
+def deconnecter():
+    jeton = st.session_state.get("jeton")
+    if jeton:
+        utilisateurs_partages().fermer_session(jeton)
+    st.session_state.authenticated = False
+    st.session_state.role = None
+    st.session_state.jeton = None
+    st.session_state.cookie_ecrit = False
+
+
+def afficher():
+    st.title("📦 Wakeur Sokhna Daba Falilou - Connexion")
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        # Vérifier si le logo existe, sinon utiliser une image par défaut
+        if os.path.exists("logo/wksdf.png"):
+            st.image("logo/wksdf.png", width=150)
+        else:
+            # Créer le répertoire logo s'il n'existe pas
+            if not os.path.exists("logo"):
+                os.makedirs("logo")
+            st.warning("Logo non trouvé. Veuillez placer votre logo à 'logo/wksdf.png'")
+            st.image("https://www.svgrepo.com/show/526049/security-safe.svg", width=150)
+
+    with col2:
+        username = st.text_input("Nom d'utilisateur")
+        password = st.text_input("Mot de passe", type="password")
+
+        login_button = st.button("Connexion")
+
+        if login_button:
+            utilisateurs = utilisateurs_partages()
+            try:
+                with mesures.mesurer("connexion.authentifier"):
+                    role = utilisateurs.authentifier(username, password)
+            except CompteBloque as e:
+                st.error(f"⛔ Trop de tentatives échouées. Réessayez dans {e.restant / 60:.0f} min.")
+                role = None
+            else:
+                if role:
+                    jeton = utilisateurs.ouvrir_session(username)
+                    _ouvrir(username, role, jeton)
+                    st.success(f"✅ Bienvenue {username} ! Vous êtes connecté en tant que {role}.")
+                    st.rerun()
+                else:
+                    st.error("❌ Nom d'utilisateur ou mot de passe incorrect.")
+
+    st.markdown("---")
+    st.info("Veuillez vous connecter pour accéder à l'application de gestion de stock.")
@@ -0,0 +1,30 @@
+"""Page Exportation : fichiers préparés en tâche de fond."""
+import streamlit as st
+
+from vues.commun import donnees_partagees, export_en_tache
+from wksdf import exports
+
+
+def afficher():
+    st.header("📁 Exporter les données")
+
+    st.caption("Les fichiers sont préparés en arrière-plan : vous pouvez continuer à naviguer pendant ce temps.")
+
+    export_en_tache("Produits (CSV)", "produits.csv", "text/csv", exports.produits_csv)
+    export_en_tache("Mouvements (CSV)", "mouvements.csv", "text/csv", exports.mouvements_csv)
+
+    # Exporter tout en Excel
+    export_en_tache("toutes les données (Excel)", "donnees_stock_complet.xlsx",
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", exports.donnees_excel)
+
+    # Options d'exportation avancées
+    st.subheader("Exportation avancée")
+
+    periode_export = st.selectbox("Période pour les recettes", ["jour", "mois", "année"])
+    recettes_df = donnees_partagees().recettes_par_periode(periode_export)
+
+    if not recettes_df.empty:
+        export_en_tache(f"rapport complet avec recettes par {periode_export} (Excel)",
+                        f"rapport_complet_{periode_export}.xlsx",
+                        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        exports.rapport_excel, periode_export)
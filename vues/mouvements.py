@@ -0,0 +1,104 @@
+"""Page Entrée / Sortie : saisie, import en masse et historique des mouvements."""
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from vues.commun import db_path, donnees_partagees, load_data
+from wksdf import historique, import_masse, stockage
+
+
+def afficher():
+    st.header("➕ Entrée / ➖ Sortie")
+    produits_df = load_data()[0]
+    catalogue = donnees_partagees().obtenir_catalogue()
+
+    st.subheader("Ajouter un mouvement")
+    with st.form("mvt_form"):
+        type_mvt = st.selectbox("Type de mouvement", ["Entrée", "Sortie"])
+        produit_options = produits_df["Nom Produit"].tolist() if not produits_df.empty else []
+        produit = st.selectbox("Produit", produit_options) if produit_options else st.text_input(
+            "Produit (aucun produit disponible)")
+        quantite = st.number_input("Quantité", min_value=1)
+        commentaire = st.text_input("Commentaire")
+        submitted = st.form_submit_button("Valider")
+
+        if submitted and produit in catalogue:
+            try:
+                donnees_partagees().enregistrer_mouvement(produit, type_mvt, quantite, commentaire)
+            except stockage.StockInsuffisant as e:
+                st.error(f"⚠️ Stock insuffisant ! Il ne reste que {e.disponible} unités du produit {produit}.")
+                st.stop()
+
+            produits_df = load_data()[0]
+            st.success("✅ Mouvement enregistré avec succès.")
+
+    st.subheader("📥 Import en masse (CSV / Excel)")
+    st.caption("Colonnes attendues : Date (facultative, AAAA-MM-JJ), Produit, Type (Entrée ou Sortie), Quantité, "
+               "Commentaire (facultatif). Les lignes sont appliquées dans l'ordre du fichier.")
+    st.download_button(
+        label="📄 Télécharger le modèle (CSV)",
+        data=import_masse.modele_csv(),
+        file_name="modele_mouvements.csv",
+        mime="text/csv"
+    )
+    with st.form("import_form", clear_on_submit=True):
+        fichier = st.file_uploader("Fichier de mouvements", type=["csv", "xlsx"])
+        importer = st.form_submit_button("Importer")
+
+        if importer and fichier is not None:
+            try:
+                lot = import_masse.lire_fichier(fichier)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                acceptes, rejetes = donnees_partagees().importer_mouvements(lot)
+                produits_df = load_data()[0]
+                if not acceptes.empty:
+                    st.success(f"✅ {len(acceptes)} mouvement(s) importé(s) en une seule opération.")
+                if not rejetes.empty:
+                    st.warning(f"⚠️ {len(rejetes)} ligne(s) rejetée(s) :")
+                    st.dataframe(rejetes)
+
+    st.subheader("📜 Historique des mouvements")
+
+    # Filtres pour l'historique
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        filtre_type = st.selectbox("Filtrer par type", ["Tous", "Entrée", "Sortie"])
+
+    with col2:
+        produits_liste = ["Tous"] + produits_df["Nom Produit"].unique().tolist()
+        filtre_produit = st.selectbox("Filtrer par produit", produits_liste)
+
+    with col3:
+        date_debut = st.date_input("Date de début", datetime.now() - timedelta(days=30))
+        date_fin = st.date_input("Date de fin", datetime.now())
+
+    taille_page = st.selectbox("Mouvements par page", [25, 50, 100, 500], index=1)
+
+    # Pagination par curseur : on garde la pile des curseurs des pages déjà vues
+    filtres = (filtre_type, filtre_produit, date_debut, date_fin, taille_page)
+    if st.session_state.get("historique_filtres") != filtres:
+        st.session_state.historique_filtres = filtres
+        st.session_state.historique_curseurs = [None]
+    curseurs = st.session_state.historique_curseurs
+
+    with stockage.ouvrir(db_path) as conn:
+        criteres = dict(type_mvt=None if filtre_type == "Tous" else filtre_type,
+                        produit_id=None if filtre_produit == "Tous" else catalogue.id_de(filtre_produit),
+                        debut=date_debut, fin=date_fin)
+        total = historique.compter_mouvements(conn, **criteres)
+        page, suivant = historique.page_mouvements(conn, limite=taille_page, apres=curseurs[-1], **criteres)
+
+    st.dataframe(page)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    numero_page = len(curseurs)
+    nb_pages = max(1, -(-total // taille_page))
+    col2.caption(f"Page {numero_page} / {nb_pages} — {total} mouvement(s)")
+    if col1.button("⬅️ Page précédente", disabled=numero_page == 1):
+        curseurs.pop()
+        st.rerun()
+    if col3.button("Page suivante ➡️", disabled=suivant is None):
+        curseurs.append(suivant)
+        st.rerun()
@@ -0,0 +1,59 @@
+"""Page d'administration : mesures de performance et tâches de fond."""
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from vues.commun import taches_partagees
+from wksdf import mesures
+
+
+def afficher():
+    st.header("⏱️ Performance")
+
+    if st.session_state.role == "admin":
+        actives = st.toggle("Activer les mesures", value=mesures.actif(),
+                            help="Mesures partagées par toutes les sessions du serveur. Désactivées, elles ne "
+                                 "coûtent qu'un test par opération.")
+        if actives != mesures.actif():
+            mesures.activer(actives)
+            st.rerun()
+
+        resume = mesures.resume()
+        if resume.empty:
+            st.info("Aucune mesure enregistrée. Activez les mesures puis naviguez dans l'application.")
+        else:
+            st.subheader("Temps par opération")
+            st.dataframe(resume.style.format(precision=1, na_rep=""))
+
+            st.subheader("Dernières mesures")
+            st.dataframe(mesures.dernieres(100).style.format(precision=1, na_rep=""))
+
+            col1, col2 = st.columns(2)
+            col1.download_button(
+                label="📥 Télécharger les mesures (Prometheus)",
+                data=mesures.prometheus,
+                file_name="mesures.prom",
+                mime="text/plain"
+            )
+            if col2.button("🧹 Remettre les compteurs à zéro"):
+                mesures.reinitialiser()
+                st.rerun()
+        st.subheader("Tâches de fond")
+        liste_taches = taches_partagees().taches()
+        if liste_taches:
+            st.dataframe(pd.DataFrame([{
+                "Tâche": tache.nom,
+                "État": tache.etat,
+                "Avancement (%)": round(100 * tache.avancement),
+                "Soumise": datetime.fromtimestamp(tache.soumise).strftime("%H:%M:%S"),
+                "Durée (s)": tache.duree(),
+                "Erreur": tache.erreur,
+            } for tache in liste_taches]).style.format(precision=1, na_rep=""), hide_index=True)
+        else:
+            st.info("Aucune tâche de fond depuis le démarrage du serveur.")
+
+        st.caption(f"Le fichier {mesures.PROMETHEUS_PATH} est réécrit à chaque rendu tant que les mesures sont "
+                   "actives ; chaque mesure est aussi journalisée en JSON par le logger « wksdf.mesures ».")
+    else:
+        st.error("⛔ Accès refusé. Vous devez être administrateur pour accéder à cette page.")
@@ -0,0 +1,68 @@
+"""Page Produits : liste, ajout et modification des fiches."""
+from datetime import datetime
+
+import streamlit as st
+
+from vues.commun import choisir_produit, db_path, donnees_partagees, load_data
+from wksdf import stockage
+
+
+def afficher():
+    st.header("📦 Liste des Produits")
+    st.dataframe(load_data()[0])
+    catalogue = donnees_partagees().obtenir_catalogue()
+    if catalogue.doublons:
+        st.warning(f"⚠️ Plusieurs produits portent le même nom : {', '.join(catalogue.doublons)}. "
+                   "Les mouvements sur ces noms s'appliquent au premier ; renommez les autres.")
+
+    st.subheader("➕ Ajouter un produit")
+    with st.form("add_product_form"):
+        nom = st.text_input("Nom du produit", key="add_nom")
+        cat = st.text_input("Catégorie", key="add_cat")
+        prix = st.number_input("Prix unitaire", min_value=0, key="add_prix")
+        quantite = st.number_input("Quantité", min_value=0, key="add_quantite")
+        seuil = st.number_input("Seuil d'alerte", min_value=0, key="add_seuil")
+        submitted = st.form_submit_button("Ajouter")
+
+        if submitted and nom:
+            date_ajout = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            try:
+                donnees_partagees().ajouter_produit(nom, cat, prix, quantite, seuil, date_ajout)
+            except stockage.NomEnDouble:
+                st.error(f"❌ Un produit nommé '{nom}' existe déjà.")
+                st.stop()
+            st.success(f"✅ Produit '{nom}' ajouté avec succès.")
+            
+            # Réinitialiser le formulaire après ajout
+            st.session_state["add_nom"] = ""
+            st.session_state["add_cat"] = ""
+            st.session_state["add_prix"] = 0
+            st.session_state["add_quantite"] = 0
+            st.session_state["add_seuil"] = 0
+
+    st.subheader("✏️ Modifier un produit")
+    with st.form("edit_product_form"):
+        catalogue = donnees_partagees().obtenir_catalogue()
+        produit_id = choisir_produit(catalogue, "Sélectionner un produit à modifier")
+        produit_to_edit = catalogue.nom(produit_id) if produit_id is not None else None
+        nom = st.text_input("Nom du produit", key="edit_nom", value=produit_to_edit)
+        cat = st.text_input("Catégorie", key="edit_cat")
+        prix = st.number_input("Prix unitaire", min_value=0, key="edit_prix")
+        quantite = st.number_input("Quantité", min_value=0, key="edit_quantite")
+        seuil = st.number_input("Seuil d'alerte", min_value=0, key="edit_seuil")
+        submitted = st.form_submit_button("Modifier")
+
+        if submitted and produit_to_edit:
+            # Version de la fiche telle qu'affichée au rendu précédent
+            version_vue = st.session_state.get("versions_produits", {}).get(produit_id)
+            try:
+                donnees_partagees().modifier_produit(produit_id, nom, cat, prix, quantite, seuil, version_vue)
+                st.success(f"✅ Produit '{produit_to_edit}' modifié avec succès.")
+            except stockage.ConflitVersion:
+                st.error(f"⚠️ Le produit '{produit_to_edit}' a été modifié par un autre utilisateur entre-temps. "
+                         "Vérifiez ses nouvelles valeurs puis recommencez.")
+            except stockage.NomEnDouble:
+                st.error(f"❌ Un autre produit s'appelle déjà '{nom}'.")
+
+    with stockage.ouvrir(db_path) as conn:
+        st.session_state.versions_produits = stockage.versions_produits(conn)
@@ -0,0 +1,103 @@
+"""Page d'administration : remise à zéro, purge, cohérence des agrégats et archivage des mouvements."""
+import streamlit as st
+
+from vues import commun
+from vues.commun import donnees_partagees, taches_partagees
+from wksdf import archives, stockage, taches
+
+
+# Réinitialisation du stock
+def initialiser_stock():
+    donnees_partagees().reinitialiser_stock()
+    st.success("✅ Le stock a été réinitialisé avec succès.")
+
+
+# Purger toutes les données
+def purger_donnees():
+    donnees_partagees().purger()
+    st.success("✅ Toutes les données ont été purgées avec succès.")
+
+
+# Archivage des mois anciens en tâche de fond : lancement, avancement puis bilan
+def archivage():
+    st.subheader("🗄️ Archives des mouvements")
+    partitions = donnees_partagees().partitions_archivees()
+    if partitions.empty:
+        st.info("Aucun mouvement archivé : tout l'historique est dans le journal courant.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Partitions", len(partitions))
+        col2.metric("Mouvements archivés", int(partitions["lignes"].sum()))
+        col3.metric("Période archivée", f"{partitions['date_min'].min()} → {partitions['date_max'].max()}")
+        st.dataframe(partitions, hide_index=True)
+
+    retention = st.number_input("Mois gardés dans le journal courant (mois en cours compris)",
+                                min_value=archives.RETENTION_MIN, value=archives.RETENTION_MOIS, step=1,
+                                key="archives_retention")
+    st.caption(f"Les mouvements datés d'avant le {archives.limite(retention=int(retention))} seront déplacés dans "
+               "des partitions Parquet ; les graphiques et recettes du tableau de bord n'en changent pas.")
+
+    gestionnaire = taches_partagees()
+    tache = gestionnaire.trouver(("archiver",))
+    if tache is None or not tache.active:
+        if tache is not None and tache.etat == taches.ECHEC:
+            st.error(f"❌ Échec de l'archivage ({tache.erreur}).")
+        elif tache is not None:
+            st.success(f"✅ {tache.resultat} mouvement(s) archivé(s).")
+        if not st.button("🗄️ Archiver les mois anciens"):
+            return
+        if tache is not None:
+            gestionnaire.oublier(tache)
+        tache = gestionnaire.soumettre(("archiver",), "stockage.archiver", stockage.archiver_base, commun.db_path,
+                                       int(retention))
+
+    # Rafraîchi chaque seconde tant que l'archivage tourne ; la page est relue à la fin
+    def suivre(active):
+        if tache.active:
+            st.progress(tache.avancement, text=f"Archivage : {tache.etape or tache.etat}")
+        elif active:
+            st.rerun()
+
+    st.fragment(suivre, run_every=1 if tache.active else None)(tache.active)
+
+
+def afficher():
+    st.header("⚙️ Réinitialiser le stock")
+
+    if st.session_state.role == "admin":
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.subheader("Réinitialiser les quantités")
+            st.warning(
+                "⚠️ Cette action mettra à zéro toutes les quantités en stock mais conservera les produits et l'historique.")
+            if st.button("♻️ Réinitialiser le stock à zéro"):
+                initialiser_stock()
+
+        with col2:
+            st.subheader("Purger toutes les données")
+            st.error(
+                "⚠️ ATTENTION ! Cette action supprimera définitivement tous les produits, mouvements et recettes !")
+
+            # Double confirmation pour éviter les erreurs
+            confirmation = st.checkbox("Je comprends que cette action est irréversible")
+
+            if confirmation:
+                if st.button("🗑️ PURGER TOUTES LES DONNÉES"):
+                    purger_donnees()
+
+        st.subheader("🧮 Cohérence des agrégats du tableau de bord")
+        if st.button("🔍 Vérifier les agrégats"):
+            ecarts = donnees_partagees().verifier_agregats()
+            if ecarts.empty:
+                st.success("✅ Les agrégats correspondent au journal des mouvements.")
+            else:
+                st.warning(f"⚠️ {len(ecarts)} écart(s) entre les agrégats et le journal des mouvements :")
+                st.dataframe(ecarts)
+        if st.button("🔧 Reconstruire les agrégats depuis le journal"):
+            donnees_partagees().reconstruire_agregats()
+            st.success("✅ Les agrégats ont été reconstruits.")
+
+        archivage()
+    else:
+        st.error("⛔ Accès refusé. Vous devez être administrateur pour accéder à cette page.")
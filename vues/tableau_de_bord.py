@@ -0,0 +1,220 @@
+"""Tableau de bord : indicateurs puis sections de graphiques.
+
+Chaque section est un volet qui n'est calculé que lorsqu'il est ouvert, et un
+fragment : changer la période ou la plage d'une section ne réexécute qu'elle.
+Les figures Plotly sont mémorisées avec les séries (DonneesPartagees.memoriser),
+jusqu'à la prochaine écriture.
+"""
+from datetime import datetime
+
+import plotly.express as px
+import streamlit as st
+
+from vues.commun import choisir_produit, donnees_partagees, export_en_tache, load_data, plage_affichee
+from wksdf import exports, mesures, previsions
+
+
+# Figure mémorisée sous `cle` tant que les données ne changent pas
+def figure(cle, construire):
+    return donnees_partagees().memoriser(("figure",) + cle, construire)
+
+
+def afficher_graphique(nom, fig, lignes, **options):
+    with mesures.mesurer(f"graphique.{nom}", lignes):
+        st.plotly_chart(fig, **options)
+
+
+@st.fragment
+def section_repartition(produits_df):
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("Répartition par catégorie")
+        cat_data = donnees_partagees().memoriser(
+            "categories", lambda: produits_df.groupby("Catégorie", observed=True)["Quantité"].sum().reset_index())
+        if not cat_data.empty:
+            fig_cat = figure(("categories",), lambda: px.pie(cat_data, names="Catégorie", values="Quantité",
+                                                            title="Répartition des produits par catégorie"))
+            afficher_graphique("categories", fig_cat, len(cat_data), width="stretch")
+        else:
+            st.info("Aucune donnée de catégorie disponible")
+
+    with col2:
+        st.subheader("Top produits en stock")
+        top_produits = produits_df.nlargest(5, "Quantité")
+        if not top_produits.empty:
+            fig_top = figure(("top_produits",), lambda: px.bar(top_produits, x="Nom Produit", y="Quantité",
+                                                              title="Top 5 des produits en stock"))
+            afficher_graphique("top_produits", fig_top, len(top_produits), width="stretch")
+        else:
+            st.info("Aucun produit en stock")
+
+
+@st.fragment
+def section_categories():
+    catalogue = donnees_partagees().obtenir_catalogue()
+    categories = catalogue.categories()
+    if len(categories) == 0:
+        st.info("Aucune catégorie disponible")
+        return
+    selected_cat = st.selectbox("Sélectionner une catégorie", categories)
+
+    cat_products = catalogue.de_categorie(selected_cat)
+    if cat_products.empty:
+        st.info(f"Aucun produit dans la catégorie {selected_cat}")
+        return
+    fig_cat_detail = figure(("detail_categorie", selected_cat), lambda: px.bar(
+        cat_products, x="Nom Produit", y="Quantité", color="Prix Unitaire",
+        title=f"Produits dans la catégorie: {selected_cat}", color_continuous_scale="Viridis"))
+    afficher_graphique("detail_categorie", fig_cat_detail, len(cat_products), width="stretch")
+
+    # Afficher les infos sur les produits de cette catégorie
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Nombre de produits", len(cat_products))
+    col2.metric("Quantité totale", cat_products["Quantité"].sum())
+    col3.metric("Valeur totale", f"{(cat_products['Quantité'] * cat_products['Prix Unitaire']).sum():.0f} FCFA")
+
+    # Afficher le tableau des produits de cette catégorie
+    st.dataframe(cat_products[["Nom Produit", "Quantité", "Prix Unitaire", "Seuil Alerte"]])
+
+
+@st.fragment
+def section_recettes():
+    donnees = donnees_partagees()
+    periode = st.selectbox("Sélectionnez la période d'analyse", ["jour", "mois", "année"], key="periode_recettes")
+
+    recettes_df = donnees.recettes_par_periode(periode)
+    if recettes_df.empty:
+        st.info(f"Aucune donnée de recette disponible par {periode}")
+        return
+
+    debut, fin = plage_affichee(recettes_df["Période"], "plage_recettes") if periode == "jour" else (None, None)
+    points_recettes, nb_periodes = donnees.graphique_recettes(periode, debut, fin)
+    fig_recettes = figure(("recettes", periode, debut, fin), lambda: px.line(
+        points_recettes, x="Période", y="Recettes", title=f"Évolution des recettes par {periode}"))
+    afficher_graphique("recettes", fig_recettes, len(points_recettes))
+    if len(points_recettes) < nb_periodes:
+        st.caption(f"Courbe simplifiée à {len(points_recettes)} points pour l'affichage.")
+
+    # Export des recettes
+    export_en_tache(f"les recettes par {periode} (Excel)", f"recettes_par_{periode}.xlsx",
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    exports.rapport_excel, periode)
+
+
+@st.fragment
+def section_mouvements():
+    donnees = donnees_partagees()
+    periode_mvt = st.selectbox("Sélectionnez la période pour les mouvements", ["jour", "mois", "année"],
+                               key="select_periode_mvt")
+
+    mouvements_grouped = donnees.mouvements_par_periode(periode_mvt)
+    debut, fin = (plage_affichee(mouvements_grouped["Date"], "plage_mouvements") if periode_mvt == "jour"
+                  else (None, None))
+    points_mouvements, nb_points = donnees.graphique_mouvements(periode_mvt, debut, fin)
+    fig_mouvements = figure(("mouvements", periode_mvt, debut, fin), lambda: px.line(
+        points_mouvements, x="Date", y="Quantité", color="Type", title=f"Évolution des mouvements par {periode_mvt}"))
+    afficher_graphique("mouvements", fig_mouvements, len(points_mouvements))
+    if len(points_mouvements) < nb_points:
+        st.caption(f"Courbes simplifiées à {len(points_mouvements)} points pour l'affichage.")
+
+
+# Stock passé : évolution d'un produit et état de tous les produits à une date
+@st.fragment
+def section_stock():
+    donnees = donnees_partagees()
+    catalogue = donnees.obtenir_catalogue()
+    produit_stock = choisir_produit(catalogue, "Produit", key="stock_produit")
+    serie_stock, _ = donnees.graphique_stock(produit_stock)
+    debut, fin = plage_affichee(serie_stock["Date"], "plage_stock")
+    points_stock, nb_jours = donnees.graphique_stock(produit_stock, debut, fin)
+    fig_stock = figure(("stock", produit_stock, debut, fin), lambda: px.line(
+        points_stock, x="Date", y="Quantité", line_shape="hv",
+        title=f"Stock de {catalogue.nom(produit_stock)} en fin de journée"))
+    afficher_graphique("stock", fig_stock, len(points_stock))
+    if len(points_stock) < nb_jours:
+        st.caption(f"Courbe simplifiée à {len(points_stock)} points pour l'affichage.")
+
+    jour_stock = st.date_input("Stock à la date du", value=datetime.now().date(),
+                               max_value=datetime.now().date(), format="DD/MM/YYYY", key="stock_date")
+    st.dataframe(donnees.stock_a_date(jour_stock), hide_index=True)
+
+
+@st.fragment
+def section_alertes(produits_alerte):
+    def construire():
+        fig_alerte = px.bar(produits_alerte, x="Nom Produit", y="Quantité", title="Produits en alerte de stock")
+        fig_alerte.add_scatter(x=produits_alerte["Nom Produit"], y=produits_alerte["Seuil Alerte"],
+                               name="Seuil d'alerte", mode="lines")
+        return fig_alerte
+
+    afficher_graphique("alertes", figure(("alertes",), construire), len(produits_alerte))
+
+    st.caption("Derniers franchissements de seuil")
+    st.dataframe(donnees_partagees().derniers_franchissements(), hide_index=True)
+
+
+# Dates de seuil projetées et quantités à commander, d'après la consommation récente
+@st.fragment
+def section_previsions():
+    col1, col2 = st.columns(2)
+    delai = col1.number_input("Délai de réapprovisionnement (jours)", min_value=1, max_value=180,
+                              value=previsions.DELAI, key="previsions_delai")
+    couverture = col2.number_input("Couverture visée après réception (jours)", min_value=1, max_value=365,
+                                   value=previsions.COUVERTURE, key="previsions_couverture")
+    prevues = donnees_partagees().previsions(delai, couverture)
+    a_commander = prevues[prevues["À commander"] > 0]
+
+    col1, col2 = st.columns(2)
+    col1.metric("Produits à commander", len(a_commander))
+    col2.metric("Unités à commander", int(a_commander["À commander"].sum()))
+    st.caption(f"Consommation lissée sur les {previsions.FENETRE} derniers jours ; à commander : produits qui "
+               f"atteignent leur seuil d'ici {delai} jours, de quoi tenir {couverture} jours après réception.")
+    tous = st.toggle("Afficher tous les produits", key="previsions_tous")
+    st.dataframe(prevues if tous else a_commander, hide_index=True,
+                 column_config={"Date seuil": st.column_config.DateColumn(format="DD/MM/YYYY"),
+                                "Date rupture": st.column_config.DateColumn(format="DD/MM/YYYY"),
+                                **{colonne: st.column_config.NumberColumn(format="%.1f")
+                                   for colonne in ["Moyenne 7 j", "Moyenne 28 j", "Consommation / jour"]}})
+
+
+# Volet de section : son contenu n'est exécuté que s'il est ouvert
+def volet(titre, cle, ouvert, section, *args):
+    with st.expander(titre, expanded=ouvert, key=f"volet_{cle}", on_change="rerun") as conteneur:
+        if conteneur.open:
+            section(*args)
+
+
+def afficher():
+    st.header("📊 Tableau de bord")
+    produits_df, mouvements_df = load_data()
+    donnees = donnees_partagees()
+
+    with mesures.mesurer("tableau_de_bord.indicateurs", len(produits_df)):
+        total_articles = produits_df["Quantité"].sum()
+        nb_produits = produits_df.shape[0]
+        produits_alerte = donnees.produits_en_alerte()
+
+        recettes = donnees.recettes_totales()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("🔢 Nombre de produits", nb_produits)
+    col2.metric("📦 Stock total", total_articles)
+    col3.metric("💰 Recettes générées", f"{recettes:.0f} FCFA")
+
+    if not produits_alerte.empty:
+        st.warning("⚠️ Produits en dessous du seuil d'alerte :")
+        st.dataframe(produits_alerte)
+
+    if not produits_df.empty:
+        volet("📊 Analyse graphique", "repartition", True, section_repartition, produits_df)
+        volet("📊 Produits par catégorie", "categories", False, section_categories)
+    volet("📈 Analyse des recettes", "recettes", True, section_recettes)
+    if not mouvements_df.empty or not donnees.partitions_archivees().empty:
+        volet("📊 Évolution des mouvements", "mouvements", False, section_mouvements)
+    if not produits_df.empty:
+        volet("📦 Stock dans le temps", "stock", False, section_stock)
+    if not produits_df.empty:
+        volet("🔮 Prévisions et réapprovisionnement", "previsions", False, section_previsions)
+    if not produits_alerte.empty:
+        volet("⚠️ Produits en alerte", "alertes", True, section_alertes, produits_alerte)
@@ -0,0 +1 @@
+# Bibliothèque de gestion de stock Wakeur Sokhna Daba Falilou
@@ -0,0 +1,169 @@
+"""Agrégats matérialisés, mis à jour à chaque mouvement enregistré.
+
+- agregats_mouvements : quantités par période et par type de mouvement ;
+- agregats_ventes : quantités vendues par période et par identifiant de
+  produit, valorisées au prix courant du produit à la lecture (une vente d'un
+  produit inconnu vaut 0).
+
+Le stock par produit est la colonne quantite de la table produits, déjà tenue
+à jour sur place. Le tableau de bord lit ces tables en O(périodes) au lieu de
+reparcourir tout l'historique ; verifier() les recalcule depuis le journal
+brut pour contrôler leur cohérence.
+
+Les agrégats couvrent aussi les mouvements archivés (voir archives.py) :
+archiver un mois ne les modifie pas, et reconstruire() comme verifier()
+relisent les partitions en plus du journal courant.
+"""
+import pandas as pd
+
+from wksdf import archives, mesures
+
+# Longueur du préfixe de la date (AAAA-MM-JJ) qui identifie chaque période
+GRANULARITES = {"jour": 10, "mois": 7, "année": 4}
+
+SCHEMA_VENTES = """
+CREATE TABLE IF NOT EXISTS agregats_ventes (
+    granularite TEXT NOT NULL,
+    periode TEXT NOT NULL,
+    produit_id INTEGER NOT NULL,
+    quantite NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularite, periode, produit_id)
+) WITHOUT ROWID
+"""
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agregats_mouvements (
+    granularite TEXT NOT NULL,
+    periode TEXT NOT NULL,
+    type TEXT NOT NULL,
+    quantite NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularite, periode, type)
+) WITHOUT ROWID;
+""" + SCHEMA_VENTES + ";"
+
+_UPSERT_MOUVEMENTS = (
+    "INSERT INTO agregats_mouvements (granularite, periode, type, quantite) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (granularite, periode, type) DO UPDATE SET quantite = quantite + excluded.quantite")
+_UPSERT_VENTES = (
+    "INSERT INTO agregats_ventes (granularite, periode, produit_id, quantite) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (granularite, periode, produit_id) DO UPDATE SET quantite = quantite + excluded.quantite")
+
+
+# Mise à jour en O(1) pour un mouvement, dans la transaction de l'appelant
+def ajouter_mouvement(conn, date, produit_id, type_mvt, quantite):
+    conn.executemany(_UPSERT_MOUVEMENTS, [
+        (granularite, date[:longueur], type_mvt, quantite) for granularite, longueur in GRANULARITES.items()])
+    if type_mvt == "Sortie":
+        conn.executemany(_UPSERT_VENTES, [
+            (granularite, date[:longueur], produit_id, quantite) for granularite, longueur in GRANULARITES.items()])
+
+
+# Mise à jour pour un lot de mouvements (colonnes Date au format AAAA-MM-JJ, Produit ID, Type, Quantité)
+def ajouter_lot(conn, lot):
+    sorties = lot[lot["Type"] == "Sortie"]
+    for granularite, longueur in GRANULARITES.items():
+        par_type = lot.groupby([lot["Date"].str[:longueur], "Type"])["Quantité"].sum()
+        conn.executemany(_UPSERT_MOUVEMENTS, [
+            (granularite, periode, type_mvt, int(quantite)) for (periode, type_mvt), quantite in par_type.items()])
+        par_produit = sorties.groupby([sorties["Date"].str[:longueur], "Produit ID"])["Quantité"].sum()
+        conn.executemany(_UPSERT_VENTES, [(granularite, periode, int(produit_id), int(quantite))
+                                          for (periode, produit_id), quantite in par_produit.items()])
+
+
+def _requetes_recalcul():
+    for granularite, longueur in GRANULARITES.items():
+        yield ("agregats_mouvements", granularite,
+               f"SELECT '{granularite}', substr(date, 1, {longueur}) AS periode, type, SUM(quantite) "
+               "FROM mouvements GROUP BY periode, type")
+        yield ("agregats_ventes", granularite,
+               f"SELECT '{granularite}', substr(date, 1, {longueur}) AS periode, produit_id, SUM(quantite) "
+               "FROM mouvements WHERE type = 'Sortie' AND produit_id IS NOT NULL GROUP BY periode, produit_id")
+
+
+# Mouvements archivés au format de ajouter_lot
+def _lot_archive(conn):
+    return archives.lire(conn, colonnes=["date", "produit_id", "type", "quantite"]).rename(
+        columns={"date": "Date", "produit_id": "Produit ID", "type": "Type", "quantite": "Quantité"})
+
+
+# Recalcul complet depuis le journal et les archives, dans la transaction de l'appelant
+def reconstruire(conn):
+    conn.execute("DELETE FROM agregats_mouvements")
+    conn.execute("DELETE FROM agregats_ventes")
+    for table, _, requete in _requetes_recalcul():
+        conn.execute(f"INSERT INTO {table} {requete}")
+    lot = _lot_archive(conn)
+    if not lot.empty:
+        ajouter_lot(conn, lot)
+
+
+def vider(conn):
+    conn.execute("DELETE FROM agregats_mouvements")
+    conn.execute("DELETE FROM agregats_ventes")
+
+
+# Compare les agrégats stockés à un recalcul depuis le journal ; renvoie les écarts (vide si cohérent)
+@mesures.instrumenter("agregats.verifier", lignes=len)
+def verifier(conn):
+    ecarts = []
+    lot = _lot_archive(conn)
+    for table, granularite, requete in _requetes_recalcul():
+        cles = ["granularite", "periode", "type" if table == "agregats_mouvements" else "produit_id"]
+        attendu = pd.read_sql_query(requete, conn)
+        attendu.columns = cles + ["quantite"]
+        if not lot.empty:
+            archive = lot if table == "agregats_mouvements" else lot[lot["Type"] == "Sortie"]
+            archive = archive.groupby([archive["Date"].str[:GRANULARITES[granularite]],
+                                       archive["Type" if table == "agregats_mouvements" else "Produit ID"]])[
+                "Quantité"].sum().reset_index()
+            archive.columns = cles[1:] + ["quantite"]
+            attendu = pd.concat([attendu, archive.assign(granularite=granularite)]).groupby(
+                cles, as_index=False)["quantite"].sum()
+        stocke = pd.read_sql_query(
+            f"SELECT {', '.join(cles)}, quantite FROM {table} WHERE granularite = ? AND quantite != 0",
+            conn, params=(granularite,))
+        comparaison = attendu.merge(stocke, on=cles, how="outer", suffixes=("_journal", "_agregat")).fillna(0)
+        difference = comparaison[comparaison["quantite_journal"] != comparaison["quantite_agregat"]]
+        ecarts.append(difference.assign(table=table))
+    return pd.concat(ecarts, ignore_index=True)
+
+
+def _formater_periodes(periodes, granularite):
+    periodes = pd.Series(periodes)
+    if granularite == "jour":
+        return pd.to_datetime(periodes, format="%Y-%m-%d").dt.date.to_numpy()
+    if granularite == "mois":
+        return pd.to_datetime(periodes, format="%Y-%m").to_numpy()
+    return periodes.astype(int).to_numpy()
+
+
+# Quantités par période et par type, au format du graphique « Évolution des mouvements »
+@mesures.instrumenter("agregats.lire_mouvements", lignes=len)
+def lire_mouvements(conn, granularite):
+    df = pd.read_sql_query(
+        'SELECT periode AS "Date", type AS "Type", quantite AS "Quantité" FROM agregats_mouvements '
+        "WHERE granularite = ? ORDER BY periode, type", conn, params=(granularite,))
+    df["Date"] = _formater_periodes(df["Date"], granularite)
+    return df
+
+
+@mesures.instrumenter("agregats.lire_ventes", lignes=len)
+def lire_ventes(conn, granularite):
+    return pd.read_sql_query(
+        'SELECT periode AS "Période", produit_id AS "Produit ID", quantite AS "Quantité" FROM agregats_ventes '
+        "WHERE granularite = ? ORDER BY periode", conn, params=(granularite,))
+
+
+# Recettes par période à partir des ventes agrégées et du prix courant ;
+# prix : index de prix par identifiant déjà construit (Catalogue.prix_par_id), sinon calculé depuis produits_df
+@mesures.instrumenter("agregats.recettes", lignes=len)
+def recettes(ventes_df, produits_df, granularite, prix=None):
+    if ventes_df.empty:
+        return pd.DataFrame(columns=["Période", "Recettes"])
+    if prix is None:
+        prix = pd.Series(pd.to_numeric(produits_df["Prix Unitaire"]).to_numpy(), index=produits_df["ID"].to_numpy())
+    prix_ventes = ventes_df["Produit ID"].map(prix).fillna(0)
+    montants = (pd.to_numeric(ventes_df["Quantité"]) * prix_ventes).groupby(ventes_df["Période"]).sum()
+    return pd.DataFrame({
+        "Période": _formater_periodes(montants.index, granularite),
+        "Recettes": montants.to_numpy(),
+    })
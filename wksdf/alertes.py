@@ -0,0 +1,199 @@
+"""Alertes de stock bas : franchissements de seuil et produits en alerte.
+
+Un produit est en alerte quand sa quantité est inférieure ou égale à son seuil
+(même règle que le tableau de bord). Une écriture n'évalue que les produits
+qu'elle touche : leur état est lu avant l'écriture (etats) puis comparé à leur
+état après (enregistrer), dans la même transaction, et chaque changement
+d'état est ajouté avec son horodatage à la table alertes_stock. Un mouvement
+coûte ainsi deux lectures par clé primaire, quelle que soit la taille du
+catalogue ; seule la remise à zéro du stock évalue tous les produits. Pour un
+lot de mouvements, seuls les états avant et après le lot sont comparés.
+
+MoteurAlertes garde en mémoire les produits en alerte et lit les
+franchissements au fil de l'eau, par identifiant croissant. Ceux enregistrés
+par le processus sont transmis aux notificateurs abonnés : un notificateur est
+un appelable qui reçoit le franchissement sous forme de dictionnaire
+(NotificateurFichier : une ligne JSON par franchissement ; NotificateurWebhook :
+requête POST envoyée en arrière-plan). Chaque processus ne notifie que ses
+propres écritures, si bien qu'un franchissement n'est notifié qu'une fois.
+"""
+import json
+import logging
+import os
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+EN_ALERTE = "alerte"
+RETABLI = "rétabli"
+
+# Notificateurs configurés par variables d'environnement (chaîne vide : désactivé)
+FICHIER_ALERTES = os.environ.get("WKSDF_ALERTES_FICHIER", "data/alertes.jsonl")
+WEBHOOK_ALERTES = os.environ.get("WKSDF_ALERTES_WEBHOOK", "")
+
+# Identifiants jamais réutilisés (AUTOINCREMENT), même après une purge : la lecture au fil de l'eau reste exacte
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alertes_stock (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    produit_id INTEGER NOT NULL,
+    produit TEXT NOT NULL,
+    etat TEXT NOT NULL,
+    quantite NUMERIC NOT NULL,
+    seuil NUMERIC NOT NULL,
+    processus INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_alertes_produit ON alertes_stock (produit_id, id);
+"""
+
+_COLONNES = ["id", "date", "produit_id", "produit", "etat", "quantite", "seuil", "processus"]
+
+journal = logging.getLogger("wksdf.alertes")
+
+
+def _lire(conn, produit_ids=None):
+    requete = "SELECT id, nom, quantite, seuil, quantite <= seuil FROM produits"
+    if produit_ids is None:
+        return conn.execute(requete).fetchall()
+    return [ligne for produit_id in produit_ids
+            for ligne in conn.execute(requete + " WHERE id = ?", (int(produit_id),))]
+
+
+# État (en alerte ou non) des produits avant une écriture, dans sa transaction ; produit_ids None : tous
+def etats(conn, produit_ids=None):
+    return {ligne[0]: bool(ligne[4]) for ligne in _lire(conn, produit_ids)}
+
+
+# Enregistre les changements d'état depuis `avant` (voir etats) ; un produit absent de `avant`
+# (produit créé par l'écriture) est considéré hors alerte. tous : évalue tout le catalogue.
+def enregistrer(conn, avant, tous=False):
+    date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO alertes_stock (date, produit_id, produit, etat, quantite, seuil, processus) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(date, produit_id, nom, EN_ALERTE if alerte else RETABLI, quantite, seuil, os.getpid())
+         for produit_id, nom, quantite, seuil, alerte in _lire(conn, None if tous else avant)
+         if bool(alerte) != avant.get(produit_id, False)])
+
+
+# Journal initial : une alerte pour chaque produit actuellement sous son seuil, dans la transaction de l'appelant
+def reconstruire(conn):
+    conn.execute("DELETE FROM alertes_stock")
+    conn.execute(
+        "INSERT INTO alertes_stock (date, produit_id, produit, etat, quantite, seuil) "
+        "SELECT ?, id, nom, ?, quantite, seuil FROM produits WHERE quantite <= seuil ORDER BY id",
+        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), EN_ALERTE))
+
+
+def vider(conn):
+    conn.execute("DELETE FROM alertes_stock")
+
+
+# Derniers franchissements, du plus récent au plus ancien
+def derniers(conn, limite=50):
+    return pd.read_sql_query(
+        'SELECT date AS "Date", produit AS "Produit", etat AS "État", quantite AS "Quantité", '
+        'seuil AS "Seuil Alerte" FROM alertes_stock ORDER BY id DESC LIMIT ?', conn, params=(limite,))
+
+
+def _franchissements(conn, requete, params=()):
+    return [dict(zip(_COLONNES, ligne)) for ligne in conn.execute(
+        f"SELECT {', '.join(_COLONNES)} FROM alertes_stock {requete}", params)]
+
+
+class MoteurAlertes:
+    def __init__(self):
+        # Dernier franchissement de chaque produit en alerte, par identifiant de produit
+        self.actives = {}
+        self.dernier_id = 0
+        self._notificateurs = []
+
+    def abonner(self, notificateur):
+        self._notificateurs.append(notificateur)
+
+    # État complet relu depuis la base : produits dont le dernier franchissement est une alerte
+    def charger(self, conn):
+        derniers_etats = _franchissements(
+            conn, "WHERE id IN (SELECT MAX(id) FROM alertes_stock GROUP BY produit_id) ORDER BY id")
+        self.actives = {f["produit_id"]: f for f in derniers_etats if f["etat"] == EN_ALERTE}
+        self.dernier_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM alertes_stock").fetchone()[0]
+
+    # Applique les franchissements enregistrés depuis la dernière lecture et les renvoie
+    def suivre(self, conn):
+        nouveaux = _franchissements(conn, "WHERE id > ? ORDER BY id", (self.dernier_id,))
+        if nouveaux:
+            actives = dict(self.actives)
+            for franchissement in nouveaux:
+                if franchissement["etat"] == EN_ALERTE:
+                    actives[franchissement["produit_id"]] = franchissement
+                else:
+                    actives.pop(franchissement["produit_id"], None)
+            self.actives = actives
+            self.dernier_id = nouveaux[-1]["id"]
+        return nouveaux
+
+    # Transmet aux notificateurs les franchissements enregistrés par ce processus ;
+    # un notificateur en échec n'interrompt ni les autres ni l'écriture
+    def notifier(self, franchissements):
+        for franchissement in franchissements:
+            if franchissement["processus"] != os.getpid():
+                continue
+            for notificateur in self._notificateurs:
+                try:
+                    notificateur(franchissement)
+                except Exception:
+                    journal.exception("Notification d'alerte impossible (%s)", notificateur)
+
+
+class NotificateurFichier:
+    def __init__(self, chemin=FICHIER_ALERTES):
+        self.chemin = chemin
+        self._verrou = threading.Lock()
+
+    def __call__(self, franchissement):
+        ligne = json.dumps(franchissement, ensure_ascii=False, default=str)
+        with self._verrou:
+            dossier = os.path.dirname(self.chemin)
+            if dossier:
+                os.makedirs(dossier, exist_ok=True)
+            with open(self.chemin, "a", encoding="utf-8") as f:
+                f.write(ligne + "\n")
+
+    def __repr__(self):
+        return f"NotificateurFichier({self.chemin!r})"
+
+
+# Envoi en arrière-plan (un seul thread, dans l'ordre) : l'écriture n'attend pas le service distant
+class NotificateurWebhook:
+    def __init__(self, url, delai=5):
+        self.url = url
+        self.delai = delai
+        self._envois = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wksdf-webhook")
+
+    def __call__(self, franchissement):
+        self._envois.submit(self._envoyer, franchissement)
+
+    def _envoyer(self, franchissement):
+        requete = urllib.request.Request(
+            self.url, data=json.dumps(franchissement, ensure_ascii=False, default=str).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(requete, timeout=self.delai):
+                pass
+        except (OSError, ValueError) as e:
+            journal.warning("Webhook d'alerte %s injoignable : %s", self.url, e)
+
+    def __repr__(self):
+        return f"NotificateurWebhook({self.url!r})"
+
+
+def notificateurs_configures():
+    notificateurs = []
+    if FICHIER_ALERTES:
+        notificateurs.append(NotificateurFichier(FICHIER_ALERTES))
+    if WEBHOOK_ALERTES:
+        notificateurs.append(NotificateurWebhook(WEBHOOK_ALERTES))
+    return notificateurs
@@ -0,0 +1,495 @@
+"""API HTTP des opérations de stock, sans interface (Starlette, servie par uvicorn).
+
+Usage : python -m wksdf.api [--hote 127.0.0.1] [--port 8502] [--base data/stock.db]
+
+Les gestionnaires sont asynchrones ; les opérations (DonneesPartagees,
+historique, exports) restent celles de l'application Streamlit et
+s'exécutent dans le pool de threads : une écriture en attente du verrou de la
+base ne bloque pas la boucle d'événements. L'API et l'application peuvent
+servir la même base en même temps (voir stockage.py).
+
+Authentification : POST /sessions (nom, mot_de_passe) renvoie un jeton, à
+présenter ensuite dans l'en-tête « Authorization: Bearer <jeton> ».
+
+Les mouvements envoyés un par un (POST /mouvements, une vente de terminal de
+caisse par exemple) sont regroupés : pendant qu'un lot s'écrit, les suivants
+s'accumulent et partent ensemble dans la transaction suivante, validés comme
+un import en masse (import_masse.valider) ; chaque requête reçoit sa propre
+réponse. POST /mouvements/lot écrit jusqu'à LOT_MAX mouvements en une seule
+transaction.
+
+Les champs JSON reprennent les noms des colonnes SQL (id, nom, categorie,
+prix, quantite, seuil, date_ajout ; id, date, produit, type, quantite,
+commentaire, produit_id), les dates au format AAAA-MM-JJ. Un mouvement garde
+le nom du produit au moment de la saisie ; le filtre ?produit= de
+l'historique désigne le produit qui porte ce nom aujourd'hui, avec tous ses
+mouvements.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+from datetime import date, datetime
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.routing import Route
+
+from wksdf import exports, historique, previsions, stockage, taches, utilisateurs
+from wksdf.donnees import DonneesPartagees
+from wksdf.utilisateurs import CompteBloque, Utilisateurs
+
+# Mouvements au plus par transaction (lot envoyé ou mouvements regroupés)
+LOT_MAX = 10_000
+# Mouvements au plus par page d'historique
+PAGE_MAX = 1_000
+
+# Colonne affichée -> champ JSON
+CHAMPS = {
+    **{colonne: champ for champ, colonne in stockage.SQL_PRODUITS.items()},
+    **{colonne: champ for champ, colonne in stockage.SQL_MOUVEMENTS.items()},
+    "Période": "periode",
+    "Recettes": "recettes",
+    "Moyenne 7 j": "moyenne_7j",
+    "Moyenne 28 j": "moyenne_28j",
+    "Consommation / jour": "consommation_jour",
+    "Jours avant seuil": "jours_avant_seuil",
+    "Date seuil": "date_seuil",
+    "Date rupture": "date_rupture",
+    "À commander": "a_commander",
+}
+_FORMATS_DATE = {"Date Ajout": "%Y-%m-%d %H:%M:%S"}
+
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Exports proposés : nom -> (fonction d'export, paramètres, type du fichier)
+EXPORTS = {
+    "produits.csv": (exports.produits_csv, (), "text/csv"),
+    "mouvements.csv": (exports.mouvements_csv, (), "text/csv"),
+    "donnees.xlsx": (exports.donnees_excel, (), MIME_XLSX),
+    **{f"rapport-{periode}.xlsx": (exports.rapport_excel, (periode,), MIME_XLSX)
+       for periode in ("jour", "mois", "année")},
+}
+
+
+def _json(contenu, statut=200):
+    return Response(json.dumps(contenu, ensure_ascii=False), status_code=statut, media_type="application/json")
+
+
+# Lignes d'un DataFrame en liste d'objets JSON (colonnes de CHAMPS seulement)
+def _enregistrements(df):
+    colonnes = [colonne for colonne in df.columns if colonne in CHAMPS]
+    df = df[colonnes].copy()
+    for colonne in colonnes:
+        if pd.api.types.is_datetime64_any_dtype(df[colonne]):
+            df[colonne] = df[colonne].dt.strftime(_FORMATS_DATE.get(colonne, "%Y-%m-%d"))
+        elif df[colonne].dtype == object and len(df) and isinstance(df[colonne].iloc[0], date):
+            df[colonne] = df[colonne].map(lambda jour: jour.isoformat())
+    return json.loads(df.rename(columns=CHAMPS).to_json(orient="records", force_ascii=False))
+
+
+def _erreur(message, statut, **entetes):
+    return JSONResponse({"erreur": message}, status_code=statut, headers=entetes or None)
+
+
+async def _corps(request):
+    try:
+        corps = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Corps JSON invalide")
+    if not isinstance(corps, dict):
+        raise HTTPException(400, "Objet JSON attendu")
+    return corps
+
+
+def _champ(corps, nom, type_attendu, defaut=...):
+    if nom not in corps:
+        if defaut is ...:
+            raise HTTPException(400, f"Champ manquant : {nom}")
+        return defaut
+    valeur = corps[nom]
+    if not isinstance(valeur, type_attendu) or isinstance(valeur, bool):
+        raise HTTPException(400, f"Champ invalide : {nom}")
+    return valeur
+
+
+def _jour(request, nom):
+    valeur = request.query_params.get(nom)
+    try:
+        return None if valeur is None else date.fromisoformat(valeur)
+    except ValueError:
+        raise HTTPException(400, f"Date invalide (AAAA-MM-JJ attendu) : {nom}")
+
+
+def _entier(request, nom, defaut, maximum):
+    try:
+        valeur = int(request.query_params.get(nom, defaut))
+    except ValueError:
+        raise HTTPException(400, f"Entier attendu : {nom}")
+    if not 0 < valeur <= maximum:
+        raise HTTPException(400, f"{nom} doit être compris entre 1 et {maximum}")
+    return valeur
+
+
+# Ligne d'import (colonnes de import_masse) pour un mouvement reçu en JSON ; la date, facultative, est une
+# chaîne AAAA-MM-JJ (un nombre comme 20250101 serait sinon lu comme un horodatage)
+def _ligne_mouvement(mouvement):
+    if not isinstance(mouvement, dict):
+        raise HTTPException(400, "Mouvement : objet JSON attendu")
+    jour = mouvement.get("date")
+    if jour is not None:
+        try:
+            datetime.strptime(jour, "%Y-%m-%d")
+        except (TypeError, ValueError):
+            raise HTTPException(400, "Date invalide (AAAA-MM-JJ attendu) : date")
+    return {"Date": jour, "Produit": mouvement.get("produit"), "Type": mouvement.get("type"),
+            "Quantité": mouvement.get("quantite"), "Commentaire": mouvement.get("commentaire") or ""}
+
+
+# Résultat d'un lot écrit : identifiant de chaque mouvement accepté (None si rejeté) et motifs des rejets
+def _resultats(acceptes, rejetes, nombre):
+    motifs = dict(zip(rejetes["Ligne"] - 2, rejetes["Motif"]))
+    ids = iter(acceptes["ID"].tolist() if len(acceptes) else [])
+    dates = iter(acceptes["Date"].tolist() if len(acceptes) else [])
+    return [(None, None, motifs[ligne]) if ligne in motifs else (next(ids), next(dates), None)
+            for ligne in range(nombre)]
+
+
+class RegroupementMouvements:
+    """Mouvements unitaires écrits par lots : un seul lot s'écrit à la fois, les suivants attendent ensemble."""
+
+    def __init__(self, donnees, taille_max=LOT_MAX):
+        self._donnees = donnees
+        self._taille_max = taille_max
+        self._attente = []
+        self._ecriture = None
+
+    # (id, date, None) si le mouvement est accepté, (None, None, motif) sinon
+    async def enregistrer(self, ligne):
+        futur = asyncio.get_running_loop().create_future()
+        self._attente.append((ligne, futur))
+        if self._ecriture is None or self._ecriture.done():
+            self._ecriture = asyncio.ensure_future(self._vider())
+        return await futur
+
+    async def _vider(self):
+        while self._attente:
+            lot, self._attente = self._attente[:self._taille_max], self._attente[self._taille_max:]
+            try:
+                acceptes, rejetes = await run_in_threadpool(
+                    self._donnees.importer_mouvements, pd.DataFrame([ligne for ligne, _ in lot]))
+            except Exception as erreur:
+                for _, futur in lot:
+                    if not futur.done():
+                        futur.set_exception(erreur)
+                continue
+            for (_, futur), resultat in zip(lot, _resultats(acceptes, rejetes, len(lot))):
+                # Client parti entre-temps : le mouvement reste écrit
+                if not futur.done():
+                    futur.set_result(resultat)
+
+
+# Gestionnaire accessible avec un jeton de session valide ; (nom, rôle) dans request.state
+def authentifie(gestionnaire):
+    async def verifier(request):
+        entete = request.headers.get("authorization", "")
+        jeton = entete[7:].strip() if entete[:7].lower() == "bearer " else None
+        session = request.app.state.utilisateurs.session(jeton) if jeton else None
+        if session is None:
+            return _erreur("Session absente ou expirée", 401, **{"WWW-Authenticate": "Bearer"})
+        request.state.utilisateur, request.state.role = session
+        return await gestionnaire(request)
+
+    return verifier
+
+
+async def sante(request):
+    return _json({"version": request.app.state.donnees.version})
+
+
+async def ouvrir_session(request):
+    corps = await _corps(request)
+    nom, mot_de_passe = _champ(corps, "nom", str), _champ(corps, "mot_de_passe", str)
+    comptes = request.app.state.utilisateurs
+    try:
+        role = await run_in_threadpool(comptes.authentifier, nom, mot_de_passe)
+    except CompteBloque as e:
+        return _erreur(str(e), 429, **{"Retry-After": str(int(e.restant) + 1)})
+    if role is None:
+        return _erreur("Nom d'utilisateur ou mot de passe incorrect", 401)
+    return _json({"jeton": comptes.ouvrir_session(nom), "role": role}, 201)
+
+
+@authentifie
+async def fermer_session(request):
+    request.app.state.utilisateurs.fermer_session(request.headers["authorization"][7:].strip())
+    return Response(status_code=204)
+
+
+@authentifie
+async def lister_produits(request):
+    catalogue = await run_in_threadpool(request.app.state.donnees.obtenir_catalogue)
+    categorie = request.query_params.get("categorie")
+    return _json(_enregistrements(catalogue.produits if categorie is None else catalogue.de_categorie(categorie)))
+
+
+@authentifie
+async def lire_produit(request):
+    produit_id = request.path_params["produit_id"]
+    donnees = request.app.state.donnees
+    catalogue = await run_in_threadpool(donnees.obtenir_catalogue)
+    try:
+        ligne = catalogue.produits.iloc[[catalogue.position(produit_id)]]
+    except KeyError:
+        raise stockage.ProduitInconnu(produit_id)
+
+    def version():
+        with stockage.ouvrir(donnees.db_path) as conn:
+            return stockage.versions_produits(conn).get(produit_id)
+
+    return _json({**_enregistrements(ligne)[0], "version": await run_in_threadpool(version)})
+
+
+# Nombre fini et positif ou nul (le JSON de Python accepte NaN et Infinity)
+def _positif(corps, nom):
+    valeur = _champ(corps, nom, (int, float))
+    if not math.isfinite(valeur) or valeur < 0:
+        raise HTTPException(400, f"{nom} doit être un nombre positif ou nul")
+    return valeur
+
+
+def _fiche(corps):
+    nom = _champ(corps, "nom", str).strip()
+    if not nom:
+        raise HTTPException(400, "Le nom du produit est obligatoire")
+    return (nom, _champ(corps, "categorie", str), _positif(corps, "prix"),
+            _positif(corps, "quantite"), _positif(corps, "seuil"))
+
+
+@authentifie
+async def ajouter_produit(request):
+    corps = await _corps(request)
+    date_ajout = _champ(corps, "date_ajout", str, None) or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    produit_id = await run_in_threadpool(request.app.state.donnees.ajouter_produit, *_fiche(corps), date_ajout)
+    return _json({"id": produit_id}, 201)
+
+
+# Modification d'une fiche ; « version » (lue avec GET /produits/{id}) refuse la modification si la fiche a
+# changé depuis
+@authentifie
+async def modifier_produit(request):
+    corps = await _corps(request)
+    await run_in_threadpool(request.app.state.donnees.modifier_produit, request.path_params["produit_id"],
+                            *_fiche(corps), _champ(corps, "version", int, None))
+    return Response(status_code=204)
+
+
+# Stock courant, ou à la fin d'un jour passé (?date=AAAA-MM-JJ)
+@authentifie
+async def lire_stock(request):
+    jour = _jour(request, "date")
+    donnees = request.app.state.donnees
+    if jour is None:
+        stocks = (await run_in_threadpool(donnees.obtenir))[0]
+    else:
+        stocks = await run_in_threadpool(donnees.stock_a_date, jour)
+    return _json(_enregistrements(stocks[["ID", "Nom Produit", "Catégorie", "Quantité"]]))
+
+
+@authentifie
+async def enregistrer_mouvement(request):
+    ligne = _ligne_mouvement(await _corps(request))
+    mouvement_id, jour, motif = await request.app.state.regroupement.enregistrer(ligne)
+    if motif is not None:
+        return _erreur(motif, 422)
+    return _json({"id": mouvement_id, "date": jour}, 201)
+
+
+# Lot de mouvements écrit en une transaction ; les lignes rejetées sont signalées sans bloquer les autres
+@authentifie
+async def enregistrer_lot(request):
+    mouvements = (await _corps(request)).get("mouvements")
+    if not isinstance(mouvements, list) or not mouvements:
+        raise HTTPException(400, "Liste « mouvements » attendue")
+    if len(mouvements) > LOT_MAX:
+        raise HTTPException(413, f"Au plus {LOT_MAX} mouvements par lot")
+    lot = pd.DataFrame([_ligne_mouvement(mouvement) for mouvement in mouvements])
+    acceptes, rejetes = await run_in_threadpool(request.app.state.donnees.importer_mouvements, lot)
+    resultats = _resultats(acceptes, rejetes, len(lot))
+    return _json({
+        "acceptes": len(acceptes),
+        "ids": [mouvement_id for mouvement_id, _, _ in resultats],
+        "rejetes": [{"ligne": ligne, "motif": motif} for ligne, (_, _, motif) in enumerate(resultats) if motif],
+    })
+
+
+# Page d'historique ; le curseur « suivant » se passe tel quel dans ?apres= pour la page suivante
+@authentifie
+async def lister_mouvements(request):
+    parametres = request.query_params
+    if parametres.get("type", stockage.TYPES_MOUVEMENT[0]) not in stockage.TYPES_MOUVEMENT:
+        raise HTTPException(400, "Type : Entrée ou Sortie")
+    produit_id = None
+    if "produit" in parametres:
+        catalogue = await run_in_threadpool(request.app.state.donnees.obtenir_catalogue)
+        produit_id = catalogue.id_de(parametres["produit"])
+        if produit_id is None:
+            raise stockage.ProduitInconnu(parametres["produit"])
+    criteres = dict(type_mvt=parametres.get("type"), produit_id=produit_id,
+                    debut=_jour(request, "debut"), fin=_jour(request, "fin"))
+    limite = _entier(request, "limite", historique.TAILLE_PAGE, PAGE_MAX)
+    apres = None
+    if "apres" in parametres:
+        jour, _, mouvement_id = parametres["apres"].partition(",")
+        try:
+            if not mouvement_id.isdigit():
+                raise ValueError(mouvement_id)
+            apres = (date.fromisoformat(jour).isoformat(), int(mouvement_id))
+        except ValueError:
+            raise HTTPException(400, "Curseur invalide (AAAA-MM-JJ,id attendu)")
+
+    def lire():
+        with stockage.ouvrir(request.app.state.donnees.db_path) as conn:
+            return historique.page_mouvements(conn, limite=limite, apres=apres, **criteres)
+
+    page, suivant = await run_in_threadpool(lire)
+    return _json({"mouvements": _enregistrements(page),
+                  "suivant": None if suivant is None else f"{suivant[0]},{suivant[1]}"})
+
+
+@authentifie
+async def lire_recettes(request):
+    periode = request.query_params.get("periode", "jour")
+    if periode not in ("jour", "mois", "année"):
+        raise HTTPException(400, "Période : jour, mois ou année")
+    return _json(_enregistrements(await run_in_threadpool(request.app.state.donnees.recettes_par_periode, periode)))
+
+
+@authentifie
+async def lire_alertes(request):
+    return _json(_enregistrements(await run_in_threadpool(request.app.state.donnees.produits_en_alerte)))
+
+
+@authentifie
+async def lire_previsions(request):
+    delai = _entier(request, "delai", previsions.DELAI, 365)
+    couverture = _entier(request, "couverture", previsions.COUVERTURE, 365)
+    return _json(_enregistrements(
+        await run_in_threadpool(request.app.state.donnees.previsions, delai, couverture)))
+
+
+def _tache(tache):
+    return {"id": tache.id, "etat": tache.etat, "avancement": tache.avancement, "etape": tache.etape,
+            "erreur": tache.erreur, "fichier": f"/taches/{tache.id}/fichier" if tache.etat == taches.TERMINEE
+            else None}
+
+
+# Export préparé en tâche de fond ; une demande identique (mêmes données) reprend la même tâche
+@authentifie
+async def lancer_export(request):
+    nom = request.path_params["nom"]
+    if nom not in EXPORTS:
+        raise HTTPException(404, f"Export inconnu ; exports proposés : {', '.join(EXPORTS)}")
+    exporter, parametres, _ = EXPORTS[nom]
+    donnees, gestionnaire = request.app.state.donnees, request.app.state.taches
+    await run_in_threadpool(donnees.obtenir)
+    cle = (exporter.__name__, *parametres, donnees.version)
+    tache = gestionnaire.trouver(cle)
+    if tache is not None and tache.etat == taches.TERMINEE and not os.path.exists(tache.resultat):
+        # Fichier supprimé depuis (purge du dossier d'exports) : à refaire
+        gestionnaire.oublier(tache)
+    tache = gestionnaire.soumettre(cle, nom, exporter, donnees.db_path, *parametres)
+    return _json(_tache(tache), 202)
+
+
+@authentifie
+async def lire_tache(request):
+    tache = request.app.state.taches.par_id(request.path_params["tache_id"])
+    if tache is None:
+        raise HTTPException(404, "Tâche inconnue")
+    return _json(_tache(tache))
+
+
+@authentifie
+async def telecharger(request):
+    tache = request.app.state.taches.par_id(request.path_params["tache_id"])
+    if tache is None or tache.etat != taches.TERMINEE or not os.path.exists(tache.resultat):
+        raise HTTPException(404, "Fichier indisponible")
+    return FileResponse(tache.resultat, media_type=EXPORTS[tache.nom][2], filename=tache.nom)
+
+
+async def _erreur_http(request, erreur):
+    return _erreur(erreur.detail, erreur.status_code)
+
+
+# Exception métier de stockage -> réponse JSON avec le statut HTTP `statut`
+def _refus(statut):
+    async def gestionnaire(request, erreur):
+        return _erreur(str(erreur) if not isinstance(erreur, stockage.ProduitInconnu)
+                       else f"Produit inconnu : {erreur}", statut)
+
+    return gestionnaire
+
+
+def creer_application(db_path=stockage.DB_PATH, excel_path=stockage.EXCEL_PATH, users_path=utilisateurs.USERS_PATH):
+    donnees = DonneesPartagees(db_path, excel_path)
+
+    @contextlib.asynccontextmanager
+    async def cycle_de_vie(app):
+        # Base initialisée et chargée avant la première requête
+        await run_in_threadpool(donnees.obtenir)
+        yield
+        app.state.taches.arreter(attendre=False)
+
+    app = Starlette(routes=[
+        Route("/sante", sante),
+        Route("/sessions", ouvrir_session, methods=["POST"]),
+        Route("/sessions", fermer_session, methods=["DELETE"]),
+        Route("/produits", lister_produits),
+        Route("/produits", ajouter_produit, methods=["POST"]),
+        Route("/produits/{produit_id:int}", lire_produit),
+        Route("/produits/{produit_id:int}", modifier_produit, methods=["PUT"]),
+        Route("/stock", lire_stock),
+        Route("/mouvements", lister_mouvements),
+        Route("/mouvements", enregistrer_mouvement, methods=["POST"]),
+        Route("/mouvements/lot", enregistrer_lot, methods=["POST"]),
+        Route("/recettes", lire_recettes),
+        Route("/alertes", lire_alertes),
+        Route("/previsions", lire_previsions),
+        Route("/exports/{nom}", lancer_export, methods=["POST"]),
+        Route("/taches/{tache_id}", lire_tache),
+        Route("/taches/{tache_id}/fichier", telecharger),
+    ], exception_handlers={
+        HTTPException: _erreur_http,
+        stockage.ProduitInconnu: _refus(404),
+        stockage.ConflitVersion: _refus(409),
+        stockage.NomEnDouble: _refus(409),
+        stockage.StockInsuffisant: _refus(409),
+    }, lifespan=cycle_de_vie)
+    app.state.donnees = donnees
+    app.state.utilisateurs = Utilisateurs(users_path)
+    app.state.taches = taches.GestionnaireTaches()
+    app.state.regroupement = RegroupementMouvements(donnees)
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--base", default=stockage.DB_PATH)
+    parser.add_argument("--utilisateurs", default=utilisateurs.USERS_PATH)
+    args = parser.parse_args()
+    uvicorn.run(creer_application(args.base, users_path=args.utilisateurs), host=args.hote, port=args.port,
+                log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Archives des mouvements : partitions mensuelles en fichiers Parquet.
+
+Le journal courant (table mouvements) ne garde que les mois récents : les mois
+clos antérieurs à la rétention (RETENTION_MOIS, mois en cours compris) sont
+compactés mois par mois en fichiers Parquet (colonnes compressées en zstd,
+lignes triées par date et identifiant) dans le dossier archives/ voisin de la
+base. Seul le journal courant est chargé en mémoire.
+
+Les fichiers ne sont jamais réécrits (sauf une fois ceux d'avant la colonne
+produit_id, voir migrer_produit_id) : un mouvement antidaté dans un mois déjà
+archivé reste dans le journal courant jusqu'à l'archivage suivant, qui ajoute
+une partition de plus pour ce mois. La table archives_mouvements
+répertorie les partitions avec un résumé précalculé (lignes, dates extrêmes,
+quantités entrées et sorties) : une lecture par intervalle de dates n'ouvre
+que les fichiers des partitions qui le recoupent, et un comptage sans autre
+filtre n'ouvre pas les partitions entièrement comprises dans l'intervalle.
+Les agrégats (recettes, mouvements par période) couvrent tout l'historique :
+les rapports de recettes ne lisent jamais les archives.
+
+Une partition est écrite dans la transaction qui retire ses lignes du journal
+et l'inscrit au répertoire ; un fichier non répertorié (archivage interrompu,
+purge) est ignoré, puis supprimé par nettoyer().
+"""
+import glob
+import os
+from datetime import date, datetime
+
+import pandas as pd
+
+from wksdf import mesures
+
+# Mois gardés dans le journal courant, mois en cours compris ; au moins RETENTION_MIN pour que la fenêtre des
+# prévisions (90 jours) reste en mémoire
+RETENTION_MOIS = 12
+RETENTION_MIN = 4
+
+COLONNES = ["id", "date", "produit", "type", "quantite", "commentaire", "produit_id"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives_mouvements (
+    fichier TEXT PRIMARY KEY,
+    mois TEXT NOT NULL,
+    lignes INTEGER NOT NULL,
+    date_min TEXT NOT NULL,
+    date_max TEXT NOT NULL,
+    entrees NUMERIC NOT NULL,
+    sorties NUMERIC NOT NULL,
+    archive_le TEXT NOT NULL
+);
+"""
+
+
+# Dossier des partitions, à côté du fichier de la base
+def dossier(conn):
+    return os.path.join(os.path.dirname(conn.execute("PRAGMA database_list").fetchone()[2]), "archives")
+
+
+# Premier jour gardé dans le journal courant (AAAA-MM-JJ) : les mois antérieurs sont archivables
+def limite(jour=None, retention=RETENTION_MOIS):
+    if retention < RETENTION_MIN:
+        raise ValueError(f"Rétention d'au moins {RETENTION_MIN} mois attendue")
+    return (pd.Period(jour or date.today(), freq="M") - (retention - 1)).start_time.strftime("%Y-%m-%d")
+
+
+def mois_archivables(conn, jour=None, retention=RETENTION_MOIS):
+    return [mois for (mois,) in conn.execute(
+        "SELECT DISTINCT substr(date, 1, 7) FROM mouvements WHERE date < ? ORDER BY 1", (limite(jour, retention),))]
+
+
+def _bornes(mois):
+    return f"{mois}-01", (pd.Period(mois, freq="M") + 1).start_time.strftime("%Y-%m-%d")
+
+
+# Déplace les mouvements du mois (AAAA-MM) dans une nouvelle partition ; à appeler dans une transaction
+# d'écriture. Renvoie le nombre de mouvements archivés.
+def archiver_mois(conn, mois):
+    debut, fin = _bornes(mois)
+    lignes = pd.read_sql_query(
+        f"SELECT {', '.join(COLONNES)} FROM mouvements WHERE date >= ? AND date < ? ORDER BY date, id",
+        conn, params=(debut, fin))
+    if lignes.empty:
+        return 0
+    numero = conn.execute("SELECT COUNT(*) FROM archives_mouvements WHERE mois = ?", (mois,)).fetchone()[0] + 1
+    fichier = f"mouvements-{mois}-{numero}.parquet"
+    _ecrire_partition(conn, lignes, fichier)
+    quantites = pd.to_numeric(lignes["quantite"])
+    conn.execute(
+        "INSERT INTO archives_mouvements (fichier, mois, lignes, date_min, date_max, entrees, sorties, archive_le) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (fichier, mois, len(lignes), lignes["date"].min(), lignes["date"].max(),
+         quantites[lignes["type"] == "Entrée"].sum().item(), quantites[lignes["type"] == "Sortie"].sum().item(),
+         datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    conn.execute("DELETE FROM mouvements WHERE date >= ? AND date < ?", (debut, fin))
+    return len(lignes)
+
+
+# Fichier sur disque avant que le commit ne le répertorie
+def _ecrire_partition(conn, lignes, fichier):
+    repertoire = dossier(conn)
+    os.makedirs(repertoire, exist_ok=True)
+    chemin = os.path.join(repertoire, fichier)
+    lignes.to_parquet(chemin, compression="zstd", index=False)
+    with open(chemin, "rb") as f:
+        os.fsync(f.fileno())
+
+
+# Partitions écrites avant la colonne produit_id : réécrites une fois, avec l'identifiant du premier produit de
+# ce nom (comme le journal lors de sa migration) ; dans la transaction de l'appelant, les anciens fichiers sont
+# supprimés ensuite par nettoyer()
+def migrer_produit_id(conn):
+    premiers = dict(conn.execute("SELECT nom, MIN(id) FROM produits GROUP BY nom"))
+    for fichier in partitions(conn)["fichier"]:
+        lignes = pd.read_parquet(os.path.join(dossier(conn), fichier))
+        if "produit_id" in lignes.columns:
+            continue
+        lignes["produit_id"] = lignes["produit"].map(premiers).astype("Int64")
+        nouveau = fichier.replace(".parquet", "-id.parquet")
+        _ecrire_partition(conn, lignes, nouveau)
+        conn.execute("UPDATE archives_mouvements SET fichier = ? WHERE fichier = ?", (nouveau, fichier))
+
+
+# Supprime les fichiers de partition non répertoriés ; sous le verrou d'écriture ou après une purge
+def nettoyer(conn):
+    repertoire = dossier(conn)
+    connus = {fichier for (fichier,) in conn.execute("SELECT fichier FROM archives_mouvements")}
+    for chemin in glob.glob(os.path.join(glob.escape(repertoire), "mouvements-*.parquet")):
+        if os.path.basename(chemin) not in connus:
+            try:
+                os.remove(chemin)
+            except OSError:
+                pass
+
+
+# Retire les partitions du répertoire, dans la transaction de l'appelant (fichiers supprimés par nettoyer)
+def vider(conn):
+    conn.execute("DELETE FROM archives_mouvements")
+
+
+# Partitions qui recoupent [debut, fin] (AAAA-MM-JJ, None : non borné), de la plus récente à la plus ancienne
+def partitions(conn, debut=None, fin=None):
+    return pd.read_sql_query(
+        "SELECT fichier, mois, lignes, date_min, date_max, entrees, sorties, archive_le FROM archives_mouvements "
+        "WHERE (:debut IS NULL OR date_max >= :debut) AND (:fin IS NULL OR date_min <= :fin) "
+        "ORDER BY date_max DESC, fichier DESC", conn, params={"debut": debut, "fin": fin})
+
+
+# Lignes d'une partition (colonnes du journal), filtrées à la lecture
+def lire_partition(conn, fichier, debut=None, fin=None, type_mvt=None, produit_id=None, colonnes=None):
+    filtres = [(colonne, operateur, valeur) for colonne, operateur, valeur in (
+        ("date", ">=", debut), ("date", "<=", fin), ("type", "==", type_mvt), ("produit_id", "==", produit_id))
+        if valeur is not None]
+    return pd.read_parquet(os.path.join(dossier(conn), fichier), columns=colonnes, filters=filtres or None)
+
+
+# Toutes les lignes archivées qui recoupent [debut, fin], en un seul DataFrame
+@mesures.instrumenter("archives.lire", lignes=len)
+def lire(conn, debut=None, fin=None, type_mvt=None, produit_id=None, colonnes=None):
+    morceaux = [lire_partition(conn, fichier, debut, fin, type_mvt, produit_id, colonnes)
+                for fichier in partitions(conn, debut, fin)["fichier"]]
+    if not morceaux:
+        return pd.DataFrame(columns=colonnes or COLONNES)
+    return pd.concat(morceaux, ignore_index=True)
+
+
+@mesures.instrumenter("archives.compter")
+def compter(conn, debut=None, fin=None, type_mvt=None, produit_id=None):
+    total = 0
+    for fichier, lignes, date_min, date_max in partitions(conn, debut, fin)[
+            ["fichier", "lignes", "date_min", "date_max"]].itertuples(index=False, name=None):
+        entiere = (debut is None or date_min >= debut) and (fin is None or date_max <= fin)
+        if entiere and type_mvt is None and produit_id is None:
+            # Résumé précalculé : le fichier n'est pas ouvert
+            total += lignes
+        else:
+            total += len(lire_partition(conn, fichier, debut, fin, type_mvt, produit_id, colonnes=["id"]))
+    return total
+
+
+# Les `limite` mouvements archivés les plus récents avant le curseur (date, id), par (date, id) décroissants.
+# Les partitions sont lues de la plus récente à la plus ancienne, jusqu'à ce que les suivantes ne puissent
+# plus entrer dans la page.
+@mesures.instrumenter("archives.page", lignes=len)
+def page(conn, limite, apres=None, debut=None, fin=None, type_mvt=None, produit_id=None):
+    if apres is not None:
+        fin = apres[0] if fin is None else min(fin, apres[0])
+    retenus = pd.DataFrame(columns=COLONNES)
+    for fichier, date_max in partitions(conn, debut, fin)[["fichier", "date_max"]].itertuples(index=False):
+        if len(retenus) >= limite and date_max < retenus["date"].iloc[-1]:
+            break
+        lignes = lire_partition(conn, fichier, debut, fin, type_mvt, produit_id)
+        if apres is not None:
+            lignes = lignes[(lignes["date"] < apres[0]) | ((lignes["date"] == apres[0]) & (lignes["id"] < apres[1]))]
+        retenus = pd.concat([retenus, lignes] if len(retenus) else [lignes], ignore_index=True).sort_values(
+            ["date", "id"], ascending=False).head(limite)
+    return retenus.reset_index(drop=True)
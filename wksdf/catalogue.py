@@ -0,0 +1,149 @@
+"""Catalogue des produits indexé par identifiant, par nom et par catégorie.
+
+Les index sont des dictionnaires (position de la ligne dans le DataFrame des
+produits) : les recherches sont en temps constant au lieu d'un parcours de la
+colonne à chaque appel. Comme les DataFrames partagés, un catalogue n'est
+jamais modifié : ajout, modification ou purge d'un produit en publient un
+nouveau. Une écriture qui ne touche que les quantités réutilise les index
+(mêmes lignes, dans le même ordre) avec le nouveau DataFrame ; l'ajout ou la
+modification d'une fiche (ajouter, modifier) copient les index et n'y mettent
+à jour que les entrées du produit, sans relire les colonnes du catalogue.
+
+Un nom porté par plusieurs produits (anciennes données) désigne le premier,
+comme pour la saisie d'un mouvement ; ces noms sont listés dans `doublons`.
+"""
+import numpy as np
+import pandas as pd
+
+
+class Catalogue:
+    def __init__(self, produits, index=None):
+        self.produits = produits
+        if index is None:
+            index = self._indexer(produits)
+        self._index = index
+        self._ids, self._noms, self._par_id, self._par_nom, self._par_categorie, self.doublons = index
+        self._prix = None
+
+    @staticmethod
+    def _indexer(produits):
+        ids, noms = produits["ID"].tolist(), produits["Nom Produit"].tolist()
+        par_id = {produit_id: position for position, produit_id in enumerate(ids)}
+        par_nom, doublons = {}, []
+        for position, nom in enumerate(noms):
+            if nom in par_nom:
+                doublons.append(nom)
+            else:
+                par_nom[nom] = position
+        par_categorie = produits.groupby("Catégorie", observed=True, sort=False).indices
+        return ids, noms, par_id, par_nom, par_categorie, sorted(set(doublons))
+
+    # Même catalogue sur un DataFrame dont seules les valeurs (quantités) ont changé
+    def avec_produits(self, produits):
+        return Catalogue(produits, self._index)
+
+    # Catalogue de `produits`, qui ajoute une dernière ligne à ceux de ce catalogue
+    def ajouter(self, produits):
+        ids, noms, par_id, par_nom, par_categorie, doublons = self._index
+        position = len(ids)
+        ligne = produits.iloc[position]
+        produit_id, nom = int(ligne["ID"]), ligne["Nom Produit"]
+        par_id = {**par_id, produit_id: position}
+        if nom in par_nom:
+            doublons = sorted(set(doublons) | {nom})
+        else:
+            par_nom = {**par_nom, nom: position}
+        par_categorie = self._deplacer(par_categorie, position, None, ligne["Catégorie"])
+        catalogue = Catalogue(produits, (ids + [produit_id], noms + [nom], par_id, par_nom, par_categorie, doublons))
+        prix = self._prix_a_jour(produits)
+        if prix is not None:
+            catalogue._prix = pd.concat([prix, pd.Series(prix.dtype.type(ligne["Prix Unitaire"]), index=[produit_id])])
+        return catalogue
+
+    # Catalogue de `produits`, où seule la fiche produit_id diffère de celles de ce catalogue
+    def modifier(self, produits, produit_id):
+        ids, noms, par_id, par_nom, par_categorie, doublons = self._index
+        position = self.position(produit_id)
+        ligne = produits.iloc[position]
+        ancien, nom = noms[position], ligne["Nom Produit"]
+        if nom != ancien:
+            noms, par_nom, doublons = list(noms), dict(par_nom), set(doublons)
+            noms[position] = nom
+            # Ancien nom : désigne le produit suivant qui le porte, s'il y en a un (seulement pour un doublon)
+            if par_nom.get(ancien) == position:
+                del par_nom[ancien]
+                if ancien in doublons:
+                    par_nom[ancien] = noms.index(ancien)
+            if ancien in doublons and noms.count(ancien) < 2:
+                doublons.discard(ancien)
+            if nom in par_nom:
+                doublons.add(nom)
+            if par_nom.get(nom, position) >= position:
+                par_nom[nom] = position
+            doublons = sorted(doublons)
+        par_categorie = self._deplacer(par_categorie, position, self.produits["Catégorie"].iloc[position],
+                                       ligne["Catégorie"])
+        catalogue = Catalogue(produits, (ids, noms, par_id, par_nom, par_categorie, doublons))
+        catalogue._prix = prix = self._prix_a_jour(produits)
+        if prix is not None and ligne["Prix Unitaire"] != prix.iloc[position]:
+            catalogue._prix = prix.copy()
+            catalogue._prix.iloc[position] = ligne["Prix Unitaire"]
+        return catalogue
+
+    # Index des prix réutilisable pour `produits` (même type de colonne), None s'il sera recalculé à la lecture
+    def _prix_a_jour(self, produits):
+        if self._prix is None or self._prix.dtype != pd.to_numeric(produits["Prix Unitaire"]).dtype:
+            return None
+        return self._prix
+
+    # Positions par catégorie après le passage d'une ligne de l'ancienne catégorie à la nouvelle (None ou
+    # valeur manquante : aucune) ; les catégories restent dans l'ordre de leur première ligne
+    @staticmethod
+    def _deplacer(par_categorie, position, ancienne, nouvelle):
+        ancienne = None if pd.isna(ancienne) else ancienne
+        nouvelle = None if pd.isna(nouvelle) else nouvelle
+        if ancienne == nouvelle:
+            return par_categorie
+        par_categorie = dict(par_categorie)
+        if ancienne is not None:
+            restantes = par_categorie[ancienne][par_categorie[ancienne] != position]
+            if len(restantes):
+                par_categorie[ancienne] = restantes
+            else:
+                del par_categorie[ancienne]
+        if nouvelle is not None:
+            positions = par_categorie.get(nouvelle, np.array([], dtype="intp"))
+            par_categorie[nouvelle] = np.insert(positions, np.searchsorted(positions, position), position)
+        return dict(sorted(par_categorie.items(), key=lambda element: element[1][0]))
+
+    def __len__(self):
+        return len(self._par_id)
+
+    def __contains__(self, nom):
+        return nom in self._par_nom
+
+    def position(self, produit_id):
+        return self._par_id[int(produit_id)]
+
+    def ligne(self, produit_id):
+        return self.produits.iloc[self.position(produit_id)]
+
+    def id_de(self, nom):
+        position = self._par_nom.get(nom)
+        return None if position is None else self._ids[position]
+
+    def nom(self, produit_id):
+        return self._noms[self.position(produit_id)]
+
+    def categories(self):
+        return list(self._par_categorie)
+
+    def de_categorie(self, categorie):
+        positions = self._par_categorie.get(categorie)
+        return self.produits.iloc[positions if positions is not None else []]
+
+    # Prix unitaire par identifiant, pour valoriser les ventes agrégées
+    def prix_par_id(self):
+        if self._prix is None:
+            self._prix = pd.Series(pd.to_numeric(self.produits["Prix Unitaire"]).to_numpy(), index=self._ids)
+        return self._prix
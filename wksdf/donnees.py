@@ -0,0 +1,360 @@
+"""Données partagées entre toutes les sessions Streamlit du processus.
+
+La base est lue une seule fois ; toutes les sessions reçoivent les mêmes
+DataFrames. Le cache est invalidé quand le fichier de la base (ou son WAL)
+change sur disque et que la version des données a bougé, c'est-à-dire
+lorsqu'un autre processus a écrit ; seuls les mouvements nouveaux sont alors
+relus, le journal étant en ajout seul. Les écritures faites via cet objet
+mettent à jour les DataFrames en mémoire au lieu de forcer une relecture.
+
+Les DataFrames sont typés une fois au chargement (voir schema.py) et gardent
+ces types au fil des écritures. Ils ne sont jamais modifiés sur place : chaque écriture
+publie de nouveaux objets, si bien qu'une session en cours de rendu garde une
+vue cohérente. Les mouvements saisis un par un ou par lots sont mis en file et
+appliqués aux DataFrames en une seule fois à la lecture suivante, pour que les
+saisies concurrentes ne paient pas chacune une copie des tables.
+
+Les produits en alerte sont tenus par un MoteurAlertes (voir alertes.py), qui
+lit après chaque écriture les franchissements de seuil qu'elle a enregistrés ;
+le tableau de bord et la barre latérale n'ont plus à parcourir le catalogue.
+
+Seul le journal courant est chargé : les mouvements archivés (voir
+archives.py) restent sur disque. Un archivage retire des lignes du journal,
+ce que le rattrapage détecte (nombre total de mouvements) pour tout relire.
+"""
+import os
+import threading
+from datetime import date
+
+import pandas as pd
+
+from wksdf import (agregats, alertes, archives, graphiques, import_masse, instantanes, mesures, previsions, schema,
+                   stockage)
+from wksdf.catalogue import Catalogue
+
+# Nombre maximal de résultats mémorisés (séries par période et par plage affichée)
+TAILLE_MEMO = 64
+
+
+class DonneesPartagees:
+    def __init__(self, db_path=stockage.DB_PATH, excel_path=stockage.EXCEL_PATH):
+        self.db_path = db_path
+        self.excel_path = excel_path
+        self._verrou = threading.RLock()
+        self._signature = None
+        self.version = None
+        self.produits = None
+        self.mouvements = None
+        self.catalogue = None
+        self._memo = {}
+        self._en_attente = []
+        self.alertes = alertes.MoteurAlertes()
+
+    # Empreinte bon marché des fichiers de la base : (mtime, taille) de la base et du WAL
+    def _lire_signature(self):
+        signature = []
+        for chemin in (self.db_path, self.db_path + "-wal"):
+            try:
+                stat = os.stat(chemin)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _recharger(self, conn):
+        with mesures.mesurer("donnees.recharger") as mesure:
+            self._en_attente = []
+            self._signature = self._lire_signature()
+            produits, mouvements, self.version = stockage.charger_version(conn)
+            self.produits = schema.typer_produits(produits)
+            self.mouvements = schema.typer_mouvements(mouvements, self.produits)
+            self.catalogue = Catalogue(self.produits)
+            self.alertes.charger(conn)
+            mesure.lignes = len(self.mouvements)
+
+    # Rattrapage des écritures d'un autre processus sans relire tout le journal
+    def _rafraichir(self, conn):
+        self._appliquer_attente()
+        signature = self._lire_signature()
+        dernier_id = int(self.mouvements["ID"].max()) if len(self.mouvements) else 0
+        produits, nouveaux, total, version = stockage.charger_depuis(conn, dernier_id)
+        if total != len(self.mouvements) + len(nouveaux):
+            # Journal purgé ou réécrit : relecture complète
+            self._recharger(conn)
+            return
+        with mesures.mesurer("donnees.rafraichir", len(nouveaux)):
+            self.produits = schema.typer_produits(produits)
+            self.mouvements = schema.ajouter_mouvements(self.mouvements, nouveaux, self.produits)
+            self.catalogue = Catalogue(self.produits)
+            self.alertes.suivre(conn)
+        self.version = version
+        self._signature = signature
+
+    def _actualiser(self):
+        with self._verrou:
+            signature = self._lire_signature()
+            if self.version is None or signature != self._signature:
+                with stockage.ouvrir(self.db_path) as conn:
+                    if self.version is None:
+                        stockage.initialiser(conn, self.excel_path)
+                        self._recharger(conn)
+                    elif stockage.version(conn) != self.version:
+                        self._rafraichir(conn)
+                    else:
+                        # Fichier touché (checkpoint du WAL) sans changement de contenu
+                        self._signature = signature
+
+    def obtenir(self):
+        with self._verrou:
+            self._actualiser()
+            self._appliquer_attente()
+            return self.produits, self.mouvements
+
+    def obtenir_catalogue(self):
+        with self._verrou:
+            self.obtenir()
+            return self.catalogue
+
+    # Applique en un seul concat les mouvements unitaires déjà écrits en base
+    def _appliquer_attente(self):
+        if not self._en_attente:
+            return
+        with mesures.mesurer("donnees.appliquer_attente", len(self._en_attente)):
+            nouveaux = pd.DataFrame(self._en_attente)
+            self._en_attente = []
+            signe = nouveaux["Type"].map({"Entrée": 1, "Sortie": -1})
+            deltas = (nouveaux["Quantité"] * signe).groupby(nouveaux["Produit ID"]).sum()
+            positions = [self.catalogue.position(produit_id) for produit_id in deltas.index]
+            produits = self.produits.copy()
+            produits.iloc[positions, produits.columns.get_loc("Quantité")] += deltas.to_numpy()
+            self.produits = produits
+            self.catalogue = self.catalogue.avec_produits(produits)
+            self.mouvements = schema.ajouter_mouvements(self.mouvements, nouveaux, produits)
+
+    # Résultat de calcul mémorisé tant que la version des données ne change pas
+    def memoriser(self, cle, calcul):
+        with self._verrou:
+            self.obtenir()
+            version = self.version
+            entree = self._memo.get(cle)
+            if entree is not None and entree[0] == version:
+                return entree[1]
+        with mesures.mesurer(f"calcul.{cle if isinstance(cle, str) else cle[0]}"):
+            valeur = calcul()
+        with self._verrou:
+            memo = {c: e for c, e in self._memo.items() if e[0] == self.version}
+            # Au plus TAILLE_MEMO résultats : les plus anciens partent en premier
+            for ancienne in list(memo)[:max(0, len(memo) + 1 - TAILLE_MEMO)]:
+                del memo[ancienne]
+            memo[cle] = (version, valeur)
+            self._memo = memo
+        return valeur
+
+    # Séries du tableau de bord lues dans les agrégats matérialisés
+    def mouvements_par_periode(self, granularite):
+        def calcul():
+            with stockage.ouvrir(self.db_path) as conn:
+                return agregats.lire_mouvements(conn, granularite)
+
+        return self.memoriser(("mouvements", granularite), calcul)
+
+    def recettes_par_periode(self, granularite):
+        def calcul():
+            with stockage.ouvrir(self.db_path) as conn:
+                ventes = agregats.lire_ventes(conn, granularite)
+            catalogue = self.catalogue
+            return agregats.recettes(ventes, catalogue.produits, granularite, catalogue.prix_par_id())
+
+        return self.memoriser(("recettes", granularite), calcul)
+
+    # Séries des graphiques, restreintes à la plage affichée puis réduites à `points` points (LTTB) ;
+    # renvoient (série réduite, nombre de lignes avant réduction)
+    def graphique_mouvements(self, granularite, debut=None, fin=None, points=graphiques.POINTS_MAX):
+        def calcul():
+            serie = graphiques.filtrer(self.mouvements_par_periode(granularite), "Date", debut, fin)
+            return graphiques.reduire(serie, "Date", "Quantité", points, par="Type"), len(serie)
+
+        return self.memoriser(("graphique_mouvements", granularite, debut, fin, points), calcul)
+
+    def graphique_recettes(self, granularite, debut=None, fin=None, points=graphiques.POINTS_MAX):
+        def calcul():
+            serie = graphiques.filtrer(self.recettes_par_periode(granularite), "Période", debut, fin)
+            return graphiques.reduire(serie, "Période", "Recettes", points), len(serie)
+
+        return self.memoriser(("graphique_recettes", granularite, debut, fin, points), calcul)
+
+    def recettes_totales(self):
+        return self.recettes_par_periode("année")["Recettes"].sum()
+
+    # Lignes des produits en alerte, dans l'ordre du catalogue : O(produits en alerte) après chaque écriture
+    def produits_en_alerte(self):
+        def calcul():
+            with self._verrou:
+                catalogue = self.catalogue
+                positions = sorted(catalogue.position(produit_id) for produit_id in self.alertes.actives)
+                return catalogue.produits.iloc[positions]
+
+        return self.memoriser("produits_en_alerte", calcul)
+
+    # Depuis quand chaque produit est en alerte (horodatage du franchissement), par identifiant
+    def alertes_depuis(self):
+        with self._verrou:
+            self.obtenir()
+            return {produit_id: f["date"] for produit_id, f in self.alertes.actives.items()}
+
+    def derniers_franchissements(self, limite=50):
+        def calcul():
+            with stockage.ouvrir(self.db_path) as conn:
+                return alertes.derniers(conn, limite)
+
+        return self.memoriser(("franchissements", limite), calcul)
+
+    # Consommations et projections de tous les produits, recalculées à chaque écriture et chaque jour
+    def previsions(self, delai=previsions.DELAI, couverture=previsions.COUVERTURE, jour=None):
+        jour = jour or date.today()
+
+        def consommations():
+            produits, mouvements = self.obtenir()
+            return previsions.consommations(produits, mouvements, jour)
+
+        def calcul():
+            return previsions.projeter(self.memoriser(("consommations", jour), consommations), jour, delai, couverture)
+
+        return self.memoriser(("previsions", jour, delai, couverture), calcul)
+
+    # Partitions de mouvements archivées, de la plus récente à la plus ancienne
+    def partitions_archivees(self):
+        def calcul():
+            with stockage.ouvrir(self.db_path) as conn:
+                return archives.partitions(conn)
+
+        return self.memoriser("partitions_archivees", calcul)
+
+    # Stock de tous les produits à la fin d'un jour passé (instantanés et journal)
+    def stock_a_date(self, jour):
+        def calcul():
+            with stockage.ouvrir(self.db_path) as conn:
+                return instantanes.stock_a_date(conn, jour)
+
+        return self.memoriser(("stock_a_date", jour), calcul)
+
+    # Stock d'un produit jour par jour ; renvoie (série réduite, nombre de jours avant réduction)
+    def graphique_stock(self, produit_id, debut=None, fin=None, points=graphiques.POINTS_MAX):
+        def serie():
+            with stockage.ouvrir(self.db_path) as conn:
+                return instantanes.serie_stock(conn, produit_id)
+
+        def calcul():
+            jours = graphiques.filtrer(self.memoriser(("serie_stock", produit_id), serie), "Date", debut, fin)
+            return graphiques.reduire(jours, "Date", "Quantité", points), len(jours)
+
+        return self.memoriser(("graphique_stock", produit_id, debut, fin, points), calcul)
+
+    # Exécute une écriture puis applique sa mise à jour en mémoire (maj renvoie produits, mouvements et
+    # catalogue ; ou la met en file avec en_attente), ou relit si un autre processus a écrit ; ses
+    # franchissements de seuil sont notifiés hors du verrou
+    def _ecrire(self, ecriture, maj=None, en_attente=None):
+        with self._verrou:
+            self._actualiser()
+            with stockage.ouvrir(self.db_path) as conn:
+                resultat = ecriture(conn)
+                franchissements = self.alertes.suivre(conn)
+                signature = self._lire_signature()
+                version = stockage.version(conn)
+                if version == self.version:
+                    # Rien n'a été écrit (lot entièrement rejeté, par exemple)
+                    pass
+                elif version == self.version + 1:
+                    if en_attente is not None:
+                        self._en_attente.extend(en_attente(resultat))
+                    elif maj is not None:
+                        self._appliquer_attente()
+                        self.produits, self.mouvements, self.catalogue = maj(self.produits, self.mouvements,
+                                                                             resultat)
+                    self.version += 1
+                    self._signature = signature
+                else:
+                    self._rafraichir(conn)
+        self.alertes.notifier(franchissements)
+        return resultat
+
+    def ajouter_produit(self, nom, categorie, prix, quantite, seuil, date_ajout):
+        def maj(produits, mouvements, new_id):
+            nouveau_produit = pd.DataFrame([{
+                "ID": new_id,
+                "Nom Produit": nom,
+                "Catégorie": categorie,
+                "Prix Unitaire": prix,
+                "Quantité": quantite,
+                "Seuil Alerte": seuil,
+                "Date Ajout": date_ajout
+            }])
+            produits = schema.typer_produits(
+                pd.concat([produits.astype({"Catégorie": object}), nouveau_produit], ignore_index=True))
+            return produits, mouvements, self.catalogue.ajouter(produits)
+
+        return self._ecrire(
+            lambda conn: stockage.ajouter_produit(conn, nom, categorie, prix, quantite, seuil, date_ajout), maj)
+
+    def modifier_produit(self, produit_id, nom, categorie, prix, quantite, seuil, version_attendue=None):
+        def maj(produits, mouvements, _):
+            # Colonnes en object : un prix décimal sur une colonne entière est retypé par typer_produits
+            produits = produits.astype({colonne: object for colonne in (
+                "Nom Produit", "Catégorie", "Prix Unitaire", "Quantité", "Seuil Alerte")})
+            idx = produits.index[self.catalogue.position(produit_id)]
+            produits.loc[idx, ["Nom Produit", "Catégorie", "Prix Unitaire", "Quantité", "Seuil Alerte"]] = [
+                nom, categorie, prix, quantite, seuil]
+            produits = schema.typer_produits(produits)
+            return produits, mouvements, self.catalogue.modifier(produits, produit_id)
+
+        self._ecrire(
+            lambda conn: stockage.modifier_produit(
+                conn, produit_id, nom, categorie, prix, quantite, seuil, version_attendue), maj)
+
+    def enregistrer_mouvement(self, produit, type_mvt, quantite, commentaire=""):
+        def en_attente(resultat):
+            new_id, date = resultat
+            return [{
+                "ID": new_id,
+                "Date": date,
+                "Produit": produit,
+                "Type": type_mvt,
+                "Quantité": quantite,
+                "Commentaire": commentaire,
+                "Produit ID": self.catalogue.id_de(produit)
+            }]
+
+        return self._ecrire(
+            lambda conn: stockage.enregistrer_mouvement(conn, produit, type_mvt, quantite, commentaire),
+            en_attente=en_attente)
+
+    def verifier_agregats(self):
+        with stockage.ouvrir(self.db_path) as conn:
+            return agregats.verifier(conn)
+
+    def reconstruire_agregats(self):
+        self._ecrire(stockage.reconstruire_agregats)
+
+    # Import en masse : renvoie (acceptés, rejetés) ; les acceptés rejoignent la file des mouvements unitaires
+    def importer_mouvements(self, lot):
+        def en_attente(resultat):
+            return resultat[0][stockage.COLONNES_MOUVEMENTS].to_dict("records")
+
+        return self._ecrire(lambda conn: import_masse.importer(conn, lot), en_attente=en_attente)
+
+    def reinitialiser_stock(self):
+        def maj(produits, mouvements, _):
+            produits = produits.assign(**{"Quantité": 0})
+            return produits, mouvements, self.catalogue.avec_produits(produits)
+
+        self._ecrire(stockage.reinitialiser_stock, maj)
+
+    def purger(self):
+        def maj(produits, mouvements, _):
+            produits, mouvements = schema.vides()
+            return produits, mouvements, Catalogue(produits)
+
+        self._ecrire(stockage.purger, maj)
+        # Journal des alertes vidé : l'état en mémoire est relu
+        with self._verrou, stockage.ouvrir(self.db_path) as conn:
+            self.alertes.charger(conn)
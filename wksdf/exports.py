@@ -0,0 +1,178 @@
+"""Exports CSV et Excel construits à la demande, par lots, avec mémoire bornée.
+
+Les lignes sont lues dans la base par paquets (curseur SQLite + fetchmany) et
+écrites au fil de l'eau : csv.writer pour le CSV, classeur openpyxl en mode
+write_only pour le XLSX. Chaque fichier produit est conservé dans
+data/exports/ sous un nom qui inclut la version des données ; il est
+réutilisé tant que les données ne changent pas, puis supprimé CONSERVATION
+secondes après la création du fichier de la version suivante.
+
+Exécutés comme tâches de fond (voir taches.py), les exports signalent leur
+avancement après chaque lot.
+
+L'export des mouvements couvre tout l'historique : les partitions archivées
+(voir archives.py), de la plus ancienne à la plus récente, puis le journal
+courant.
+"""
+import csv
+import glob
+import os
+import tempfile
+import time
+
+import pandas as pd
+from openpyxl import Workbook
+
+from wksdf import agregats, archives, mesures, stockage, taches
+
+EXPORT_DIR = "data/exports"
+TAILLE_LOT = 50_000
+# Durée (secondes) pendant laquelle le fichier d'une version remplacée reste téléchargeable
+CONSERVATION = 3600
+
+_REQUETES = {
+    "Produits": (stockage.requete_select("produits", stockage.SQL_PRODUITS), stockage.COLONNES_PRODUITS),
+    "Mouvements": (stockage.requete_select("mouvements", stockage.SQL_MOUVEMENTS), stockage.COLONNES_MOUVEMENTS),
+}
+
+
+# Partitions archivées, de la plus ancienne à la plus récente (une partition en mémoire à la fois)
+def _lots_archives(conn, taille_lot):
+    for fichier in archives.partitions(conn)["fichier"].iloc[::-1]:
+        partition = archives.lire_partition(conn, fichier)
+        for debut in range(0, len(partition), taille_lot):
+            lot = partition.iloc[debut:debut + taille_lot].astype(object)
+            yield list(lot.where(lot.notna(), None).itertuples(index=False, name=None))
+
+
+def _lots(conn, table, taille_lot=TAILLE_LOT):
+    if table == "Mouvements":
+        yield from _lots_archives(conn, taille_lot)
+    cur = conn.execute(_REQUETES[table][0])
+    while True:
+        lignes = cur.fetchmany(taille_lot)
+        if not lignes:
+            break
+        yield lignes
+
+
+# Avancement de la tâche en cours au fil des lots écrits, sur la part `part` du travail (sans effet hors tâche)
+def _progression(conn, tables, part=1.0):
+    if not taches.suivie():
+        return lambda lignes, table: None
+    total = max(sum(conn.execute(f"SELECT COUNT(*) FROM {table.lower()}").fetchone()[0]
+                    + (archives.compter(conn) if table == "Mouvements" else 0) for table in tables), 1)
+    fait = 0
+
+    def avancer(lignes, table):
+        nonlocal fait
+        fait += lignes
+        taches.avancer(part * fait / total, f"{table} : {fait} / {total} lignes")
+
+    return avancer
+
+
+def ecrire_csv(conn, table, chemin, taille_lot=TAILLE_LOT):
+    colonnes = _REQUETES[table][1]
+    avancer = _progression(conn, [table])
+    with open(chemin, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(colonnes)
+        for lignes in _lots(conn, table, taille_lot):
+            writer.writerows(lignes)
+            avancer(len(lignes), table)
+
+
+def _ecrire_feuille_df(classeur, titre, df):
+    feuille = classeur.create_sheet(titre)
+    feuille.append(list(df.columns))
+    for ligne in df.astype(object).itertuples(index=False, name=None):
+        feuille.append(list(ligne))
+
+
+# Classeur complet (Produits, Mouvements et éventuellement Recettes) en mode write_only
+def ecrire_excel(conn, chemin, recettes_df=None, taille_lot=TAILLE_LOT):
+    classeur = Workbook(write_only=True)
+    # L'enregistrement final (compression du classeur) compte pour le dernier dixième
+    avancer = _progression(conn, list(_REQUETES), part=0.9)
+    for table, (_, colonnes) in _REQUETES.items():
+        feuille = classeur.create_sheet(table)
+        feuille.append(colonnes)
+        for lignes in _lots(conn, table, taille_lot):
+            for ligne in lignes:
+                feuille.append(ligne)
+            avancer(len(lignes), table)
+    if recettes_df is not None:
+        _ecrire_feuille_df(classeur, "Recettes", recettes_df)
+    taches.avancer(0.9, "Enregistrement du classeur")
+    classeur.save(chemin)
+
+
+# Chemin du fichier d'export pour la version courante, généré seulement s'il n'existe pas encore
+def exporter(db_path, nom, extension, ecrire, dossier=EXPORT_DIR):
+    if not os.path.exists(dossier):
+        os.makedirs(dossier, exist_ok=True)
+    with stockage.ouvrir(db_path) as conn:
+        # Lecture dans une seule transaction : version et contenu cohérents
+        conn.execute("BEGIN")
+        try:
+            chemin = os.path.join(dossier, f"{nom}-v{stockage.version(conn)}{extension}")
+            if not os.path.exists(chemin):
+                descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix=extension)
+                os.close(descripteur)
+                try:
+                    with mesures.mesurer(f"export.{nom}"):
+                        ecrire(conn, temporaire)
+                    os.replace(temporaire, chemin)
+                finally:
+                    if os.path.exists(temporaire):
+                        os.remove(temporaire)
+        finally:
+            conn.commit()
+    _supprimer_remplaces(dossier, nom, extension)
+    return chemin
+
+
+# Fichiers des versions précédentes supprimés une fois remplacés depuis plus de CONSERVATION secondes : un bouton
+# de téléchargement affiché avant le remplacement pointe encore vers l'ancien fichier
+def _supprimer_remplaces(dossier, nom, extension):
+    versions = {}
+    for fichier in glob.glob(os.path.join(glob.escape(dossier), f"{glob.escape(nom)}-v*{extension}")):
+        numero = os.path.basename(fichier)[len(nom) + 2:-len(extension)]
+        if numero.isdigit():
+            versions[int(numero)] = fichier
+    ordre = sorted(versions)
+    for numero, suivant in zip(ordre, ordre[1:]):
+        try:
+            if time.time() - os.path.getmtime(versions[suivant]) > CONSERVATION:
+                os.remove(versions[numero])
+        except OSError:
+            pass
+
+
+def produits_csv(db_path, dossier=EXPORT_DIR):
+    return exporter(db_path, "produits", ".csv", lambda conn, chemin: ecrire_csv(conn, "Produits", chemin), dossier)
+
+
+def mouvements_csv(db_path, dossier=EXPORT_DIR):
+    return exporter(db_path, "mouvements", ".csv", lambda conn, chemin: ecrire_csv(conn, "Mouvements", chemin),
+                    dossier)
+
+
+def donnees_excel(db_path, dossier=EXPORT_DIR):
+    return exporter(db_path, "donnees_stock_complet", ".xlsx", ecrire_excel, dossier)
+
+
+# Rapport avec la feuille Recettes, calculée depuis les agrégats dans la même transaction
+def rapport_excel(db_path, periode, dossier=EXPORT_DIR):
+    def ecrire(conn, chemin):
+        produits = pd.read_sql_query(stockage.requete_select("produits", stockage.SQL_PRODUITS), conn)
+        recettes_df = agregats.recettes(agregats.lire_ventes(conn, periode), produits, periode)
+        ecrire_excel(conn, chemin, recettes_df)
+
+    return exporter(db_path, f"rapport_complet_{periode}", ".xlsx", ecrire, dossier)
+
+
+def lire(chemin):
+    with open(chemin, "rb") as f:
+        return f.read()
@@ -0,0 +1,76 @@
+"""Réduction côté serveur des séries envoyées aux graphiques Plotly.
+
+Une série journalière sur plusieurs années compte des milliers de points,
+bien plus que la largeur du graphique en pixels. Les séries sont réduites à
+un budget de points par l'algorithme LTTB (Largest-Triangle-Three-Buckets) :
+la série est découpée en paquets de taille égale et, dans chaque paquet, on
+garde le point qui forme le plus grand triangle avec le point retenu
+précédemment et la moyenne du paquet suivant. Les pics et les creux sont
+conservés, le premier et le dernier point aussi.
+"""
+import numpy as np
+import pandas as pd
+
+POINTS_MAX = 1000
+
+
+# Abscisses numériques : dates en nanosecondes, nombres tels quels
+def _abscisses(serie):
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.to_numpy(dtype="float64")
+    return pd.to_datetime(serie).to_numpy(dtype="datetime64[ns]").astype("int64").astype("float64")
+
+
+# Indices des points retenus par LTTB parmi x, y (triés par x)
+def lttb(x, y, seuil):
+    n = len(x)
+    if seuil >= n or seuil < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+
+    # seuil - 2 paquets sur les points intérieurs, bornes [bornes[i], bornes[i + 1])
+    bornes = np.linspace(1, n - 1, seuil - 1).astype("int64")
+    effectifs = np.diff(bornes)
+    moyennes_x = np.add.reduceat(x[1:n - 1], bornes[:-1] - 1) / effectifs
+    moyennes_y = np.add.reduceat(y[1:n - 1], bornes[:-1] - 1) / effectifs
+    # Le « paquet suivant » du dernier paquet est le dernier point
+    suivants_x = np.append(moyennes_x[1:], x[-1])
+    suivants_y = np.append(moyennes_y[1:], y[-1])
+
+    indices = np.empty(seuil, dtype="int64")
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(seuil - 2):
+        debut, fin = bornes[i], bornes[i + 1]
+        xa, ya = x[a], y[a]
+        aires = np.abs((xa - suivants_x[i]) * (y[debut:fin] - ya) - (xa - x[debut:fin]) * (suivants_y[i] - ya))
+        a = debut + int(np.argmax(aires))
+        indices[i + 1] = a
+    return indices
+
+
+# Lignes de df réduites à `points` par série (une série par valeur de `par`, le cas échéant)
+def reduire(df, x, y, points=POINTS_MAX, par=None):
+    if df.empty:
+        return df
+    groupes = [df] if par is None else [groupe for _, groupe in df.groupby(par, observed=True, sort=False)]
+    reduits = []
+    for groupe in groupes:
+        groupe = groupe.sort_values(x, kind="stable")
+        indices = lttb(_abscisses(groupe[x]), groupe[y].to_numpy(dtype="float64"), points)
+        reduits.append(groupe.iloc[indices])
+    return pd.concat(reduits, ignore_index=True) if len(reduits) > 1 else reduits[0].reset_index(drop=True)
+
+
+# Lignes dont l'abscisse (dates) est dans [debut, fin] ; une borne None ne filtre pas
+def filtrer(df, x, debut=None, fin=None):
+    if debut is None and fin is None:
+        return df
+    dates = pd.to_datetime(df[x])
+    masque = pd.Series(True, index=df.index)
+    if debut is not None:
+        masque &= dates >= pd.Timestamp(debut)
+    if fin is not None:
+        masque &= dates <= pd.Timestamp(fin)
+    return df[masque]
@@ -0,0 +1,75 @@
+"""Requêtes paginées sur l'historique des mouvements.
+
+Les filtres (type, identifiant de produit, intervalle de dates) s'appuient sur
+les index (date, id), (produit_id, date, id) et (type, date, id) de la table
+mouvements : une fenêtre de 30 jours pour un produit ne lit que les lignes
+concernées. Les pages sont servies par curseur (keyset) sur (date, id), du
+plus récent au plus ancien, sans OFFSET à parcourir.
+
+Les mouvements archivés (voir archives.py) sont fusionnés aux résultats du
+journal courant : seules les partitions qui recoupent l'intervalle demandé
+sont ouvertes, et une page récente n'en ouvre aucune dès que le journal
+courant suffit à la remplir.
+"""
+import pandas as pd
+
+from wksdf import archives, mesures, stockage
+
+TAILLE_PAGE = 50
+
+
+def _filtres(type_mvt=None, produit_id=None, debut=None, fin=None):
+    conditions, params = [], []
+    if type_mvt is not None:
+        conditions.append("type = ?")
+        params.append(type_mvt)
+    if produit_id is not None:
+        conditions.append("produit_id = ?")
+        params.append(int(produit_id))
+    if debut is not None:
+        conditions.append("date >= ?")
+        params.append(debut.strftime("%Y-%m-%d"))
+    if fin is not None:
+        conditions.append("date <= ?")
+        params.append(fin.strftime("%Y-%m-%d"))
+    return conditions, params
+
+
+def _jour(valeur):
+    return None if valeur is None else valeur.strftime("%Y-%m-%d")
+
+
+@mesures.instrumenter("historique.compter")
+def compter_mouvements(conn, type_mvt=None, produit_id=None, debut=None, fin=None):
+    conditions, params = _filtres(type_mvt, produit_id, debut, fin)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return conn.execute(f"SELECT COUNT(*) FROM mouvements{where}", params).fetchone()[0] + archives.compter(
+        conn, _jour(debut), _jour(fin), type_mvt, produit_id)
+
+
+# Une page de mouvements ; `apres` est le curseur (date, id) renvoyé pour la page précédente
+@mesures.instrumenter("historique.page", lignes=lambda r: len(r[0]))
+def page_mouvements(conn, type_mvt=None, produit_id=None, debut=None, fin=None, limite=TAILLE_PAGE,
+                    apres=None):
+    conditions, params = _filtres(type_mvt, produit_id, debut, fin)
+    if apres is not None:
+        conditions.append("(date, id) < (?, ?)")
+        params.extend(apres)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    colonnes = ", ".join(f'{sql} AS "{col}"' for sql, col in stockage.SQL_MOUVEMENTS.items())
+    page = pd.read_sql_query(
+        f"SELECT {colonnes} FROM mouvements{where} ORDER BY date DESC, id DESC LIMIT ?",
+        conn, params=params + [limite + 1])
+    # Les archives ne sont lues que si la page du journal courant n'est pas pleine ou si elles la recoupent
+    plus_ancienne = page["Date"].iloc[-1] if len(page) > limite else None
+    archivees = archives.page(conn, limite + 1, apres, _jour(debut) if plus_ancienne is None
+                              else max(plus_ancienne, _jour(debut) or plus_ancienne), _jour(fin), type_mvt, produit_id)
+    if len(archivees):
+        archivees = archivees.rename(columns=stockage.SQL_MOUVEMENTS)
+        page = pd.concat([page, archivees[page.columns]], ignore_index=True).sort_values(
+            ["Date", "ID"], ascending=False).head(limite + 1).reset_index(drop=True)
+    suivant = None
+    if len(page) > limite:
+        page = page.iloc[:limite]
+        suivant = (page["Date"].iloc[-1], int(page["ID"].iloc[-1]))
+    return page, suivant
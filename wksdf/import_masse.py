@@ -0,0 +1,106 @@
+"""Import en masse de mouvements depuis un fichier CSV ou Excel.
+
+Toutes les lignes sont validées en une passe vectorisée : produit connu, type
+Entrée/Sortie, quantité entière positive, date au format AAAA-MM-JJ (ou date
+Excel) et pas dans le futur (une vente datée de demain fausserait recettes et
+historique), puis stock jamais négatif, contrôlé par sommes cumulées par produit
+dans l'ordre du fichier.
+Les lignes acceptées sont écrites dans une seule transaction ; les lignes
+rejetées sont renvoyées avec leur motif.
+"""
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from wksdf import mesures, stockage
+
+COLONNES_REQUISES = ["Produit", "Type", "Quantité"]
+COLONNES_MODELE = ["Date", "Produit", "Type", "Quantité", "Commentaire"]
+_SIGNES = {"Entrée": 1, "Sortie": -1}
+
+
+def lire_fichier(fichier, nom=None):
+    nom = nom or getattr(fichier, "name", str(fichier))
+    extension = os.path.splitext(nom)[1].lower()
+    if extension == ".csv":
+        lot = pd.read_csv(fichier, dtype=object, keep_default_na=False, na_values=[""])
+    elif extension in (".xlsx", ".xls"):
+        lot = pd.read_excel(fichier, dtype=object)
+    else:
+        raise ValueError(f"Format de fichier non pris en charge : {extension or nom}")
+    lot.columns = [str(colonne).strip() for colonne in lot.columns]
+    manquantes = [colonne for colonne in COLONNES_REQUISES if colonne not in lot.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes : {', '.join(manquantes)}")
+    return lot
+
+
+def modele_csv():
+    return pd.DataFrame(columns=COLONNES_MODELE).to_csv(index=False).encode("utf-8")
+
+
+# Sépare le lot en lignes acceptées et rejetées ; produits : colonnes ID, Nom Produit, Quantité
+@mesures.instrumenter("import.valider", lignes=lambda r: len(r[0]) + len(r[1]))
+def valider(lot, produits, aujourd_hui=None):
+    lot = lot.reset_index(drop=True)
+    aujourd_hui = aujourd_hui or datetime.now().strftime("%Y-%m-%d")
+    motifs = pd.Series("", index=lot.index, dtype=object)
+
+    def rejeter(masque, motif):
+        motifs[(motifs == "") & masque] = motif
+
+    produit = lot["Produit"].astype("string").str.strip()
+    type_mvt = lot["Type"].astype("string").str.strip()
+    quantite = pd.to_numeric(lot["Quantité"], errors="coerce")
+    date_brute = lot["Date"] if "Date" in lot.columns else pd.Series(pd.NA, index=lot.index)
+    date_vide = date_brute.isna() | (date_brute.astype("string").str.strip() == "")
+    # Format imposé : une date comme 01/02/2025 est rejetée plutôt que lue au jour ou au mois près
+    date_brute = date_brute.map(lambda valeur: valeur.strip() if isinstance(valeur, str) else valeur)
+    dates = pd.to_datetime(date_brute.where(~date_vide, aujourd_hui), errors="coerce", format="%Y-%m-%d")
+    commentaire = lot["Commentaire"] if "Commentaire" in lot.columns else pd.Series("", index=lot.index)
+
+    ids = produits.drop_duplicates("Nom Produit").set_index("Nom Produit")["ID"]
+    produit_id = produit.map(ids)
+    rejeter(produit_id.isna(), "Produit inconnu")
+    rejeter(~type_mvt.isin(list(_SIGNES)).fillna(False), "Type invalide (Entrée ou Sortie attendu)")
+    rejeter(quantite.isna() | (quantite <= 0) | (quantite != quantite.round()), "Quantité invalide")
+    rejeter(dates.isna(), "Date invalide")
+    rejeter(dates.dt.normalize() > pd.Timestamp(aujourd_hui), "Date future")
+
+    # Contrôle du stock : les produits dont le solde cumulé reste positif sont acceptés en bloc ; pour les
+    # autres, une seule passe dans l'ordre du fichier, où une ligne rejetée ne modifie pas le stock, reproduit
+    # l'application ligne à ligne.
+    stocks = produits.set_index("ID")["Quantité"]
+    candidats = motifs == ""
+    variation = (quantite * type_mvt.map(_SIGNES)).where(candidats, 0)
+    solde = produit_id.map(stocks) + variation.groupby(produit_id).cumsum()
+    concernes = candidats & produit_id.isin(produit_id[candidats & (solde < 0).fillna(False)])
+    insuffisants = {}
+    for identifiant, lignes in variation[concernes].groupby(produit_id[concernes]):
+        stock = stocks[identifiant]
+        for ligne, delta in zip(lignes.index, lignes.to_numpy()):
+            if stock + delta < 0:
+                insuffisants[ligne] = f"Stock insuffisant ({stock:.0f} disponible(s))"
+            else:
+                stock += delta
+    if insuffisants:
+        motifs[list(insuffisants)] = list(insuffisants.values())
+
+    acceptes_masque = motifs == ""
+    acceptes = pd.DataFrame({
+        "Date": dates.dt.strftime("%Y-%m-%d"),
+        "Produit": produit,
+        "Type": type_mvt,
+        "Quantité": quantite,
+        "Commentaire": commentaire.fillna(""),
+        "Produit ID": produit_id,
+    })[acceptes_masque]
+    acceptes = acceptes.astype({"Produit": object, "Type": object, "Quantité": "int64", "Produit ID": "int64"})
+    rejetes = lot[~acceptes_masque].assign(Ligne=lot.index[~acceptes_masque] + 2, Motif=motifs[~acceptes_masque])
+    return acceptes.reset_index(drop=True), rejetes.reset_index(drop=True)
+
+
+# Validation contre le stock en base et écriture du lot dans une seule transaction
+def importer(conn, lot):
+    return stockage.enregistrer_mouvements(conn, lot, valider)
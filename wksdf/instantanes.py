@@ -0,0 +1,181 @@
+"""Instantanés du stock par produit et stock à une date passée.
+
+Une ligne (produit, date, quantité) donne le stock du produit à la fin de la
+journée indiquée. Avant la première écriture de la journée sur un produit
+(mouvement, modification de la fiche, remise à zéro), le stock de la veille
+est enregistré : un instantané au plus par produit et par jour d'activité.
+Les remplacements de quantité (modification, remise à zéro) ne laissent pas
+de trace dans le journal ; ces instantanés les rendent tout de même
+historisables.
+
+Stock de X à la fin du jour D : premier instantané de X daté D ou après (S),
+moins les mouvements de X datés entre D (exclu) et S (inclus). Entre D et S,
+aucune écriture n'a touché X (sinon un instantané plus proche existerait),
+donc seuls des mouvements antidatés peuvent rester à retirer. Sans
+instantané après D, on part du stock courant. Un mouvement antidaté met à
+jour les instantanés postérieurs à sa date. Les mouvements sont rattachés au
+produit par leur identifiant (produit_id), jamais par le nom : un renommage ne
+change ni les instantanés ni le stock passé.
+
+Pour un historique importé (migration Excel), les instantanés de fin de mois
+sont reconstitués depuis le journal, à rebours du stock courant.
+
+Les mouvements archivés (voir archives.py) sont lus seulement si l'intervalle
+entre D et S recoupe une partition. Avant d'archiver un mois, un instantané de
+fin de mois est posé pour chaque produit (fin_de_mois) : le stock à une date
+d'un mois archivé ne lit alors que les partitions de ce mois.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from wksdf import archives, mesures
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS instantanes_stock (
+    produit_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    quantite NUMERIC NOT NULL,
+    PRIMARY KEY (produit_id, date)
+) WITHOUT ROWID;
+"""
+
+# Variation signée d'un mouvement m, et condition « m concerne le produit p » (par identifiant : un renommage
+# ne change pas l'historique du produit)
+_VARIATION = "CASE m.type WHEN 'Entrée' THEN m.quantite ELSE -m.quantite END"
+_CONCERNE = "m.produit_id = p.id"
+
+
+def veille(jour=None):
+    return ((jour or date.today()) - timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+# Instantané de la veille pour chaque produit qui n'en a pas encore ; à appeler dans la transaction
+# d'écriture, avant de modifier ces produits (produit_ids None : tous les produits)
+def preparer(conn, produit_ids=None, jour=None):
+    la_veille = veille(jour)
+    requete = (
+        "INSERT INTO instantanes_stock (produit_id, date, quantite) "
+        f"SELECT p.id, :veille, p.quantite - COALESCE((SELECT SUM({_VARIATION}) FROM mouvements m "
+        f"WHERE {_CONCERNE} AND m.date > :veille), 0) FROM produits p "
+        "WHERE NOT EXISTS (SELECT 1 FROM instantanes_stock i WHERE i.produit_id = p.id AND i.date = :veille)")
+    if produit_ids is None:
+        conn.execute(requete, {"veille": la_veille})
+    else:
+        conn.executemany(requete + " AND p.id = :id",
+                         [{"veille": la_veille, "id": int(produit_id)} for produit_id in produit_ids])
+
+
+# Produit créé aujourd'hui : stock nul la veille
+def creer(conn, produit_id, jour=None):
+    conn.execute("INSERT OR IGNORE INTO instantanes_stock (produit_id, date, quantite) VALUES (?, ?, 0)",
+                 (int(produit_id), veille(jour)))
+
+
+# Mouvement antidaté : les instantanés datés de ce jour ou après l'incluent désormais
+def ajuster(conn, variations):
+    conn.executemany(
+        "UPDATE instantanes_stock SET quantite = quantite + ? WHERE produit_id = ? AND date >= ?",
+        [(variation, int(produit_id), jour) for produit_id, jour, variation in variations])
+
+
+def vider(conn):
+    conn.execute("DELETE FROM instantanes_stock")
+
+
+# Instantanés de fin de mois reconstitués depuis le journal (historique importé, sans remplacements connus)
+@mesures.instrumenter("instantanes.reconstruire")
+def reconstruire(conn, jour=None):
+    vider(conn)
+    nets = pd.read_sql_query(
+        f"SELECT p.id AS produit_id, p.quantite, substr(m.date, 1, 7) AS mois, SUM({_VARIATION}) AS net "
+        f"FROM mouvements m JOIN produits p ON {_CONCERNE} GROUP BY p.id, mois ORDER BY p.id, mois", conn)
+    if nets.empty:
+        return
+    # Stock en fin de mois = stock courant - mouvements des mois suivants
+    apres = nets.groupby("produit_id")["net"].transform(lambda net: net[::-1].cumsum()[::-1] - net)
+    nets["quantite"] = pd.to_numeric(nets["quantite"]) - apres
+    nets["date"] = pd.PeriodIndex(nets["mois"], freq="M").end_time.strftime("%Y-%m-%d")
+    nets = nets[nets["date"] <= veille(jour)]
+    conn.executemany("INSERT INTO instantanes_stock (produit_id, date, quantite) VALUES (?, ?, ?)",
+                     nets[["produit_id", "date", "quantite"]].astype(object).itertuples(index=False, name=None))
+
+
+# Variation signée de mouvements archivés (colonnes type et quantite)
+def _variations(lignes):
+    return pd.to_numeric(lignes["quantite"]) * lignes["type"].map({"Entrée": 1, "Sortie": -1})
+
+
+# Instantané de fin de mois (AAAA-MM) pour chaque produit qui n'en a pas, avant l'archivage de ce mois
+def fin_de_mois(conn, mois):
+    jour = pd.Period(mois, freq="M").end_time.strftime("%Y-%m-%d")
+    stocks = stock_a_date(conn, jour)
+    conn.executemany("INSERT OR IGNORE INTO instantanes_stock (produit_id, date, quantite) VALUES (?, ?, ?)",
+                     [(int(produit_id), jour, quantite.item() if hasattr(quantite, "item") else quantite)
+                      for produit_id, quantite in zip(stocks["ID"], stocks["Quantité"])])
+
+
+# Stock de chaque produit à la fin du jour `jour` (date ou AAAA-MM-JJ)
+@mesures.instrumenter("instantanes.stock_a_date", lignes=len)
+def stock_a_date(conn, jour):
+    jour = jour if isinstance(jour, str) else jour.strftime("%Y-%m-%d")
+    stocks = pd.read_sql_query(
+        'SELECT p.id AS "ID", p.nom AS "Nom Produit", p.categorie AS "Catégorie", '
+        f'COALESCE(i.quantite, p.quantite) - COALESCE((SELECT SUM({_VARIATION}) FROM mouvements m '
+        f'WHERE {_CONCERNE} AND m.date > :jour AND (i.date IS NULL OR m.date <= i.date)), 0) AS "Quantité", '
+        "i.date AS suivant "
+        "FROM produits p LEFT JOIN instantanes_stock i ON i.produit_id = p.id AND i.date = "
+        "(SELECT MIN(date) FROM instantanes_stock WHERE produit_id = p.id AND date >= :jour) "
+        "ORDER BY p.id", conn, params={"jour": jour})
+    suivant = stocks.pop("suivant")
+
+    # Mouvements archivés entre le jour et l'instantané suivant de chaque produit
+    lendemain = (pd.Timestamp(jour) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    archivees = archives.lire(conn, debut=lendemain, fin=None if suivant.isna().any() else suivant.max(),
+                              colonnes=["date", "produit_id", "type", "quantite"])
+    if archivees.empty:
+        return stocks
+    produit_id = archivees["produit_id"]
+    borne = produit_id.map(pd.Series(suivant.to_numpy(), index=stocks["ID"]))
+    concernees = produit_id.notna() & (borne.isna() | (archivees["date"] <= borne))
+    retrait = _variations(archivees)[concernees].groupby(produit_id[concernees]).sum()
+    quantites = pd.to_numeric(stocks["Quantité"]) - stocks["ID"].map(retrait).fillna(0)
+    stocks["Quantité"] = quantites.astype("int64") if (quantites == quantites.round()).all() else quantites
+    return stocks
+
+
+# Stock d'un produit à la fin de chaque jour, du premier mouvement (ou instantané) à aujourd'hui
+@mesures.instrumenter("instantanes.serie_stock", lignes=len)
+def serie_stock(conn, produit_id, jour=None):
+    produit = conn.execute("SELECT quantite FROM produits WHERE id = ?", (int(produit_id),)).fetchone()
+    if produit is None:
+        return pd.DataFrame(columns=["Date", "Quantité"])
+    quantite = produit[0]
+    nets = pd.read_sql_query(
+        f"SELECT m.date, SUM({_VARIATION}) AS net FROM mouvements m WHERE m.produit_id = ? GROUP BY m.date",
+        conn, params=(int(produit_id),))
+    archivees = archives.lire(conn, produit_id=int(produit_id), colonnes=["date", "type", "quantite"])
+    if not archivees.empty:
+        nets_archives = _variations(archivees).groupby(archivees["date"]).sum()
+        nets = pd.concat([nets, pd.DataFrame({"date": nets_archives.index, "net": nets_archives.to_numpy()})])
+        nets = nets.groupby("date", as_index=False)["net"].sum()
+    lignes = pd.read_sql_query("SELECT date, quantite FROM instantanes_stock WHERE produit_id = ? ORDER BY date",
+                               conn, params=(int(produit_id),))
+
+    aujourd_hui = pd.Timestamp(jour or date.today())
+    debuts = [pd.to_datetime(serie).min() for serie in (nets["date"], lignes["date"]) if len(serie)]
+    debut = min(debuts) - pd.Timedelta(days=1) if debuts else aujourd_hui
+    jours = pd.date_range(debut, max(aujourd_hui, pd.to_datetime(nets["date"]).max() if len(nets) else debut))
+
+    # Cumul des mouvements par jour ; le stock courant sert d'instantané final après le dernier jour
+    net = pd.Series(pd.to_numeric(nets["net"]).to_numpy(), index=pd.to_datetime(nets["date"])).reindex(
+        jours, fill_value=0)
+    cumul = net.cumsum().to_numpy(dtype="float64")
+    dates_inst = np.append(pd.to_datetime(lignes["date"]).to_numpy(dtype="datetime64[ns]"),
+                           jours[-1].to_datetime64())
+    valeurs_inst = np.append(pd.to_numeric(lignes["quantite"]).to_numpy(dtype="float64"), float(quantite))
+    suivant = np.searchsorted(dates_inst, jours.to_numpy(dtype="datetime64[ns]"), side="left")
+    cumul_inst = cumul[jours.get_indexer(pd.DatetimeIndex(dates_inst[suivant]))]
+    stock = valeurs_inst[suivant] - (cumul_inst - cumul)
+    return pd.DataFrame({"Date": jours.date, "Quantité": stock})
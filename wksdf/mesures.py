@@ -0,0 +1,208 @@
+"""Instrumentation légère des chemins critiques (chargement, écritures, exports, rendu).
+
+Chaque opération mesurée enregistre sa durée, un nombre de lignes facultatif
+et la variation de mémoire résidente du processus. Les mesures sont cumulées
+par opération (nombre d'appels, total, maximum, dernière valeur) et les
+dernières sont gardées dans un historique borné ; elles alimentent le panneau
+« Performance » de l'administration, un journal structuré (logger
+wksdf.mesures, une ligne JSON par mesure) et un fichier texte au format
+Prometheus.
+
+Désactivées (par défaut, sauf WKSDF_MESURES=1), les mesures se réduisent à un
+test de booléen : le décorateur appelle directement la fonction et le
+gestionnaire de contexte renvoie un objet partagé qui ne fait rien.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+PROMETHEUS_PATH = "data/mesures.prom"
+TAILLE_HISTORIQUE = 500
+
+journal = logging.getLogger("wksdf.mesures")
+
+_actif = os.environ.get("WKSDF_MESURES", "0") == "1"
+_verrou = threading.Lock()
+_cumuls = {}
+_historique = deque(maxlen=TAILLE_HISTORIQUE)
+_TAILLE_PAGE_MEMOIRE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def actif():
+    return _actif
+
+
+def activer(etat=True):
+    global _actif
+    _actif = bool(etat)
+
+
+def reinitialiser():
+    with _verrou:
+        _cumuls.clear()
+        _historique.clear()
+
+
+# Mémoire résidente du processus en octets (None si /proc n'est pas disponible)
+def _memoire():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _TAILLE_PAGE_MEMOIRE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def enregistrer(nom, duree, lignes=None, memoire=None):
+    mesure = {"operation": nom, "debut": time.time() - duree, "duree": duree, "lignes": lignes,
+              "memoire": memoire}
+    with _verrou:
+        cumul = _cumuls.get(nom)
+        if cumul is None:
+            cumul = _cumuls[nom] = {"appels": 0, "total": 0.0, "max": 0.0, "lignes": None, "memoire": None}
+        cumul["appels"] += 1
+        cumul["total"] += duree
+        cumul["max"] = max(cumul["max"], duree)
+        cumul["derniere"] = duree
+        if lignes is not None:
+            cumul["lignes"] = lignes
+        if memoire is not None:
+            cumul["memoire"] = memoire
+        _historique.append(mesure)
+    if journal.isEnabledFor(logging.INFO):
+        journal.info(json.dumps(mesure, ensure_ascii=False))
+
+
+class _Mesure:
+    __slots__ = ("nom", "lignes", "_debut", "_memoire")
+
+    def __init__(self, nom, lignes=None):
+        self.nom = nom
+        self.lignes = lignes
+
+    def __enter__(self):
+        self._memoire = _memoire()
+        self._debut = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duree = time.perf_counter() - self._debut
+        memoire = _memoire()
+        delta = memoire - self._memoire if memoire is not None and self._memoire is not None else None
+        enregistrer(self.nom, duree, self.lignes, delta)
+        return False
+
+
+class _Inactive:
+    __slots__ = ()
+    lignes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, nom, valeur):
+        pass
+
+
+_INACTIVE = _Inactive()
+
+
+# with mesurer("export.excel") as m: ... ; m.lignes = n pour renseigner le nombre de lignes
+def mesurer(nom, lignes=None):
+    if not _actif:
+        return _INACTIVE
+    return _Mesure(nom, lignes)
+
+
+# Décorateur ; lignes(resultat) donne le nombre de lignes traitées, si pertinent
+def instrumenter(nom, lignes=None):
+    def decorateur(fonction):
+        @wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not _actif:
+                return fonction(*args, **kwargs)
+            with _Mesure(nom) as mesure:
+                resultat = fonction(*args, **kwargs)
+                if lignes is not None:
+                    mesure.lignes = lignes(resultat)
+            return resultat
+
+        return enveloppe
+
+    return decorateur
+
+
+# pandas n'est importé qu'à l'affichage du panneau : la page de connexion importe ce module sans le charger
+def resume():
+    import pandas as pd
+
+    with _verrou:
+        lignes = [{
+            "Opération": nom,
+            "Appels": cumul["appels"],
+            "Total (ms)": cumul["total"] * 1000,
+            "Moyenne (ms)": cumul["total"] * 1000 / cumul["appels"],
+            "Max (ms)": cumul["max"] * 1000,
+            "Dernière (ms)": cumul["derniere"] * 1000,
+            "Lignes": cumul["lignes"],
+            "Mémoire (Mo)": None if cumul["memoire"] is None else cumul["memoire"] / 2 ** 20,
+        } for nom, cumul in _cumuls.items()]
+    colonnes = ["Opération", "Appels", "Total (ms)", "Moyenne (ms)", "Max (ms)", "Dernière (ms)", "Lignes",
+                "Mémoire (Mo)"]
+    return pd.DataFrame(lignes, columns=colonnes).sort_values("Total (ms)", ascending=False, ignore_index=True)
+
+
+def dernieres(nombre=50):
+    import pandas as pd
+
+    with _verrou:
+        mesures = list(_historique)[-nombre:]
+    df = pd.DataFrame(mesures, columns=["operation", "debut", "duree", "lignes", "memoire"])
+    return pd.DataFrame({
+        "Heure": pd.to_datetime(df["debut"], unit="s"),
+        "Opération": df["operation"],
+        "Durée (ms)": df["duree"] * 1000,
+        "Lignes": df["lignes"],
+        "Mémoire (Mo)": df["memoire"] / 2 ** 20,
+    }).iloc[::-1].reset_index(drop=True)
+
+
+def _etiquette(valeur):
+    return valeur.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus():
+    with _verrou:
+        cumuls = {nom: dict(cumul) for nom, cumul in _cumuls.items()}
+    series = [
+        ("wksdf_operation_appels_total", "counter", "Nombre d'appels", "appels"),
+        ("wksdf_operation_duree_secondes_total", "counter", "Temps cumulé", "total"),
+        ("wksdf_operation_duree_secondes_max", "gauge", "Durée maximale", "max"),
+        ("wksdf_operation_lignes", "gauge", "Lignes traitées au dernier appel", "lignes"),
+        ("wksdf_operation_memoire_octets", "gauge", "Variation de mémoire résidente au dernier appel", "memoire"),
+    ]
+    lignes = []
+    for metrique, type_metrique, aide, cle in series:
+        lignes.append(f"# HELP {metrique} {aide}")
+        lignes.append(f"# TYPE {metrique} {type_metrique}")
+        for nom, cumul in sorted(cumuls.items()):
+            if cumul[cle] is not None:
+                lignes.append(f'{metrique}{{operation="{_etiquette(nom)}"}} {cumul[cle]}')
+    return "\n".join(lignes) + "\n"
+
+
+# Écriture atomique du fichier Prometheus (lu par le collecteur node_exporter textfile, par exemple)
+def ecrire_prometheus(chemin=PROMETHEUS_PATH):
+    dossier = os.path.dirname(chemin) or "."
+    os.makedirs(dossier, exist_ok=True)
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix=".prom")
+    with os.fdopen(descripteur, "w", encoding="utf-8") as f:
+        f.write(prometheus())
+    os.replace(temporaire, chemin)
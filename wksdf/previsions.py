@@ -0,0 +1,92 @@
+"""Prévisions de consommation et suggestions de réapprovisionnement.
+
+La consommation de chaque produit est estimée sur ses sorties des FENETRE
+derniers jours complets (jusqu'à la veille du jour de référence). Les sorties
+sont ventilées en une matrice produits × jours (np.bincount) et tous les
+produits sont traités ensemble : moyennes mobiles sur 7 et 28 jours et
+lissage exponentiel sont des opérations sur la matrice, sans boucle par
+produit. Un produit ajouté pendant la fenêtre n'est moyenné que sur ses jours
+d'existence (pour le lissage, les poids sont renormalisés sur ces jours).
+
+À partir de la consommation lissée (projeter) :
+- jours avant seuil : (quantité − seuil) / consommation, 0 si le produit est
+  déjà en alerte ; date de rupture : quantité / consommation ; sans sortie
+  dans la fenêtre, aucune date n'est projetée ;
+- quantité à commander pour les produits qui atteignent leur seuil avant la
+  fin du délai de réapprovisionnement : de quoi remonter à
+  seuil + consommation × (délai + couverture).
+"""
+import numpy as np
+import pandas as pd
+
+from wksdf import mesures
+
+# Jours d'historique pris en compte
+FENETRE = 90
+# Moyennes mobiles affichées (jours)
+MOYENNES = (7, 28)
+# Lissage exponentiel : alpha = 2 / (LISSAGE + 1), comme une moyenne mobile de LISSAGE jours
+LISSAGE = 28
+# Délai de réapprovisionnement et couverture visée après réception, en jours (valeurs par défaut)
+DELAI = 7
+COUVERTURE = 30
+
+
+# Sorties par produit (lignes, dans l'ordre de produits_df) et par jour (colonnes, de jour − fenetre à la veille)
+def matrice_sorties(produits_df, mouvements_df, jour, fenetre=FENETRE):
+    fin = np.datetime64(jour, "D")
+    dates = mouvements_df["Date"].to_numpy(dtype="datetime64[D]")
+    masque = (mouvements_df["Type"] == "Sortie").to_numpy(dtype=bool) & (dates >= fin - fenetre) & (dates < fin)
+    positions = pd.Index(produits_df["ID"]).get_indexer(
+        mouvements_df["Produit ID"].to_numpy(dtype="float64", na_value=np.nan)[masque])
+    connus = positions >= 0
+    cellules = positions[connus] * fenetre + (dates[masque][connus] - (fin - fenetre)).astype("int64")
+    quantites = mouvements_df["Quantité"].to_numpy(dtype="float64")[masque][connus]
+    return np.bincount(cellules, weights=quantites, minlength=len(produits_df) * fenetre).reshape(-1, fenetre)
+
+
+# Jours de la fenêtre pendant lesquels chaque produit existait (au moins 1)
+def _jours_actifs(produits_df, jour, fenetre):
+    ajout = produits_df["Date Ajout"].to_numpy(dtype="datetime64[D]")
+    age = (np.datetime64(jour, "D") - ajout).astype("float64")
+    return np.clip(np.where(np.isnan(age), fenetre, age), 1, fenetre)
+
+
+# Consommation journalière de tous les produits à la veille de `jour`
+@mesures.instrumenter("previsions.consommations", lignes=len)
+def consommations(produits_df, mouvements_df, jour, fenetre=FENETRE):
+    matrice = matrice_sorties(produits_df, mouvements_df, jour, fenetre)
+    actifs = _jours_actifs(produits_df, jour, fenetre)
+    resultat = produits_df[["ID", "Nom Produit", "Catégorie", "Quantité", "Seuil Alerte"]].copy()
+    for jours in MOYENNES:
+        resultat[f"Moyenne {jours} j"] = matrice[:, -jours:].sum(axis=1) / np.minimum(jours, actifs)
+    alpha = 2 / (LISSAGE + 1)
+    # Poids alpha·(1 − alpha)^k, k jours avant la veille ; somme sur les jours actifs : 1 − (1 − alpha)^actifs
+    poids = alpha * (1 - alpha) ** np.arange(fenetre - 1, -1, -1)
+    resultat["Consommation / jour"] = (matrice @ poids) / (1 - (1 - alpha) ** actifs)
+    return resultat
+
+
+def _dates(jour, jours):
+    return pd.Timestamp(jour).normalize() + pd.to_timedelta(np.where(np.isfinite(jours), jours, np.nan), unit="D")
+
+
+# Dates de seuil et de rupture projetées et quantités à commander, triées par urgence
+@mesures.instrumenter("previsions.projeter", lignes=len)
+def projeter(consommations_df, jour, delai=DELAI, couverture=COUVERTURE):
+    stock = consommations_df["Quantité"].to_numpy(dtype="float64")
+    seuil = consommations_df["Seuil Alerte"].to_numpy(dtype="float64")
+    conso = consommations_df["Consommation / jour"].to_numpy(dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avant_seuil = np.where(stock <= seuil, 0, np.where(conso > 0, np.ceil((stock - seuil) / conso), np.inf))
+        avant_rupture = np.where(stock <= 0, 0, np.where(conso > 0, np.ceil(stock / conso), np.inf))
+    besoin = np.ceil(np.maximum(seuil + conso * (delai + couverture) - stock, 0))
+    a_commander = np.where(avant_seuil <= delai, besoin, 0)
+    resultat = consommations_df.assign(**{
+        "Jours avant seuil": pd.array(np.where(np.isfinite(avant_seuil), avant_seuil, np.nan), dtype="Float64")
+        .astype("Int64"),
+        "Date seuil": _dates(jour, avant_seuil),
+        "Date rupture": _dates(jour, avant_rupture),
+        "À commander": a_commander.astype("int64"),
+    })
+    return resultat.sort_values(["Jours avant seuil", "ID"], na_position="last", kind="stable")
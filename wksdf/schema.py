@@ -0,0 +1,87 @@
+"""Représentation typée et compacte des produits et des mouvements en mémoire.
+
+Les DataFrames sont convertis une seule fois au chargement :
+- Produit, Type et Catégorie en catégories (un code entier par ligne au lieu
+  d'une chaîne répétée) ;
+- Date et Date Ajout en datetime64 (plus de pd.to_datetime à chaque rendu) ;
+- quantités et prix en entiers quand les valeurs le permettent ;
+- colonne « Produit ID » : identifiant du produit référencé par chaque mouvement,
+  lu dans le journal (un renommage ne le change pas) ; pour des mouvements
+  qui n'en ont pas (classeur importé), premier produit portant leur nom.
+"""
+import numpy as np
+import pandas as pd
+
+TYPES_MOUVEMENT = ["Entrée", "Sortie"]
+
+
+def _nombres(serie):
+    valeurs = pd.to_numeric(serie)
+    if valeurs.isna().any():
+        return valeurs.astype("float64")
+    if (valeurs == valeurs.round()).all():
+        return valeurs.astype("int64")
+    return valeurs.astype("float64")
+
+
+def typer_produits(produits):
+    return pd.DataFrame({
+        "ID": pd.to_numeric(produits["ID"]).astype("int64"),
+        "Nom Produit": produits["Nom Produit"].astype("string"),
+        "Catégorie": produits["Catégorie"].astype("category"),
+        "Prix Unitaire": _nombres(produits["Prix Unitaire"]),
+        "Quantité": _nombres(produits["Quantité"]),
+        "Seuil Alerte": _nombres(produits["Seuil Alerte"]),
+        "Date Ajout": pd.to_datetime(produits["Date Ajout"], errors="coerce"),
+    }, index=produits.index)
+
+
+# Identifiant du produit pour chaque mouvement : celui du journal s'il désigne un produit du catalogue, sinon
+# (colonne absente) celui du premier produit de ce nom, calculé par catégorie puis propagé par les codes
+def lier_produits(mouvements, produits, ids_journal=None):
+    if ids_journal is not None:
+        valeurs = pd.to_numeric(ids_journal, errors="coerce").astype("Float64").astype("Int64")
+        mouvements = mouvements.copy()
+        mouvements["Produit ID"] = valeurs.where(valeurs.isin(produits["ID"]))
+        return mouvements
+    ids = produits.drop_duplicates("Nom Produit").set_index("Nom Produit")["ID"]
+    par_categorie = pd.Series(mouvements["Produit"].cat.categories).map(ids).to_numpy(dtype="float64")
+    codes = mouvements["Produit"].cat.codes.to_numpy()
+    valeurs = np.where(codes >= 0, par_categorie[codes], np.nan) if len(codes) else np.array([], dtype="float64")
+    mouvements = mouvements.copy()
+    mouvements["Produit ID"] = pd.array(valeurs, dtype="Float64").astype("Int64")
+    return mouvements
+
+
+def typer_mouvements(mouvements, produits, categories_produits=None):
+    noms = mouvements["Produit"].astype("string")
+    categories = pd.Index(produits["Nom Produit"].astype("string")).union(pd.Index(noms.dropna().unique()))
+    if categories_produits is not None:
+        categories = pd.Index(categories_produits).append(categories.difference(categories_produits))
+    typees = pd.DataFrame({
+        "ID": pd.to_numeric(mouvements["ID"]).astype("int64"),
+        "Date": pd.to_datetime(mouvements["Date"]),
+        "Produit": pd.Categorical(noms, categories=categories),
+        "Type": pd.Categorical(mouvements["Type"], categories=TYPES_MOUVEMENT),
+        "Quantité": _nombres(mouvements["Quantité"]),
+        "Commentaire": mouvements["Commentaire"].astype("string"),
+    }, index=mouvements.index)
+    return lier_produits(typees, produits, mouvements["Produit ID"] if "Produit ID" in mouvements.columns else None)
+
+
+# Ajout de lignes en conservant les types (et donc les mêmes catégories des deux côtés)
+def ajouter_mouvements(mouvements, nouveaux, produits):
+    categories = mouvements["Produit"].cat.categories
+    nouveaux = typer_mouvements(nouveaux, produits, categories)
+    if len(nouveaux["Produit"].cat.categories) > len(categories):
+        mouvements = mouvements.assign(Produit=mouvements["Produit"].cat.set_categories(
+            nouveaux["Produit"].cat.categories))
+    return pd.concat([mouvements, nouveaux], ignore_index=True)
+
+
+def vides():
+    produits = typer_produits(pd.DataFrame(columns=["ID", "Nom Produit", "Catégorie", "Prix Unitaire", "Quantité",
+                                                    "Seuil Alerte", "Date Ajout"]))
+    mouvements = typer_mouvements(pd.DataFrame(columns=["ID", "Date", "Produit", "Type", "Quantité", "Commentaire",
+                                                        "Produit ID"]), produits)
+    return produits, mouvements
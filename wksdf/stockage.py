@@ -0,0 +1,521 @@
+"""Stockage SQLite (mode WAL) des produits et du journal des mouvements.
+
+Chaque mouvement est ajouté au journal en O(1) et la quantité du produit est
+mise à jour sur place, dans la même transaction. Le classeur Excel n'est plus
+qu'un format d'export, avec une migration unique depuis stock_data.xlsx.
+
+Écritures concurrentes (plusieurs sessions ou processus) :
+- chaque écriture prend le verrou d'écriture de la base dès son début
+  (BEGIN IMMEDIATE), avec attente bornée si un autre écrivain le détient ;
+- les identifiants sont alloués dans la transaction à partir d'une séquence
+  stockée dans meta, strictement croissante même après une purge ;
+- les mouvements modifient le stock par incréments, qui se composent quel que
+  soit l'ordre des écrivains ; la modification d'une fiche produit, qui écrit
+  des valeurs absolues, est refusée si la fiche a changé depuis sa lecture
+  (colonne version de la table produits).
+
+Chaque mouvement garde le nom du produit au moment de la saisie et son
+identifiant (colonne produit_id) : stocks passés, prévisions, recettes et
+filtre de l'historique suivent l'identifiant, si bien qu'un renommage ne
+coupe pas un produit de son historique.
+
+Chaque écriture qui touche un produit enregistre d'abord, si besoin, son
+stock de la veille (voir instantanes.py) pour les requêtes de stock passé, et
+compare l'état d'alerte de ce produit avant et après l'écriture pour
+enregistrer les franchissements de seuil (voir alertes.py).
+
+Les mois clos anciens peuvent être déplacés du journal vers des partitions
+Parquet (archiver, voir archives.py) : la table mouvements ne contient alors
+que le journal courant.
+"""
+import math
+import numbers
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from wksdf import agregats, alertes, archives, instantanes, mesures, taches
+
+DB_PATH = "data/stock.db"
+EXCEL_PATH = "data/stock_data.xlsx"
+
+# Attente maximale (secondes) du verrou d'écriture tenu par une autre session
+DELAI_VERROU = 30
+
+COLONNES_PRODUITS = ["ID", "Nom Produit", "Catégorie", "Prix Unitaire", "Quantité", "Seuil Alerte", "Date Ajout"]
+COLONNES_MOUVEMENTS = ["ID", "Date", "Produit", "Type", "Quantité", "Commentaire", "Produit ID"]
+TYPES_MOUVEMENT = ("Entrée", "Sortie")
+
+# Correspondance colonnes SQL -> colonnes affichées
+SQL_PRODUITS = {
+    "id": "ID",
+    "nom": "Nom Produit",
+    "categorie": "Catégorie",
+    "prix": "Prix Unitaire",
+    "quantite": "Quantité",
+    "seuil": "Seuil Alerte",
+    "date_ajout": "Date Ajout",
+}
+SQL_MOUVEMENTS = {
+    "id": "ID",
+    "date": "Date",
+    "produit": "Produit",
+    "type": "Type",
+    "quantite": "Quantité",
+    "commentaire": "Commentaire",
+    "produit_id": "Produit ID",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS produits (
+    id INTEGER PRIMARY KEY,
+    nom TEXT NOT NULL,
+    categorie TEXT,
+    prix NUMERIC NOT NULL DEFAULT 0,
+    quantite NUMERIC NOT NULL DEFAULT 0,
+    seuil NUMERIC NOT NULL DEFAULT 0,
+    date_ajout TEXT,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_produits_nom ON produits (nom);
+CREATE TABLE IF NOT EXISTS mouvements (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    produit TEXT NOT NULL,
+    type TEXT NOT NULL,
+    quantite NUMERIC NOT NULL,
+    commentaire TEXT,
+    produit_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_mouvements_date ON mouvements (date, id);
+CREATE INDEX IF NOT EXISTS idx_mouvements_type_date ON mouvements (type, date, id);
+CREATE TABLE IF NOT EXISTS meta (
+    cle TEXT PRIMARY KEY,
+    valeur TEXT
+);
+"""
+
+
+class ProduitInconnu(Exception):
+    pass
+
+
+class ConflitVersion(Exception):
+    def __init__(self, produit_id):
+        super().__init__(f"Le produit {produit_id} a été modifié entre-temps")
+        self.produit_id = produit_id
+
+
+class NomEnDouble(Exception):
+    def __init__(self, nom):
+        super().__init__(f"Un produit nommé {nom} existe déjà")
+        self.nom = nom
+
+
+class StockInsuffisant(Exception):
+    def __init__(self, produit, disponible):
+        super().__init__(f"Stock insuffisant pour {produit} : {disponible} unités disponibles")
+        self.produit = produit
+        self.disponible = disponible
+
+
+# Connexion configurée (WAL, écritures durables sans fsync à chaque commit)
+def connecter(chemin=DB_PATH):
+    dossier = os.path.dirname(chemin)
+    if dossier and not os.path.exists(dossier):
+        os.makedirs(dossier)
+    conn = sqlite3.connect(chemin, timeout=DELAI_VERROU)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    conn.executescript(agregats.SCHEMA)
+    conn.executescript(instantanes.SCHEMA)
+    conn.executescript(alertes.SCHEMA)
+    conn.executescript(archives.SCHEMA)
+    _migrer_schema(conn)
+    return conn
+
+
+def _colonnes(conn, table):
+    return {ligne[1] for ligne in conn.execute(f"PRAGMA table_info({table})")}
+
+
+# Bases créées avant les colonnes suivantes : version des produits (contrôle de concurrence), identifiant du
+# produit de chaque mouvement (rempli depuis le nom, journal et partitions archivées) et ventes agrégées par
+# identifiant (reconstruites par initialiser)
+def _migrer_schema(conn):
+    if "version" not in _colonnes(conn, "produits"):
+        try:
+            conn.execute("ALTER TABLE produits ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            conn.commit()
+        except sqlite3.OperationalError:
+            # Ajoutée au même moment par un autre processus
+            pass
+    if "produit_id" not in _colonnes(conn, "mouvements") or "produit_id" not in _colonnes(conn, "agregats_ventes"):
+        with ecriture(conn):
+            if "produit_id" not in _colonnes(conn, "mouvements"):
+                conn.execute("ALTER TABLE mouvements ADD COLUMN produit_id INTEGER")
+                conn.execute("DROP INDEX IF EXISTS idx_mouvements_produit_date")
+                _lier_mouvements(conn)
+                archives.migrer_produit_id(conn)
+            if "produit_id" not in _colonnes(conn, "agregats_ventes"):
+                conn.execute("DROP TABLE agregats_ventes")
+                conn.execute(agregats.SCHEMA_VENTES)
+                conn.execute("DELETE FROM meta WHERE cle = 'agregats'")
+        # Partitions remplacées supprimées une fois la migration validée
+        with ecriture(conn):
+            archives.nettoyer(conn)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_mouvements_produit_id_date ON mouvements (produit_id, date, id)")
+
+
+# Identifiant des mouvements qui n'en ont pas (bases et classeurs antérieurs) : premier produit de ce nom
+def _lier_mouvements(conn):
+    conn.execute("UPDATE mouvements SET produit_id = (SELECT MIN(id) FROM produits WHERE nom = mouvements.produit) "
+                 "WHERE produit_id IS NULL")
+
+
+# Transaction d'écriture : verrou pris dès le BEGIN pour éviter les conflits de mise à niveau
+@contextmanager
+def ecriture(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+@contextmanager
+def ouvrir(chemin=DB_PATH):
+    conn = connecter(chemin)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _lire_meta(conn, cle):
+    row = conn.execute("SELECT valeur FROM meta WHERE cle = ?", (cle,)).fetchone()
+    return row[0] if row else None
+
+
+# Chaque écriture incrémente la version des données, dans la même transaction
+def _incrementer_version(conn):
+    conn.execute("INSERT INTO meta (cle, valeur) VALUES ('version', 1) "
+                 "ON CONFLICT (cle) DO UPDATE SET valeur = CAST(valeur AS INTEGER) + 1")
+
+
+def version(conn):
+    return int(_lire_meta(conn, "version") or 0)
+
+
+# Réserve `nombre` identifiants consécutifs ; à appeler dans une transaction d'écriture
+def _allouer_ids(conn, table, nombre=1):
+    cle = f"sequence_{table}"
+    maximum = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+    dernier = max(int(_lire_meta(conn, cle) or 0), maximum)
+    conn.execute("INSERT OR REPLACE INTO meta (cle, valeur) VALUES (?, ?)", (cle, dernier + nombre))
+    return dernier + 1
+
+
+def versions_produits(conn):
+    return dict(conn.execute("SELECT id, version FROM produits"))
+
+
+def _valeur_sql(valeur):
+    if pd.isna(valeur):
+        return None
+    if isinstance(valeur, pd.Timestamp):
+        return valeur.strftime("%Y-%m-%d %H:%M:%S")
+    if hasattr(valeur, "item"):
+        return valeur.item()
+    return valeur
+
+
+def _inserer_lignes(conn, table, df, correspondance):
+    colonnes_sql = [sql for sql, col in correspondance.items() if col in df.columns]
+    colonnes_df = [correspondance[sql] for sql in colonnes_sql]
+    requete = "INSERT INTO {} ({}) VALUES ({})".format(
+        table, ", ".join(colonnes_sql), ", ".join("?" * len(colonnes_sql)))
+    lignes = ([_valeur_sql(v) for v in ligne] for ligne in df[colonnes_df].itertuples(index=False, name=None))
+    conn.executemany(requete, lignes)
+
+
+def _remplir(conn, produits, mouvements):
+    if "Date" in mouvements.columns:
+        dates = pd.to_datetime(mouvements["Date"], errors="coerce")
+        mouvements = mouvements.assign(
+            Date=dates.dt.strftime("%Y-%m-%d").fillna(mouvements["Date"].astype(str)))
+    _inserer_lignes(conn, "produits", produits, SQL_PRODUITS)
+    _inserer_lignes(conn, "mouvements", mouvements, SQL_MOUVEMENTS)
+    _lier_mouvements(conn)
+    agregats.reconstruire(conn)
+    instantanes.reconstruire(conn)
+    alertes.reconstruire(conn)
+    conn.executemany("INSERT OR REPLACE INTO meta (cle, valeur) VALUES (?, '1')",
+                     [("agregats",), ("instantanes",), ("alertes",)])
+
+
+# Chargement de tables au format du classeur (colonnes affichées) dans une base vide
+def remplir(conn, produits, mouvements):
+    with ecriture(conn):
+        _remplir(conn, produits, mouvements)
+        _incrementer_version(conn)
+
+
+# Migration unique depuis l'ancien classeur Excel
+def migrer_excel(conn, excel_path=EXCEL_PATH):
+    if _lire_meta(conn, "migration_excel") is not None or not os.path.exists(excel_path):
+        return False
+    with ecriture(conn):
+        if _lire_meta(conn, "migration_excel") is not None:
+            return False
+        deja_rempli = conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM produits) OR EXISTS (SELECT 1 FROM mouvements)").fetchone()[0]
+        if not deja_rempli:
+            produits = pd.read_excel(excel_path, sheet_name="Produits")
+            mouvements = pd.read_excel(excel_path, sheet_name="Mouvements")
+            _remplir(conn, produits, mouvements)
+        conn.execute("INSERT OR REPLACE INTO meta (cle, valeur) VALUES ('migration_excel', ?)",
+                     (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),))
+        _incrementer_version(conn)
+    return not deja_rempli
+
+
+# Migrations au démarrage : import Excel puis construction des agrégats, des instantanés et du journal
+# des alertes d'une base existante
+def initialiser(conn, excel_path=EXCEL_PATH):
+    migrer_excel(conn, excel_path)
+    for cle, reconstruire in (("agregats", agregats.reconstruire), ("instantanes", instantanes.reconstruire),
+                              ("alertes", alertes.reconstruire)):
+        if _lire_meta(conn, cle) is None:
+            with ecriture(conn):
+                reconstruire(conn)
+                conn.execute("INSERT OR REPLACE INTO meta (cle, valeur) VALUES (?, '1')", (cle,))
+
+
+def requete_select(table, correspondance):
+    colonnes = ", ".join(f'{sql} AS "{col}"' for sql, col in correspondance.items())
+    return f"SELECT {colonnes} FROM {table} ORDER BY id"
+
+
+# Lecture complète des deux tables sous forme de DataFrames
+def charger(conn):
+    produits = pd.read_sql_query(requete_select("produits", SQL_PRODUITS), conn)
+    mouvements = pd.read_sql_query(requete_select("mouvements", SQL_MOUVEMENTS), conn)
+    return produits, mouvements
+
+
+# Lecture cohérente des tables et de la version correspondante
+@mesures.instrumenter("stockage.charger", lignes=lambda r: len(r[1]))
+def charger_version(conn):
+    conn.execute("BEGIN")
+    try:
+        produits, mouvements = charger(conn)
+        return produits, mouvements, version(conn)
+    finally:
+        conn.commit()
+
+
+# Lecture incrémentale : produits, mouvements d'identifiant > dernier_id, nombre total de mouvements et version.
+# Les identifiants étant alloués sous verrou d'écriture, l'ordre des id suit l'ordre des commits.
+@mesures.instrumenter("stockage.charger_depuis", lignes=lambda r: len(r[1]))
+def charger_depuis(conn, dernier_id):
+    conn.execute("BEGIN")
+    try:
+        produits = pd.read_sql_query(requete_select("produits", SQL_PRODUITS), conn)
+        nouveaux = pd.read_sql_query(
+            requete_select("mouvements", SQL_MOUVEMENTS).replace(" ORDER BY", " WHERE id > ? ORDER BY"),
+            conn, params=(dernier_id,))
+        total = conn.execute("SELECT COUNT(*) FROM mouvements").fetchone()[0]
+        return produits, nouveaux, total, version(conn)
+    finally:
+        conn.commit()
+
+
+# Un nom ne peut désigner qu'un seul produit (recherche par l'index idx_produits_nom)
+def _verifier_nom_libre(conn, nom):
+    if conn.execute("SELECT 1 FROM produits WHERE nom = ? LIMIT 1", (nom,)).fetchone() is not None:
+        raise NomEnDouble(nom)
+
+
+# Prix, quantité et seuil d'une fiche : nombres finis, positifs ou nuls
+def _verifier_fiche(prix, quantite, seuil):
+    for nom, valeur in (("Prix", prix), ("Quantité", quantite), ("Seuil", seuil)):
+        if isinstance(valeur, bool) or not isinstance(valeur, numbers.Real) or not math.isfinite(valeur) or valeur < 0:
+            raise ValueError(f"{nom} invalide : {valeur!r} (nombre positif ou nul attendu)")
+
+
+# Type Entrée ou Sortie et quantité entière strictement positive : le stock ne peut pas devenir négatif
+def _verifier_mouvement(type_mvt, quantite):
+    if type_mvt not in TYPES_MOUVEMENT:
+        raise ValueError(f"Type de mouvement invalide : {type_mvt!r} (Entrée ou Sortie attendu)")
+    if isinstance(quantite, bool) or not isinstance(quantite, numbers.Integral) or quantite <= 0:
+        raise ValueError(f"Quantité invalide : {quantite!r} (entier strictement positif attendu)")
+
+
+@mesures.instrumenter("stockage.ajouter_produit")
+def ajouter_produit(conn, nom, categorie, prix, quantite, seuil, date_ajout=None):
+    _verifier_fiche(prix, quantite, seuil)
+    date_ajout = date_ajout or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with ecriture(conn):
+        _verifier_nom_libre(conn, nom)
+        produit_id = _allouer_ids(conn, "produits")
+        conn.execute(
+            "INSERT INTO produits (id, nom, categorie, prix, quantite, seuil, date_ajout) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (produit_id, nom, categorie, prix, quantite, seuil, date_ajout))
+        instantanes.creer(conn, produit_id)
+        alertes.enregistrer(conn, {produit_id: False})
+        _incrementer_version(conn)
+    return produit_id
+
+
+# version_attendue : version de la fiche lue par l'utilisateur ; None désactive le contrôle
+@mesures.instrumenter("stockage.modifier_produit")
+def modifier_produit(conn, produit_id, nom, categorie, prix, quantite, seuil, version_attendue=None):
+    _verifier_fiche(prix, quantite, seuil)
+    with ecriture(conn):
+        # Renommage seulement : une fiche déjà en double dans d'anciennes données reste modifiable
+        actuel = conn.execute("SELECT nom FROM produits WHERE id = ?", (produit_id,)).fetchone()
+        if actuel is not None and actuel[0] != nom:
+            _verifier_nom_libre(conn, nom)
+        instantanes.preparer(conn, [produit_id])
+        avant = alertes.etats(conn, [produit_id])
+        requete = ("UPDATE produits SET nom = ?, categorie = ?, prix = ?, quantite = ?, seuil = ?, "
+                   "version = version + 1 WHERE id = ?")
+        params = [nom, categorie, prix, quantite, seuil, produit_id]
+        if version_attendue is not None:
+            requete += " AND version = ?"
+            params.append(version_attendue)
+        cur = conn.execute(requete, params)
+        if cur.rowcount == 0:
+            if conn.execute("SELECT 1 FROM produits WHERE id = ?", (produit_id,)).fetchone() is None:
+                raise ProduitInconnu(produit_id)
+            raise ConflitVersion(produit_id)
+        alertes.enregistrer(conn, avant)
+        _incrementer_version(conn)
+
+
+# Ajout d'un mouvement au journal et mise à jour du stock dans une seule transaction
+@mesures.instrumenter("stockage.enregistrer_mouvement")
+def enregistrer_mouvement(conn, produit, type_mvt, quantite, commentaire="", date=None):
+    _verifier_mouvement(type_mvt, quantite)
+    date = date or datetime.now().strftime("%Y-%m-%d")
+    with ecriture(conn):
+        row = conn.execute(
+            "SELECT id, quantite FROM produits WHERE nom = ? ORDER BY id LIMIT 1", (produit,)).fetchone()
+        if row is None:
+            raise ProduitInconnu(produit)
+        produit_id, disponible = row
+        instantanes.preparer(conn, [produit_id])
+        avant = alertes.etats(conn, [produit_id])
+        if type_mvt == "Entrée":
+            conn.execute("UPDATE produits SET quantite = quantite + ?, version = version + 1 WHERE id = ?",
+                         (quantite, produit_id))
+        elif disponible >= quantite:
+            conn.execute("UPDATE produits SET quantite = quantite - ?, version = version + 1 WHERE id = ?",
+                         (quantite, produit_id))
+        else:
+            raise StockInsuffisant(produit, disponible)
+        mouvement_id = _allouer_ids(conn, "mouvements")
+        conn.execute(
+            "INSERT INTO mouvements (id, date, produit, type, quantite, commentaire, produit_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (mouvement_id, date, produit, type_mvt, quantite, commentaire, produit_id))
+        agregats.ajouter_mouvement(conn, date, produit_id, type_mvt, quantite)
+        if date <= instantanes.veille():
+            instantanes.ajuster(conn, [(produit_id, date, quantite if type_mvt == "Entrée" else -quantite)])
+        alertes.enregistrer(conn, avant)
+        _incrementer_version(conn)
+    return mouvement_id, date
+
+
+# Lot de mouvements validé contre le stock courant puis écrit dans une seule transaction.
+# valider(lot, produits) renvoie (acceptés, rejetés) ; les acceptés portent la colonne « Produit ID ».
+@mesures.instrumenter("stockage.enregistrer_mouvements", lignes=lambda r: len(r[0]) + len(r[1]))
+def enregistrer_mouvements(conn, lot, valider):
+    with ecriture(conn):
+        produits = pd.read_sql_query(
+            'SELECT id AS "ID", nom AS "Nom Produit", quantite AS "Quantité" FROM produits ORDER BY id', conn)
+        acceptes, rejetes = valider(lot, produits)
+        if not acceptes.empty:
+            signe = acceptes["Type"].map({"Entrée": 1, "Sortie": -1})
+            variations = acceptes["Quantité"] * signe
+            deltas = variations.groupby(acceptes["Produit ID"]).sum()
+            instantanes.preparer(conn, deltas.index)
+            avant = alertes.etats(conn, deltas.index)
+            premier = _allouer_ids(conn, "mouvements", len(acceptes))
+            acceptes = acceptes.assign(ID=range(premier, premier + len(acceptes)))
+            _inserer_lignes(conn, "mouvements", acceptes, SQL_MOUVEMENTS)
+            conn.executemany("UPDATE produits SET quantite = quantite + ?, version = version + 1 WHERE id = ?",
+                             [(int(delta), int(produit_id)) for produit_id, delta in deltas.items()])
+            agregats.ajouter_lot(conn, acceptes)
+            # Mouvements antidatés : seuls les instantanés datés de ce jour ou après sont corrigés
+            par_jour = variations.groupby([acceptes["Produit ID"], acceptes["Date"]]).sum()
+            instantanes.ajuster(conn, [(produit_id, jour, int(variation))
+                                       for (produit_id, jour), variation in par_jour.items()
+                                       if jour <= instantanes.veille()])
+            alertes.enregistrer(conn, avant)
+            _incrementer_version(conn)
+    return acceptes, rejetes
+
+
+@mesures.instrumenter("stockage.reconstruire_agregats")
+def reconstruire_agregats(conn):
+    with ecriture(conn):
+        agregats.reconstruire(conn)
+        _incrementer_version(conn)
+
+
+def reinitialiser_stock(conn):
+    with ecriture(conn):
+        instantanes.preparer(conn)
+        avant = alertes.etats(conn)
+        conn.execute("UPDATE produits SET quantite = 0, version = version + 1")
+        alertes.enregistrer(conn, avant, tous=True)
+        _incrementer_version(conn)
+
+
+# Compactage des mois clos antérieurs à la rétention en partitions Parquet, un mois par transaction (du plus
+# ancien au plus récent) ; renvoie le nombre de mouvements archivés
+@mesures.instrumenter("stockage.archiver")
+def archiver(conn, retention=archives.RETENTION_MOIS, jour=None):
+    mois = archives.mois_archivables(conn, jour, retention)
+    total = 0
+    for numero, mois_archive in enumerate(mois):
+        taches.avancer(numero / len(mois), f"Archivage de {mois_archive} ({numero + 1} / {len(mois)})")
+        with ecriture(conn):
+            if numero == 0:
+                archives.nettoyer(conn)
+            # Séquence au moins égale au plus grand identifiant : les identifiants archivés ne sont pas réalloués
+            _allouer_ids(conn, "mouvements", 0)
+            # Le stock à une date de ce mois ne lira que sa partition (voir instantanes.fin_de_mois)
+            instantanes.fin_de_mois(conn, mois_archive)
+            total += archives.archiver_mois(conn, mois_archive)
+            _incrementer_version(conn)
+    return total
+
+
+# Archivage sur sa propre connexion (tâche de fond)
+def archiver_base(db_path=DB_PATH, retention=archives.RETENTION_MOIS):
+    with ouvrir(db_path) as conn:
+        return archiver(conn, retention)
+
+
+def purger(conn):
+    with ecriture(conn):
+        conn.execute("DELETE FROM mouvements")
+        conn.execute("DELETE FROM produits")
+        agregats.vider(conn)
+        instantanes.vider(conn)
+        alertes.vider(conn)
+        archives.vider(conn)
+        _incrementer_version(conn)
+    # Fichiers supprimés une fois la purge validée, sous le verrou d'écriture (aucun archivage en cours)
+    with ecriture(conn):
+        archives.nettoyer(conn)
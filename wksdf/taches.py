@@ -0,0 +1,136 @@
+"""Tâches de fond pour les exports et rapports lourds.
+
+Une tâche est identifiée par une clé (opération, paramètres, version des
+données) : tant qu'une tâche de même clé est en attente, en cours ou terminée,
+une nouvelle demande reçoit la même tâche, si bien que plusieurs sessions qui
+demandent le même rapport partagent un seul calcul. Les tâches s'exécutent
+dans un pool de threads partagé par tout le processus ; la session qui les
+a demandées n'est pas bloquée et suit leur avancement.
+
+Le résultat d'une tâche est ce que renvoie sa fonction (pour un export, le
+chemin du fichier conservé dans data/exports/). Pendant l'exécution, la
+fonction peut signaler son avancement avec avancer() ; hors tâche, cet appel
+ne fait rien.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from wksdf import mesures
+
+# Tâches exécutées en même temps ; les suivantes attendent leur tour
+TRAVAILLEURS = 2
+# Tâches terminées gardées en mémoire (les plus anciennes partent en premier)
+TACHES_GARDEES = 32
+
+EN_ATTENTE = "en attente"
+EN_COURS = "en cours"
+TERMINEE = "terminée"
+ECHEC = "échec"
+
+journal = logging.getLogger("wksdf.taches")
+
+_courante = threading.local()
+
+
+class Tache:
+    def __init__(self, cle, nom):
+        self.id = uuid.uuid4().hex[:12]
+        self.cle = cle
+        self.nom = nom
+        self.etat = EN_ATTENTE
+        self.avancement = 0.0
+        self.etape = None
+        self.resultat = None
+        self.erreur = None
+        self.soumise = time.time()
+        self.debut = None
+        self.fin = None
+
+    @property
+    def active(self):
+        return self.etat in (EN_ATTENTE, EN_COURS)
+
+    def duree(self):
+        if self.debut is None:
+            return None
+        return (self.fin or time.time()) - self.debut
+
+
+# Avancement (entre 0 et 1) de la tâche en cours dans ce thread ; sans effet hors tâche
+def avancer(fraction, etape=None):
+    tache = getattr(_courante, "tache", None)
+    if tache is not None:
+        tache.avancement = min(max(float(fraction), 0.0), 1.0)
+        tache.etape = etape
+
+
+# Vrai si le thread exécute une tâche (pour ne calculer l'avancement que lorsqu'il est suivi)
+def suivie():
+    return getattr(_courante, "tache", None) is not None
+
+
+class GestionnaireTaches:
+    def __init__(self, travailleurs=TRAVAILLEURS):
+        self._pool = ThreadPoolExecutor(max_workers=travailleurs, thread_name_prefix="wksdf-tache")
+        self._verrou = threading.Lock()
+        self._taches = {}
+        self._par_cle = {}
+
+    # Tâche de clé `cle` déjà soumise (sauf échec), ou nouvelle tâche exécutant fonction(*args)
+    def soumettre(self, cle, nom, fonction, *args):
+        with self._verrou:
+            tache = self._par_cle.get(cle)
+            if tache is not None and tache.etat != ECHEC:
+                return tache
+            tache = Tache(cle, nom)
+            self._taches[tache.id] = tache
+            self._par_cle[cle] = tache
+            self._oublier_anciennes()
+        self._pool.submit(self._executer, tache, fonction, args)
+        return tache
+
+    # Une tâche terminée dont le résultat n'est plus valable ne sera plus reprise
+    def oublier(self, tache):
+        with self._verrou:
+            if self._par_cle.get(tache.cle) is tache:
+                del self._par_cle[tache.cle]
+
+    def trouver(self, cle):
+        with self._verrou:
+            return self._par_cle.get(cle)
+
+    def par_id(self, tache_id):
+        with self._verrou:
+            return self._taches.get(tache_id)
+
+    # Tâches de la plus récente à la plus ancienne
+    def taches(self):
+        with self._verrou:
+            return sorted(self._taches.values(), key=lambda tache: tache.soumise, reverse=True)
+
+    def _oublier_anciennes(self):
+        terminees = [tache for tache in self._taches.values() if not tache.active]
+        for tache in sorted(terminees, key=lambda t: t.soumise)[:max(0, len(terminees) - TACHES_GARDEES)]:
+            del self._taches[tache.id]
+            if self._par_cle.get(tache.cle) is tache:
+                del self._par_cle[tache.cle]
+
+    def _executer(self, tache, fonction, args):
+        _courante.tache = tache
+        tache.etat, tache.debut = EN_COURS, time.time()
+        try:
+            with mesures.mesurer(f"tache.{tache.nom}"):
+                tache.resultat = fonction(*args)
+            tache.avancement, tache.etat = 1.0, TERMINEE
+        except Exception as erreur:
+            journal.exception("Échec de la tâche %s (%s)", tache.nom, tache.id)
+            tache.erreur, tache.etat = str(erreur) or type(erreur).__name__, ECHEC
+        finally:
+            tache.fin = time.time()
+            _courante.tache = None
+
+    def arreter(self, attendre=True):
+        self._pool.shutdown(wait=attendre)
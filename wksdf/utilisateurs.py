@@ -0,0 +1,199 @@
+"""Comptes utilisateurs : mots de passe hachés, blocage après échecs, sessions.
+
+Les comptes restent dans data/users.csv (colonnes username, password, role),
+lu une seule fois puis gardé en mémoire ; il n'est relu que si le fichier
+change sur disque (date de modification ou taille).
+
+Les mots de passe sont hachés avec scrypt (hashlib), avec un sel aléatoire par
+compte et le coût dans l'empreinte : scrypt$n$r$p$sel$hachage. Le coût peut
+donc évoluer sans invalider les comptes existants ; une empreinte d'un coût
+inférieur, ou au format SHA-256 sans sel des anciennes versions, est
+recalculée à la connexion réussie suivante. Le nombre de hachages simultanés
+est borné (chaque calcul réserve 32 Mio de mémoire).
+
+Après ECHECS_MAX échecs pour un même nom d'utilisateur, les tentatives sont
+refusées pendant DUREE_BLOCAGE secondes, sans calcul de hachage ; des échecs
+plus anciens que DUREE_BLOCAGE sont oubliés. Une connexion réussie ouvre une
+session identifiée par un jeton aléatoire, qui expire après DUREE_INACTIVITE
+secondes sans utilisation (chaque appel à session() la prolonge). Compteurs et
+sessions sont propres au processus.
+"""
+import base64
+import csv
+import hashlib
+import hmac
+import os
+import secrets
+import tempfile
+import threading
+import time
+
+USERS_PATH = "data/users.csv"
+
+# Coût de scrypt : n = 2^15, r = 8, p = 1 (32 Mio, voir benchmarks/bench_authentification.py)
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+TAILLE_SEL = 16
+HACHAGES_SIMULTANES = 2
+
+ECHECS_MAX = 5
+DUREE_BLOCAGE = 300
+DUREE_INACTIVITE = 30 * 60
+
+COMPTES_INITIAUX = [("admin", "Samayaye67", "admin"), ("user", "Wksdfuser0525", "user")]
+
+
+class CompteBloque(Exception):
+    def __init__(self, nom, restant):
+        super().__init__(f"Compte {nom} bloqué pendant encore {restant:.0f} s")
+        self.nom = nom
+        self.restant = restant
+
+
+_hachages = threading.BoundedSemaphore(HACHAGES_SIMULTANES)
+
+
+def _b64(octets):
+    return base64.b64encode(octets).decode("ascii")
+
+
+def _scrypt(mot_de_passe, sel, n, r, p):
+    with _hachages:
+        return hashlib.scrypt(mot_de_passe.encode(), salt=sel, n=n, r=r, p=p, maxmem=256 * n * r, dklen=32)
+
+
+def hacher(mot_de_passe, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    sel = os.urandom(TAILLE_SEL)
+    return f"scrypt${n}${r}${p}${_b64(sel)}${_b64(_scrypt(mot_de_passe, sel, n, r, p))}"
+
+
+# (mot de passe correct, empreinte à recalculer au coût courant)
+def verifier(mot_de_passe, empreinte):
+    if empreinte.startswith("scrypt$"):
+        _, n, r, p, sel, attendu = empreinte.split("$")
+        n, r, p = int(n), int(r), int(p)
+        calcule = _scrypt(mot_de_passe, base64.b64decode(sel), n, r, p)
+        correct = hmac.compare_digest(calcule, base64.b64decode(attendu))
+        return correct, correct and (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    # Ancien format : SHA-256 hexadécimal sans sel
+    correct = hmac.compare_digest(hashlib.sha256(mot_de_passe.encode()).hexdigest(), empreinte)
+    return correct, correct
+
+
+class Utilisateurs:
+    def __init__(self, chemin=USERS_PATH):
+        self.chemin = chemin
+        self._verrou = threading.Lock()
+        self._signature = None
+        self._comptes = {}
+        self._echecs = {}
+        self._sessions = {}
+        # Empreinte vérifiée pour un nom inconnu : même durée de réponse que pour un compte existant
+        self._leurre = hacher(secrets.token_hex(8))
+
+    def _lire_signature(self):
+        try:
+            stat = os.stat(self.chemin)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    # Comptes en mémoire, relus si le fichier a changé
+    def comptes(self):
+        with self._verrou:
+            return self._relire()
+
+    # À appeler sous self._verrou
+    def _relire(self):
+        signature = self._lire_signature()
+        if signature is None:
+            self._ecrire([(nom, hacher(mot_de_passe), role) for nom, mot_de_passe, role in COMPTES_INITIAUX])
+            signature = self._lire_signature()
+        if signature != self._signature:
+            with open(self.chemin, newline="", encoding="utf-8") as f:
+                self._comptes = {ligne["username"]: (ligne["password"], ligne["role"])
+                                 for ligne in csv.DictReader(f)}
+            self._signature = signature
+        return self._comptes
+
+    # Réécriture atomique du fichier (fichier temporaire puis remplacement)
+    def _ecrire(self, lignes):
+        dossier = os.path.dirname(self.chemin) or "."
+        os.makedirs(dossier, exist_ok=True)
+        descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix=".csv")
+        with os.fdopen(descripteur, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["username", "password", "role"])
+            writer.writerows(lignes)
+        os.replace(temporaire, self.chemin)
+
+    # Lecture et réécriture sous le même verrou : une modification concurrente du fichier n'est pas écrasée
+    def _remplacer_empreinte(self, nom, empreinte):
+        with self._verrou:
+            comptes = dict(self._relire())
+            if nom not in comptes:
+                return
+            comptes[nom] = (empreinte, comptes[nom][1])
+            self._ecrire([(n, e, role) for n, (e, role) in comptes.items()])
+
+    # Lève CompteBloque si le nom a atteint ECHECS_MAX échecs récents ; des échecs anciens sont oubliés
+    def verifier_blocage(self, nom):
+        echecs = self._echecs.get(nom)
+        if echecs is None:
+            return
+        nombre, dernier = echecs
+        restant = dernier + DUREE_BLOCAGE - time.monotonic()
+        if restant <= 0:
+            with self._verrou:
+                if self._echecs.get(nom) == echecs:
+                    del self._echecs[nom]
+        elif nombre >= ECHECS_MAX:
+            raise CompteBloque(nom, restant)
+
+    # Rôle de l'utilisateur si le mot de passe est correct, None sinon
+    def authentifier(self, nom, mot_de_passe):
+        self.verifier_blocage(nom)
+        compte = self.comptes().get(nom)
+        correct, a_rehacher = verifier(mot_de_passe, compte[0] if compte else self._leurre)
+        if not (correct and compte):
+            with self._verrou:
+                nombre, _ = self._echecs.get(nom, (0, 0.0))
+                self._echecs[nom] = (nombre + 1, time.monotonic())
+            return None
+        self._echecs.pop(nom, None)
+        if a_rehacher:
+            self._remplacer_empreinte(nom, hacher(mot_de_passe))
+        return compte[1]
+
+    def ouvrir_session(self, nom):
+        jeton = secrets.token_urlsafe(32)
+        with self._verrou:
+            maintenant = time.monotonic()
+            # Sessions expirées retirées au passage
+            self._sessions = {cle: s for cle, s in self._sessions.items() if s[1] > maintenant}
+            self._sessions[self._cle(jeton)] = (nom, maintenant + DUREE_INACTIVITE)
+        return jeton
+
+    # (nom, rôle) de la session du jeton, None si inconnue ou expirée ; une session valide est prolongée
+    def session(self, jeton):
+        cle = self._cle(jeton)
+        with self._verrou:
+            session = self._sessions.get(cle)
+            maintenant = time.monotonic()
+            if session is None or session[1] <= maintenant:
+                self._sessions.pop(cle, None)
+                return None
+            self._sessions[cle] = (session[0], maintenant + DUREE_INACTIVITE)
+        # Rôle relu dans les comptes : un compte supprimé ou modifié est pris en compte tout de suite
+        compte = self.comptes().get(session[0])
+        return None if compte is None else (session[0], compte[1])
+
+    def fermer_session(self, jeton):
+        with self._verrou:
+            self._sessions.pop(self._cle(jeton), None)
+
+    # Seule l'empreinte du jeton est gardée en mémoire
+    @staticmethod
+    def _cle(jeton):
+        return hashlib.sha256(jeton.encode()).hexdigest()